@@ -0,0 +1,47 @@
+#Compara a AST de objetos comuns com a AST em arena (NodeArena): memória
+#ocupada pelos nós e tempo de percurso (AST.__str__).
+#Uso: PYTHONPATH=src python benchmarks/bench_ast.py [num_comandos ...]
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.tree.arena import NodeArena
+from io import StringIO
+import gc
+import sys
+import time
+import tracemalloc
+
+STMTS = '''    i = i + 1;
+    x = (x * 3 + i % 7) / 2 - -x;
+    se (x > 100 & i != 0) x = x - 100 senao inicio real r; r = x * 0.5; escreva(r); fim;
+'''
+
+
+def generate(count: int):
+    body = STMTS * (count // 3)
+    return f'programa bench inicio inteiro i; inteiro x; i = 0; x = 1;\n{body}fim.'
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    ast = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    text = str(ast)
+    return size, time.perf_counter() - start, text
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [10000]
+    for count in sizes:
+        source = generate(count)
+        parse = lambda: Parser(RegexLexer(StringIO(source))).ast
+        print(f'{count} comandos')
+        size, elapsed, text = measure(parse)
+        ast = parse()
+        arena_size, arena_elapsed, arena_text = measure(lambda: NodeArena.from_ast(ast))
+        assert text == arena_text
+        print(f'  Objetos: {size / 2**20:6.1f} MB  str(): {elapsed:.3f} s')
+        print(f'  Arena:   {arena_size / 2**20:6.1f} MB  str(): {arena_elapsed:.3f} s')
@@ -0,0 +1,57 @@
+#Mede a vazão de IC.run_batch() (uma execução do TAC sobre colunas NumPy)
+#contra a execução linha a linha com IC.interpret(), usando
+#tests/inputs/primo.dl otimizado com um número lido por linha.
+#Uso: PYTHONPATH=src python benchmarks/bench_batch.py [linhas ...]
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.opt.global_opt import optimize
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+import builtins
+import numpy as np
+import sys
+import time
+
+SOURCE = Path(__file__).parent.parent / 'tests' / 'inputs' / 'primo.dl'
+
+
+def build():
+    ast = Parser(RegexLexer(StringIO(SOURCE.read_text()))).ast
+    Checker(ast)
+    ic = IC(ast)
+    optimize(ic)
+    return ic
+
+
+def per_row(ic: IC, nums):
+    read = builtins.input
+    out = StringIO()
+    try:
+        with redirect_stdout(out):
+            for n in nums:
+                builtins.input = lambda prompt: str(n)
+                ic.interpret()
+    finally:
+        builtins.input = read
+    return out.getvalue().count('\n')
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 10000, 100000]
+    ic = build()
+    rng = np.random.default_rng(0)
+    for rows in sizes:
+        nums = rng.integers(2, 1000, rows)
+        start = time.perf_counter()
+        result = ic.run_batch({'num': nums})
+        batch = time.perf_counter() - start
+        # A execução linha a linha é estimada numa amostra de até 1000 linhas
+        sample = nums[:1000]
+        start = time.perf_counter()
+        per_row(ic, sample)
+        single = (time.perf_counter() - start) * rows / len(sample)
+        print(f'{rows} linhas: run_batch {batch:.3f} s ({rows / batch:,.0f} linhas/s)  '
+              f'interpret {single:.3f} s ({rows / single:,.0f} linhas/s)  {single / batch:.1f}x')
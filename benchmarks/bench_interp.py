@@ -0,0 +1,80 @@
+#Compara IC.interpret() (temporários num dicionário ou num banco de
+#registradores) com o ClosureInterpreter e com o código Python gerado por
+#PythonCodeGenerator em laços no estilo de
+#tests/inputs/primo.dl: conta os primos até N por divisões sucessivas, antes
+#e depois da otimização global. A decodificação e a geração/compilação do
+#código entram no tempo medido.
+#Uso: PYTHONPATH=src python benchmarks/bench_interp.py [N ...]
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.inter.closure_interpreter import ClosureInterpreter
+from dlc.codegen.python_codegen import PythonCodeGenerator
+from dlc.opt.global_opt import optimize
+from contextlib import redirect_stdout
+from io import StringIO
+import gc
+import sys
+import time
+
+SOURCE = '''programa primos inicio
+    inteiro n, num, i, total, soma; booleano eh_primo;
+    n = {n}; num = 2; total = 0; soma = 1;
+    enquanto (num <= n) inicio
+        i = 2;
+        eh_primo = verdade;
+        enquanto (i * i <= num & eh_primo == verdade) inicio
+            se (num % i == 0)
+                eh_primo = falso;
+            i = i + 1;
+        fim;
+        se (eh_primo) inicio
+            total = total + 1;
+            soma = soma * 31 + num;
+        fim;
+        num = num + 1;
+    fim;
+    escreva(total);
+    escreva(soma);
+fim.'''
+
+
+def build(n: int, optimized: bool):
+    ast = Parser(RegexLexer(StringIO(SOURCE.format(n=n)))).ast
+    Checker(ast)
+    ic = IC(ast)
+    if optimized:
+        optimize(ic)
+    return ic
+
+
+def best_of(repeat: int, run):
+    best = float('inf')
+    for _ in range(repeat):
+        out = StringIO()
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        with redirect_stdout(out):
+            run()
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+    return best, out.getvalue()
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [5000]
+    for n in sizes:
+        for optimized in (False, True):
+            ic = build(n, optimized)
+            base, expected = best_of(3, lambda: ic.interpret(registers=False))
+            label = 'otimizado' if optimized else 'sem otimização'
+            print(f'N = {n} ({label}, melhor de 3)')
+            print(f'  interpret (dicionário): {base:.3f} s')
+            for name, run in (('interpret (registradores)', ic.interpret),
+                              ('closures', lambda: ClosureInterpreter(ic).run()),
+                              ('código Python', lambda: PythonCodeGenerator(ic).compile()())):
+                new, output = best_of(3, run)
+                assert output == expected, (output, expected)
+                print(f'  {name}: {new:.3f} s ({base / new:.2f}x)')
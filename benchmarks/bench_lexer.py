@@ -0,0 +1,50 @@
+#Compara o Lexer original com o RegexLexer em entradas de vários megabytes.
+#Uso: PYTHONPATH=src python benchmarks/bench_lexer.py [tamanho_em_MB ...]
+from dlc.lex.tag import Tag
+from dlc.lex.lexer import Lexer
+from dlc.lex.regex_lexer import RegexLexer
+from io import StringIO
+import sys
+import time
+
+BLOCK = '''    // iteração {i}
+    i{i} = i{i} + 1;
+    area = 3.1415 * raio * raio / 2.0;
+    se (num % {i} == 0 & eh_primo == verdade) inicio
+        eh_primo = falso; /* marca como composto */
+    fim;
+'''
+
+
+def generate(size_mb: float):
+    parts = ['programa bench inicio\n']
+    size = 0
+    i = 0
+    while size < size_mb * 1024 * 1024:
+        part = BLOCK.format(i=i)
+        parts.append(part)
+        size += len(part)
+        i += 1
+    parts.append('fim.\n')
+    return ''.join(parts)
+
+
+def run(lexer_class, source: str):
+    lexer = lexer_class(StringIO(source))
+    count = 0
+    start = time.perf_counter()
+    while lexer.next_token().tag != Tag.EOF:
+        count += 1
+    return count, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    sizes = [float(s) for s in sys.argv[1:]] or [1, 4]
+    for size_mb in sizes:
+        source = generate(size_mb)
+        print(f'Entrada de {len(source) / 2**20:.1f} MB')
+        base_count, base_time = run(Lexer, source)
+        count, elapsed = run(RegexLexer, source)
+        assert count == base_count
+        print(f'  Lexer:      {base_count} tokens em {base_time:.3f} s')
+        print(f'  RegexLexer: {count} tokens em {elapsed:.3f} s ({base_time / elapsed:.1f}x)')
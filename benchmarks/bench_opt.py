@@ -0,0 +1,70 @@
+#Mede o tempo de cada passo da otimização global (propagação de constantes
+#esparsa, simplificação por regras, numeração de valores, código invariante
+#dos laços, variáveis de indução, propagação de cópias e eliminação de
+#código morto) numa primeira rodada sobre programas gerados com muitos
+#blocos e temporários, e o de optimize() inteiro (até o ponto fixo) sobre
+#outra cópia do programa.
+#Uso: PYTHONPATH=src python benchmarks/bench_opt.py [comandos ...]
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.opt.simplify import simplify
+from dlc.opt.global_opt import (
+    sparse_conditional_constant_propagation,
+    global_value_numbering,
+    loop_invariant_code_motion,
+    reduce_induction_variables,
+    global_copy_propagation,
+    global_dead_code_elimination,
+    optimize
+)
+from io import StringIO
+import sys
+import time
+
+PASSES = [
+    ('constantes', sparse_conditional_constant_propagation),
+    ('simplificação', simplify),
+    ('valores', global_value_numbering),
+    ('laços', loop_invariant_code_motion),
+    ('indução', reduce_induction_variables),
+    ('cópias', global_copy_propagation),
+    ('código morto', global_dead_code_elimination),
+]
+
+
+def program(statements: int):
+    # Um laço com statements comandos; a cada 4, um se/senao
+    lines = ['programa gerado inicio', 'inteiro n, i, a, b, c; booleano f;',
+             'leia(n); i = 0; a = 1; b = 2; c = 3; f = verdade;', 'enquanto (i < n) inicio']
+    for k in range(statements):
+        if k % 4 == 3:
+            lines.append(f'se (a > {k} & f) b = b + a * {k} senao c = c - b;')
+        else:
+            lines.append(f'a = (a + {k}) * b % {k + 7} + c;')
+    lines += ['i = i + 1;', 'fim;', 'escreva(a + b + c);', 'fim.']
+    return '\n'.join(lines)
+
+
+def build(source: str):
+    ast = Parser(RegexLexer(StringIO(source))).ast
+    Checker(ast)
+    return IC(ast)
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [250, 1000, 4000]
+    for statements in sizes:
+        ic = build(program(statements))
+        blocks, temps = len(ic.bb_sequence), ic.temp_count
+        times = []
+        for name, opt_pass in PASSES:
+            start = time.perf_counter()
+            opt_pass(ic)
+            times.append(f'{name} {time.perf_counter() - start:8.3f} s')
+        ic = build(program(statements))
+        start = time.perf_counter()
+        optimize(ic)
+        times.append(f'total {time.perf_counter() - start:8.3f} s')
+        print(f'{statements:>6} comandos, {blocks:>6} blocos, {temps:>6} temporários: ' + ', '.join(times))
@@ -0,0 +1,97 @@
+#Compara o motor de visita com pilha explícita (Visitor.visit) com a visita
+#recursiva por duplo despacho via Node.accept: um visitante que só percorre
+#a árvore (mede o custo do percurso em si) e o Checker/IC completos.
+#Uso: PYTHONPATH=src python benchmarks/bench_visitor.py [num_comandos ...]
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.tree.visitor import Visitor
+from io import StringIO
+from types import GeneratorType
+import gc
+import sys
+import time
+
+STMTS = '''    i = i + 1;
+    x = (x * 3 + i % 7) / 2 - -x;
+    se (x > 100 & i != 0) x = x - 100 senao inicio real r; r = x * 0.5; escreva(r); fim;
+'''
+
+
+class RecursiveDriver:
+    '''Visita no estilo original: cada filho é visitado por node.accept(), com
+    recursão na pilha do Python.'''
+
+    def visit(self, node):
+        result = node.accept(self)
+        if type(result) is not GeneratorType:
+            return result
+        value = None
+        try:
+            while True:
+                value = self.visit(result.send(value))
+        except StopIteration as stop:
+            return stop.value
+
+
+class NodeCounter(Visitor):
+    def visit_program_node(self, node): return 1 + (yield node.stmt)
+    def visit_block_node(self, node):
+        count = 1
+        for stmt in node.stmts:
+            count += yield stmt
+        return count
+    def visit_decl_node(self, node): return 1
+    def visit_assign_node(self, node): return 1 + (yield node.var) + (yield node.expr)
+    def visit_if_node(self, node): return 1 + (yield node.expr) + (yield node.stmt)
+    def visit_else_node(self, node): return 1 + (yield node.expr) + (yield node.stmt1) + (yield node.stmt2)
+    def visit_while_node(self, node): return 1 + (yield node.expr) + (yield node.stmt)
+    def visit_write_node(self, node): return 1 + (yield node.expr)
+    def visit_read_node(self, node): return 1
+    def visit_var_node(self, node): return 1
+    def visit_literal_node(self, node): return 1
+    def visit_binary_node(self, node): return 1 + (yield node.expr1) + (yield node.expr2)
+    def visit_unary_node(self, node): return 1 + (yield node.expr)
+    def visit_convert_node(self, node): return 1 + (yield node.expr)
+
+
+class RecursiveNodeCounter(RecursiveDriver, NodeCounter): pass
+class RecursiveChecker(RecursiveDriver, Checker): pass
+class RecursiveIC(RecursiveDriver, IC): pass
+
+
+def generate(count: int):
+    body = STMTS * (count // 3)
+    return f'programa bench inicio inteiro i; inteiro x; i = 0; x = 1;\n{body}fim.'
+
+
+def best_of(repeat: int, source: str, stage):
+    best = float('inf')
+    for _ in range(repeat):
+        ast = Parser(RegexLexer(StringIO(source))).ast
+        if stage is IC or stage is RecursiveIC:
+            Checker(ast)
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        if stage in (NodeCounter, RecursiveNodeCounter):
+            stage().visit(ast.root)
+        else:
+            stage(ast)
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+    return best
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1:]] or [10000]
+    for count in sizes:
+        source = generate(count)
+        print(f'{count} comandos (melhor de 5)')
+        for name, base, new in (('Percurso', RecursiveNodeCounter, NodeCounter),
+                                ('Checker', RecursiveChecker, Checker),
+                                ('IC', RecursiveIC, IC)):
+            b = best_of(5, source, base)
+            n = best_of(5, source, new)
+            print(f'  {name:<9} recursivo: {b:.3f} s  pilha explícita: {n:.3f} s ({b / n:.2f}x)')
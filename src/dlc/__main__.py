@@ -1,26 +1,75 @@
-from dlc.lex.lexer import Lexer
+from dlc.lex.mmap_lexer import MmapLexer
 from dlc.opt.global_opt import optimize
 from dlc.syntax.parser import Parser
 from dlc.semantic.checker import Checker
 from dlc.inter.ic import IC
+from dlc.inter.profile import Profile
 from dlc.codegen.x64_codegen import X64CodeGenerator
+from dlc.stream import compile_stream
+from dlc import build
+from dlc import jit
 from pathlib import Path
 import sys
 import subprocess
 
 if __name__ == '__main__':
     #Entrada
-    if len(sys.argv) != 2:
+    args = sys.argv[1:]
+    if args[:1] == ['build']:
+        sys.exit(0 if build.main(args[1:]) else 1)
+    mode = args[0] if args[:1] in (['--stream'], ['--jit'], ['--profile']) else None
+    if mode:
+        args = args[1:]
+    if len(args) != 1:
         print('Argumentos inválidos! Esperado um caminho ' +
-              'de arquivo para um programa na linguagem DL.')
+              'de arquivo para um programa na linguagem DL ' +
+              '(opcionalmente precedido de --stream, --jit ou --profile).')
+        exit()
+    file_input = args[0]
+
+    #Execução por código Python gerado, sem gcc (em cache em out/cache)
+    if mode == '--jit':
+        run = jit.compile_file(file_input, 'out/cache')
+        if run is not None:
+            run()
+        exit()
+
+    #Interpretação do TAC otimizado com perfil (salvo em out/prog.profile.json)
+    if mode == '--profile':
+        with open(file_input, 'rb') as source, MmapLexer(source) as lexer:
+            parser = Parser(lexer)
+        if parser.had_errors or Checker(parser.ast).had_errors:
+            exit()
+        ic = IC(parser.ast)
+        optimize(ic)
+        profile = Profile()
+        ic.interpret(profile=profile)
+        print('\n' + profile.report())
+        Path('out').mkdir(exist_ok=True)
+        profile.save('out/prog.profile.json')
+        exit()
+
+    #Compilação em fluxo: um comando por vez, direto para x64
+    if mode == '--stream':
+        file_name = 'out/prog.s'
+        Path(file_name).parent.mkdir(parents=True, exist_ok=True)
+        with open(file_input, 'rb') as source, open(file_name, 'w') as output:
+            ok = compile_stream(source, output)
+        if not ok:
+            exit()
+        print('\n**** Saída do programa alvo gerado ****')
+        subprocess.run(['gcc', file_name, '-o', 'out/prog', '-lm'], check=True)
+        subprocess.run(['./out/prog'], check=True)
+        print('\nCompilação concluída com sucesso!')
         exit()
-    file_input = sys.argv[1]
 
     #Análise Léxica
-    lexer = Lexer(open(file_input, 'r'))
+    with open(file_input, 'rb') as source:
+        lexer = MmapLexer(source)
 
     #Análise Sintática
     parser = Parser(lexer)
+    lexer.close()
     if parser.had_errors:
         exit()
     ast = parser.ast
@@ -0,0 +1,156 @@
+from dlc.lex.mmap_lexer import MmapLexer
+from dlc.opt.global_opt import optimize
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.codegen.x64_codegen import X64CodeGenerator
+from dlc.inter.profile import Profile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+import argparse
+import os
+import subprocess
+import time
+
+
+class BuildResult:
+    def __init__(self, source: str):
+        self.source = source
+        self.assembly = None
+        self.executable = None
+        self.ok = False
+        self.messages = ''  # Erros e avisos do compilador e do gcc
+        self.times = {}     # Segundos gastos em cada fase
+
+
+def output_paths(source: Path, output_dir: Path=None):
+    '''a.dl -> (a.s, a), no diretório do fonte ou em output_dir.'''
+    directory = output_dir if output_dir is not None else source.parent
+    executable = directory / source.stem
+    return executable.with_suffix('.s'), executable
+
+
+def compile_file(source: str, output_dir: str=None, link: bool=True, binary_io: bool=False,
+                 profile: str=None):
+    '''Compila um arquivo DL até assembly (e executável, se link): roda em
+    um processo de trabalho, capturando as mensagens do compilador. Com
+    binary_io, o executável lê e escreve valores binários com buffer (ver
+    dlc.codegen.binary_io) em vez de usar o console. profile é o caminho de
+    um perfil salvo (python -m dlc --profile) que guia a ordem dos blocos;
+    ele só é usado se foi colhido sobre este programa.'''
+    result = BuildResult(source)
+    assembly, executable = output_paths(Path(source), Path(output_dir) if output_dir else None)
+    times = result.times
+    out = StringIO()
+    with redirect_stdout(out):
+        start = time.perf_counter()
+        with open(source, 'rb') as source_file, MmapLexer(source_file) as lexer:
+            parser = Parser(lexer)
+        ok = not parser.had_errors and not Checker(parser.ast).had_errors
+        if ok:
+            ic = IC(parser.ast)
+            times['front-end'] = time.perf_counter() - start
+            start = time.perf_counter()
+            optimize(ic)
+            times['otimização'] = time.perf_counter() - start
+            start = time.perf_counter()
+            block_profile = Profile.load(profile) if profile else None
+            if block_profile is not None and not block_profile.matches(ic):
+                print(f'Aviso: o perfil {profile} é de outro programa e foi ignorado')
+                block_profile = None
+            code = X64CodeGenerator(ic, binary_io, profile=block_profile).code
+            assembly.parent.mkdir(parents=True, exist_ok=True)
+            assembly.write_text('\n'.join(code))
+            times['código x64'] = time.perf_counter() - start
+        else:
+            times['front-end'] = time.perf_counter() - start
+    result.messages = out.getvalue()
+    if not ok:
+        return result
+    result.assembly = str(assembly)
+
+    if link:
+        start = time.perf_counter()
+        gcc = subprocess.run(['gcc', str(assembly), '-o', str(executable), '-lm'],
+                             capture_output=True, text=True)
+        times['gcc'] = time.perf_counter() - start
+        result.messages += gcc.stdout + gcc.stderr
+        if gcc.returncode != 0:
+            return result
+        result.executable = str(executable)
+    result.ok = True
+    return result
+
+
+def build(sources: list, jobs: int=None, output_dir: str=None, link: bool=True, binary_io: bool=False,
+          profile: str=None):
+    '''Compila vários arquivos em paralelo, em processos que importam o
+    compilador uma única vez. Retorna os BuildResult na ordem de sources;
+    um arquivo repetido é compilado uma vez só, e as suas posições recebem
+    o mesmo resultado (duas compilações dele escreveriam ao mesmo tempo no
+    mesmo .s e no mesmo executável).'''
+    unique = {}
+    for source in sources:
+        unique.setdefault(Path(source).resolve(), source)
+    files = list(unique.values())
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        results = [compile_file(source, output_dir, link, binary_io, profile) for source in files]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            count = len(files)
+            results = list(executor.map(compile_file, files, [output_dir] * count, [link] * count,
+                                        [binary_io] * count, [profile] * count,
+                                        chunksize=max(1, count // (4 * jobs))))
+    by_file = dict(zip(unique, results))
+    return [by_file[Path(source).resolve()] for source in sources]
+
+def summary(results: list, elapsed: float, jobs: int):
+    lines = []
+    failed = [r for r in results if not r.ok]
+    lines.append(f'{len(results) - len(failed)} de {len(results)} arquivo(s) compilado(s) '
+                 f'em {elapsed:.3f} s com {jobs} processo(s)')
+    totals = {}
+    for result in results:
+        for phase, seconds in result.times.items():
+            totals[phase] = totals.get(phase, 0) + seconds
+    for phase, seconds in totals.items():
+        lines.append(f'  {phase:<12} {seconds:8.3f} s')
+    busy = sum(totals.values())
+    if elapsed > 0:
+        lines.append(f'  {"total":<12} {busy:8.3f} s (paralelismo efetivo: {busy / elapsed:.1f}x)')
+    for result in failed:
+        lines.append(f'Falhou: {result.source}')
+    return '\n'.join(lines)
+
+
+def main(args: list):
+    arg_parser = argparse.ArgumentParser(prog='python -m dlc build',
+                                         description='Compila vários programas DL em paralelo.')
+    arg_parser.add_argument('sources', nargs='+', help='arquivos .dl')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='número de processos (padrão: número de CPUs)')
+    arg_parser.add_argument('-o', '--output-dir', default=None,
+                            help='diretório dos .s e executáveis (padrão: o do fonte)')
+    arg_parser.add_argument('-S', dest='link', action='store_false',
+                            help='só gera o assembly, sem chamar o gcc')
+    arg_parser.add_argument('--binary-io', action='store_true',
+                            help='E/S binária com buffer no executável, em vez de printf/scanf')
+    arg_parser.add_argument('--profile', default=None,
+                            help='perfil de execução salvo por python -m dlc --profile, para a ordem dos blocos')
+    options = arg_parser.parse_args(args)
+    jobs = options.jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = build(options.sources, jobs, options.output_dir, options.link, options.binary_io,
+                    options.profile)
+    results = list(dict.fromkeys(results)) # Um arquivo repetido aparece uma vez
+    elapsed = time.perf_counter() - start
+    for result in results:
+        if result.messages:
+            print(f'{result.source}:')
+            print(result.messages, end='' if result.messages.endswith('\n') else '\n')
+    print(summary(results, elapsed, jobs))
+    return all(result.ok for result in results)
@@ -0,0 +1,29 @@
+import struct
+
+
+def encode_input(values):
+    '''Entrada de um executável gerado com binary_io=True: cada valor em
+    binário, na ordem dos leia, como int32 (int e bool) ou double (float).'''
+    out = bytearray()
+    for value in values:
+        out += struct.pack('<d', value) if isinstance(value, float) else struct.pack('<i', value)
+    return bytes(out)
+
+
+def decode_output(data: bytes):
+    '''Valores escritos por um executável gerado com binary_io=True: lista de
+    int e float, na ordem dos escreva.'''
+    values = []
+    pos = 0
+    unpack_int = struct.Struct('<i').unpack_from
+    unpack_double = struct.Struct('<d').unpack_from
+    while pos < len(data):
+        if data[pos] == ord('i'):
+            values.append(unpack_int(data, pos + 1)[0])
+            pos += 5
+        elif data[pos] == ord('d'):
+            values.append(unpack_double(data, pos + 1)[0])
+            pos += 9
+        else:
+            raise ValueError(f'Registro de saída inválido na posição {pos}')
+    return values
@@ -0,0 +1,133 @@
+from dlc.inter.ic import IC
+
+
+class BlockLayout:
+    '''Ordem de emissão dos blocos básicos de um IC que faz os caminhos
+    quentes seguirem em linha reta (fallthrough) e deixa os frios no fim.
+
+    O peso de cada aresta vem de um perfil de execução (ver
+    dlc.inter.profile), se houver, e senão de heurísticas estáticas: um bloco
+    dentro de k laços executa 10^k vezes, a aresta de volta de um laço é
+    tomada 90% das vezes e a que sai do laço, 10%. As arestas são
+    percorridas da mais pesada para a mais leve, juntando em cadeias o bloco
+    do fim de uma cadeia com o do início de outra (Pettis-Hansen); a cadeia
+    da entrada vem primeiro e as demais, das mais quentes para as mais frias.
+
+    Num enquanto, a aresta de volta (corpo -> teste) é a mais pesada, então
+    o teste fica depois do corpo e o laço termina num desvio condicional para
+    o início do corpo (laço testado no fim), com um único salto para o teste
+    antes da primeira iteração.'''
+
+    LOOP_WEIGHT = 10
+    TAKEN = 0.9
+
+    def __init__(self, ic: IC, profile=None):
+        if profile is not None and not profile.matches(ic):
+            raise ValueError('O perfil foi colhido sobre outro código intermediário')
+        ic.link()
+        self.ic = ic
+        self.profile = profile
+        blocks = ic.bb_sequence
+        self.__index = {bb: i for i, bb in enumerate(blocks)}
+        self.__successors = {bb: BlockLayout.successors(bb) for bb in blocks}
+        self.__loops = self.__find_loops()
+        self.order = self.__chain()
+
+    @staticmethod
+    def successors(bb):
+        '''Blocos que podem executar depois de bb (resolvidos por IC.link()).'''
+        return [s for s in dict.fromkeys((bb.fallthrough, bb.target)) if s is not None]
+
+    def frequency(self, bb):
+        '''Execuções estimadas de bb: (contagem do perfil, estimativa estática).'''
+        count = self.profile.count(bb.number) if self.profile else 0
+        return count, self.LOOP_WEIGHT ** len(self.__loops[bb])
+
+    def weight(self, bb, succ):
+        '''Peso da aresta bb -> succ: (contagem do perfil, estimativa estática).'''
+        count = self.profile.edge_count(bb.number, succ.number) if self.profile else 0
+        return count, self.frequency(bb)[1] * self.__probability(bb, succ)
+
+    def __find_loops(self):
+        # Arestas de volta pela busca em profundidade a partir da entrada e,
+        # para cada uma, o laço natural: o cabeçalho mais os blocos que chegam
+        # à origem da aresta sem passar por ele. loops[bb] = cabeçalhos dos
+        # laços que contêm bb
+        blocks = self.ic.bb_sequence
+        loops = {bb: set() for bb in blocks}
+        self.__back_edges = set()
+        if not blocks:
+            return loops
+        predecessors = {bb: [] for bb in blocks}
+        for bb in blocks:
+            for succ in self.__successors[bb]:
+                predecessors[succ].append(bb)
+
+        on_stack = {blocks[0]}
+        visited = {blocks[0]}
+        stack = [(blocks[0], iter(self.__successors[blocks[0]]))]
+        while stack:
+            bb, pending = stack[-1]
+            succ = next(pending, None)
+            if succ is None:
+                stack.pop()
+                on_stack.discard(bb)
+            elif succ in on_stack:
+                self.__back_edges.add((bb, succ))
+            elif succ not in visited:
+                visited.add(succ)
+                on_stack.add(succ)
+                stack.append((succ, iter(self.__successors[succ])))
+
+        for source, header in self.__back_edges:
+            body = {header}
+            work = [source]
+            while work:
+                bb = work.pop()
+                if bb not in body:
+                    body.add(bb)
+                    work.extend(predecessors[bb])
+            for bb in body:
+                loops[bb].add(header)
+        return loops
+
+    def __probability(self, bb, succ):
+        succs = self.__successors[bb]
+        if len(succs) < 2:
+            return 1.0
+        other = succs[0] if succs[1] is succ else succs[1]
+        back, other_back = (bb, succ) in self.__back_edges, (bb, other) in self.__back_edges
+        if back != other_back:
+            return self.TAKEN if back else 1 - self.TAKEN
+        exits = not self.__loops[bb] <= self.__loops[succ]
+        other_exits = not self.__loops[bb] <= self.__loops[other]
+        if exits != other_exits:
+            return 1 - self.TAKEN if exits else self.TAKEN
+        return 0.5
+
+    def __chain(self):
+        blocks = self.ic.bb_sequence
+        if not blocks:
+            return []
+        index = self.__index
+        entry = blocks[0]
+        chain = {bb: [bb] for bb in blocks} # Bloco -> cadeia que o contém
+
+        # Em empates, mantém a ordem original: primeiro as arestas entre
+        # blocos vizinhos, depois as que saem de blocos anteriores
+        edges = [(bb, succ) for bb in blocks for succ in self.__successors[bb]]
+        edges.sort(key=lambda e: (self.weight(*e), index[e[1]] == index[e[0]] + 1, -index[e[0]]),
+                   reverse=True)
+        for bb, succ in edges:
+            head, tail = chain[succ], chain[bb]
+            if head is tail or tail[-1] is not bb or head[0] is not succ or succ is entry:
+                continue
+            tail.extend(head)
+            for moved in head:
+                chain[moved] = tail
+
+        chains = list({id(c): c for c in (chain[bb] for bb in blocks)}.values())
+        chains.sort(key=lambda c: (c[0] is not entry,
+                                   tuple(-f for f in max(self.frequency(bb) for bb in c)),
+                                   index[c[0]]))
+        return [bb for c in chains for bb in c]
@@ -1,5 +1,6 @@
 from dlc.inter.ic import IC
 from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, Liveness, bits
 
 class LiveRange:
     def __init__(self, start=None, end=None):
@@ -60,6 +61,51 @@ class LiveRange:
 
         return int_live_ranges, double_live_ranges
 
+    @staticmethod
+    def compute_block_live_ranges(blocks: list):
+        '''Intervalos de vida para os blocos de um IC já ligado (IC.link())
+        emitidos na ordem de blocks, que pode não ser a de bb_sequence (ver
+        BlockLayout). Com os blocos fora de ordem, os saltos para trás não
+        bastam para achar os laços, então os intervalos vêm da vivacidade:
+        cada temporário vai da primeira à última posição em que está vivo.'''
+        temps = {}
+        for bb in blocks:
+            for instr in bb:
+                for var in (instr.arg1, instr.arg2, instr.result):
+                    if var.is_temp:
+                        temps[var.number] = var
+        liveness = Liveness(CFG(blocks), max(temps, default=-1) + 1)
+
+        ranges = {}
+
+        def cover(var, i):
+            if var not in ranges:
+                ranges[var] = LiveRange(i, i)
+            else:
+                ranges[var].start = min(ranges[var].start, i)
+                ranges[var].end = max(ranges[var].end, i)
+
+        i = 0
+        for bb in blocks:
+            if not bb.instructions:
+                continue
+            for number in bits(liveness.ins[bb]):
+                cover(temps[number], i)
+            for instr in bb:
+                for var in (instr.arg1, instr.arg2, instr.result):
+                    if var.is_temp:
+                        cover(var, i)
+                i += 1
+            for number in bits(liveness.outs[bb]):
+                cover(temps[number], i - 1)
+
+        # A alocação percorre os intervalos em ordem crescente de início
+        int_live_ranges, double_live_ranges = {}, {}
+        for var, lr in sorted(ranges.items(), key=lambda item: (item[1].start, item[0].number)):
+            target_map = double_live_ranges if var.type.is_float else int_live_ranges
+            target_map[var] = lr
+        return int_live_ranges, double_live_ranges
+
 
 
 
@@ -0,0 +1,198 @@
+from dlc.semantic.type import Type
+from dlc.inter.operator import Operator
+from dlc.inter.ic import IC
+import math
+
+
+class PythonCodeGenerator:
+    '''Traduz o TAC de um IC para o código-fonte de um módulo Python com uma
+    única função run(source=None, sink=None), que se comporta como
+    IC.interpret(). Os temporários
+    viram variáveis locais e os blocos básicos, os ramos de uma máquina de
+    estados: cada ramo "if bb == k" é seguido, na ordem de bb_sequence, pelo
+    ramo do bloco seguinte, então o fallthrough e os saltos para a frente só
+    atribuem bb e seguem adiante; os saltos para trás (laços) voltam ao topo
+    do while com continue.'''
+
+    # Funções auxiliares para os casos em que o tipo do valor não é
+    # conhecido: reproduzem IC.operate()
+    RUNTIME = '''\
+from dlc.inter.console import reader as _reader, writer as _writer
+
+def _value(v):
+    cls = v.__class__
+    if cls is int:
+        return ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000
+    if cls is float or cls is bool:
+        return v
+    return None
+
+def _div(a, b):
+    return _value(a / b if isinstance(a, float) else a // b)
+
+def _invalid():
+    print('Entrada de dados inválida! Interpretação encerrada.')
+'''
+
+    ARITH = {
+        Operator.SUM: '+',
+        Operator.SUB: '-',
+        Operator.MUL: '*',
+        Operator.MOD: '%',
+        Operator.EQ: '==',
+        Operator.NE: '!=',
+        Operator.LT: '<',
+        Operator.LE: '<=',
+        Operator.GT: '>',
+        Operator.GE: '>='
+    }
+    RELATIONAL = (Operator.EQ, Operator.NE, Operator.LT, Operator.LE, Operator.GT, Operator.GE)
+    READ = {Type.BOOL: 'bool(int(_read()))', Type.INT: 'int(_read())', Type.REAL: 'float(_read())'}
+    WRAP = '(({} + 0x80000000) & 0xFFFFFFFF) - 0x80000000'
+
+    def __init__(self, ic: IC):
+        self.ic = ic
+        ic.link()
+        self.__exact = self.__exact_ints()
+        self.code = self.RUNTIME.splitlines()
+        self.code.append('')
+        self.__function()
+
+    @property
+    def source(self):
+        return '\n'.join(self.code) + '\n'
+
+    def compile(self, filename: str='<dl>'):
+        '''Compila o módulo gerado e retorna a função run().'''
+        namespace = {}
+        exec(compile(self.source, filename, 'exec'), namespace)
+        return namespace['run']
+
+    def __exact_ints(self):
+        # Temporários inteiros que só podem guardar int: um inteiro guarda um
+        # real se vier de uma potência (2 ^ -1) ou de outro temporário assim.
+        # Para eles o código usa os operadores do Python direto, com o ajuste
+        # a 32 bits em linha; para os demais, as funções de RUNTIME.
+        defs = {}
+        for instr in self.ic:
+            if instr.result.is_temp:
+                defs.setdefault(instr.result, []).append(instr)
+        exact = {temp for temp in defs if temp.type == Type.INT}
+        changed = True
+        while changed:
+            changed = False
+            for temp in list(exact):
+                for instr in defs[temp]:
+                    if instr.op == Operator.POW or not all(
+                            self.__is_exact(arg, exact) for arg in (instr.arg1, instr.arg2)):
+                        exact.discard(temp)
+                        changed = True
+                        break
+        return exact
+
+    @staticmethod
+    def __is_exact(arg, exact):
+        if arg.is_temp:
+            return arg in exact
+        if arg.is_const:
+            return arg.value.__class__ is int
+        return True
+
+    @staticmethod
+    def __name(arg):
+        if arg.is_temp:
+            return arg.name
+        value = arg.value
+        if isinstance(value, float) and not math.isfinite(value):
+            return f"float('{value!r}')"
+        return f'({value!r})' if not isinstance(value, bool) and value < 0 else repr(value)
+
+    def __function(self):
+        code = self.code
+        blocks = self.ic.bb_sequence
+        index = {bb: i for i, bb in enumerate(blocks)}
+        temps = sorted({arg for instr in self.ic for arg in (instr.arg1, instr.arg2, instr.result)
+                        if arg.is_temp}, key=lambda temp: temp.number)
+        code.append('def run(source=None, sink=None):')
+        code.append('    _read = _reader(source)')
+        code.append('    _write = _writer(sink)')
+        # Sem valor inicial: como um temporário lido antes de escrito no interpretador
+        for i in range(0, len(temps), 16):
+            code.append('    ' + ' = '.join(t.name for t in temps[i:i + 16]) + ' = None')
+        code.append('    bb = 0')
+        code.append('    while True:')
+        for i, bb in enumerate(blocks):
+            code.append(f'        if bb == {i}: # {bb}')
+            body = []
+            jump = None
+            for instr in bb:
+                if instr.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE):
+                    jump = instr
+                elif instr.op != Operator.LABEL:
+                    body.extend(self.__instr(instr))
+
+            def goto(target, indent):
+                # Atribui o próximo bloco: salto para a frente continua no mesmo
+                # percurso do while, salto para trás volta ao topo
+                if target is None:
+                    return [indent + 'return']
+                k = index[target]
+                return [indent + f'bb = {k}'] + ([indent + 'continue'] if k <= i else [])
+
+            if jump is None:
+                body.extend(goto(bb.fallthrough, ''))
+            elif jump.op == Operator.GOTO:
+                body.extend(goto(bb.target, ''))
+            else:
+                cond = self.__name(jump.arg1)
+                if jump.relation is not None:
+                    cond = f'({cond} {self.ARITH[jump.relation]} {self.__name(jump.arg2)})'
+                test = cond if jump.op == Operator.IF else f'not {cond}'
+                body.append(f'if {test}:')
+                body.extend(goto(bb.target, '    '))
+                body.append('else:')
+                body.extend(goto(bb.fallthrough, '    '))
+            code.extend('            ' + line for line in body)
+
+    def __instr(self, instr):
+        op = instr.op
+        result = instr.result
+        a = self.__name(instr.arg1) if instr.arg1.is_temp or instr.arg1.is_const else None
+        b = self.__name(instr.arg2) if instr.arg2.is_temp or instr.arg2.is_const else None
+        exact = result in self.__exact
+        match op:
+            case Operator.MOVE:
+                return [f'{result} = {a}']
+            case Operator.PRINT:
+                return [f'_write({a})']
+            case Operator.READ:
+                read = self.READ.get(result.type, '_read()')
+                return ['try:', f'    {result} = {read}', 'except ValueError:', '    _invalid()', '    return']
+            case Operator.CONVERT:
+                return [f'{result} = float({a})']
+            case Operator.NOT:
+                return [f'{result} = not {a}']
+            case Operator.PLUS:
+                return [f'{result} = {a}' if exact else f'{result} = _value(+{a})']
+            case Operator.MINUS:
+                return [f'{result} = {self.WRAP.format("-" + a)}' if exact else f'{result} = _value(-{a})']
+            case Operator.POW:
+                return [f'{result} = _value({a} ** {b})']
+            case Operator.DIV:
+                if exact:
+                    return [f'{result} = {self.WRAP.format(f"{a} // {b}")}']
+                if result.type == Type.REAL:
+                    return [f'{result} = {a} / {b}']
+                return [f'{result} = _div({a}, {b})']
+            case _ if op in self.RELATIONAL:
+                return [f'{result} = {a} {self.ARITH[op]} {b}']
+            case _:
+                # SUM, SUB, MUL e MOD
+                expr = f'{a} {self.ARITH[op]} {b}'
+                if result.type == Type.REAL:
+                    return [f'{result} = {expr}']
+                if not exact:
+                    return [f'{result} = _value({expr})']
+                if op == Operator.MOD:
+                    return [f'{result} = {expr}'] # |a % b| < |b|: já cabe em 32 bits
+                return [f'{result} = {self.WRAP.format(expr)}']
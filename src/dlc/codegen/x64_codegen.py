@@ -3,6 +3,9 @@ from dlc.inter.operator import Operator
 from dlc.inter.ic import IC
 from dlc.codegen.live_range import LiveRange
 from dlc.codegen.reg_alloc import LinearScanRegisterAllocation
+from dlc.codegen.block_layout import BlockLayout
+import shutil
+import tempfile
 
 
 class X64CodeGenerator():
@@ -40,6 +43,26 @@ class X64CodeGenerator():
         Operator.GE: 'setae',
     }
 
+    # Saltos condicionais das comparações (os reais usam as flags sem sinal
+    # do ucomisd, como os setcc acima) e os que saltam no caso contrário
+    OP_JUMP_INT = {
+        Operator.EQ: ('je', 'jne'),
+        Operator.NE: ('jne', 'je'),
+        Operator.LT: ('jl', 'jge'),
+        Operator.LE: ('jle', 'jg'),
+        Operator.GT: ('jg', 'jle'),
+        Operator.GE: ('jge', 'jl')
+    }
+
+    OP_JUMP_DOUBLE = {
+        Operator.EQ: ('je', 'jne'),
+        Operator.NE: ('jne', 'je'),
+        Operator.LT: ('jb', 'jae'),
+        Operator.LE: ('jbe', 'ja'),
+        Operator.GT: ('ja', 'jbe'),
+        Operator.GE: ('jae', 'jb')
+    }
+
     OP_ARITH = {
         Type.BOOL: OP_ARITH_INT,
         Type.INT: OP_ARITH_INT,
@@ -52,6 +75,12 @@ class X64CodeGenerator():
         Type.REAL: OP_REL_DOUBLE
     }
 
+    OP_JUMP = {
+        Type.BOOL: OP_JUMP_INT,
+        Type.INT: OP_JUMP_INT,
+        Type.REAL: OP_JUMP_DOUBLE
+    }
+
     MOVE = {Type.BOOL: 'mov', Type.INT: 'mov', Type.REAL: 'movsd'}
     CMP = {Type.BOOL: 'cmp', Type.INT: 'cmp', Type.REAL: 'ucomisd'}
     PRINT = {Type.BOOL: 'print_int', Type.INT: 'print_int', Type.REAL: 'print_double'}
@@ -90,16 +119,51 @@ class X64CodeGenerator():
                     self.const_map[arg.value] = f'const_{n}'
                 return f'[rip + {self.const_map[arg.value]}]'
             return str(arg)
-        if arg in self.reg_alloc:
-            return self.reg_alloc[arg]
-        elif arg in self.spill_loc:
-            offset = self.spill_loc[arg]
-            return f'[rbp - {offset}]'
-
-
-    def __init__(self, ic: IC):
+        return self.location.get(arg)
+
+
+    @staticmethod
+    def __shift_of(instr):
+        # (k, operando) se instr multiplica ou divide um inteiro por 2^k (k >= 1)
+        if instr.op not in (Operator.MUL, Operator.DIV, Operator.MOD) or not instr.result.type.is_integral:
+            return None
+        pairs = [(instr.arg2, instr.arg1)]
+        if instr.op == Operator.MUL:
+            pairs.append((instr.arg1, instr.arg2))
+        for power, value in pairs:
+            if power.is_const and power.type.is_integral and power.value > 1 and power.value & (power.value - 1) == 0:
+                return power.value.bit_length() - 1, value
+        return None
+
+
+    def __condition(self, jump):
+        # Compara a condição de um IF/IFFALSE e retorna os saltos (tomado, não
+        # tomado); com relation, cmp direto dos operandos, sem setcc/movzx
+        type = jump.arg1.type
+        self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {self.__resolve_arg(jump.arg1)}')
+        if jump.relation is None:
+            self.code.append(f'\tcmp {self.ACC_REG[type]}, 0')
+            jumps = ('jne', 'je')
+        else:
+            self.code.append(f'\t{self.CMP[type]} {self.ACC_REG[type]}, {self.__resolve_arg(jump.arg2)}')
+            jumps = self.OP_JUMP[type][jump.relation]
+        return jumps if jump.op == Operator.IF else jumps[::-1]
+
+
+    def __init__(self, ic: IC, binary_io: bool=False, layout: bool=True, profile=None):
+        '''Com layout, os blocos são emitidos na ordem de BlockLayout (guiada
+        por profile, um dlc.inter.profile.Profile do mesmo TAC, ou por
+        heurísticas estáticas), com os desvios invertidos ou completados por
+        jmp conforme o bloco que fica logo depois; sem layout, na ordem de
+        ic.bb_sequence, com os saltos do TAC.'''
+        self.binary_io = binary_io
+        self.__exit_used = False
+        blocks = BlockLayout(ic, profile).order if layout else None
         # Alocação de registros
-        int_live_ranges, double_live_ranges = LiveRange.compute_live_ranges(ic)
+        if layout:
+            int_live_ranges, double_live_ranges = LiveRange.compute_block_live_ranges(blocks)
+        else:
+            int_live_ranges, double_live_ranges = LiveRange.compute_live_ranges(ic)
         int_scan_reg_alloc = LinearScanRegisterAllocation(int_live_ranges, self.INT_REGISTERS)
         double_scan_reg_alloc = LinearScanRegisterAllocation(double_live_ranges, self.DOUBLE_REGISTERS)
         int_reg_alloc = int_scan_reg_alloc.register_map
@@ -117,14 +181,72 @@ class X64CodeGenerator():
         self.code = []
         self.reg_alloc = int_reg_alloc | double_reg_alloc
         self.spill_loc = int_spill_loc | double_spill_loc
+        # Operando x64 de cada temporário: registrador ou posição na pilha
+        self.location = dict(self.reg_alloc)
+        for temp, offset in self.spill_loc.items():
+            self.location[temp] = f'[rbp - {offset}]'
 
         # Cálculo do frame
         raw_frame_size = int_scan_reg_alloc.spill_count*Type.INT.size + double_scan_reg_alloc.spill_count*Type.REAL.size
         frame_size = self.__align16(raw_frame_size)
 
-        
+        self.code.extend(self._prologue(frame_size))
+        if layout:
+            for i, bb in enumerate(blocks):
+                self.__emit_block(bb, blocks[i + 1] if i + 1 < len(blocks) else None)
+            if self.__exit_used:
+                self.code.append('.Lfim:')
+        else:
+            for instr in ic:
+                self._emit(instr)
+        self.code.extend(self._epilogue())
+
+
+    @staticmethod
+    def __block_label(bb):
+        return f'.Lbb{bb.number}' if bb is not None else '.Lfim'
+
+    def __jump(self, bb):
+        # Salto incondicional para bb (None: fim do programa)
+        self.__exit_used |= bb is None
+        self.code.append(f'\tjmp {self.__block_label(bb)}')
+
+    def __emit_block(self, bb, next_bb):
+        # Emite bb seguido de next_bb: o salto do fim do bloco é refeito a
+        # partir de bb.target/bb.fallthrough, omitido quando o destino é o
+        # próximo bloco e invertido quando o destino do desvio condicional é
+        # que vem logo depois
+        self.code.append(f'{self.__block_label(bb)}:')
+        last = bb.instructions[-1] if bb.instructions else None
+        jump = last if last is not None and last.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE) else None
+        for instr in (bb.instructions[:-1] if jump else bb.instructions):
+            if instr.op == Operator.LABEL:
+                self.code.append(f'\t# {instr}') # Os saltos usam o rótulo do bloco
+            else:
+                self._emit(instr)
+        if jump is None or jump.op == Operator.GOTO or bb.target is bb.fallthrough:
+            follow = bb.target if jump is not None else bb.fallthrough
+            if jump is not None:
+                self.code.append(f'\t# {jump}')
+            if follow is not next_bb:
+                self.__jump(follow)
+            return
+
+        self.code.append(f'\t# {jump}')
+        taken, not_taken = self.__condition(jump)
+        target, fallthrough = bb.target, bb.fallthrough
+        if target is next_bb:
+            # Inverte a condição: o destino passa a ser o fallthrough
+            target, fallthrough, taken = fallthrough, target, not_taken
+        self.__exit_used |= target is None
+        self.code.append(f'\t{taken} {self.__block_label(target)}')
+        if fallthrough is not next_bb:
+            self.__jump(fallthrough)
+
+
+    def _prologue(self, frame_size: int):
         # Cabeçalho
-        self.code.extend([
+        return [
             '# Compilar com: gcc prog.s -o prog -lm',
             '.intel_syntax noprefix',
             '',
@@ -138,200 +260,368 @@ class X64CodeGenerator():
             '\tmov rbp, rsp',
             f'\tsub rsp, {frame_size}',
             ''
-        ])
-
-
-        # Gerar código para cada instrução
-        for instr in ic:
-            result = self.__resolve_arg(instr.result)
-            arg1 = self.__resolve_arg(instr.arg1)
-            arg2 = self.__resolve_arg(instr.arg2)
-            if arg1:
-                type = instr.arg1.type
-            if instr.result and instr.result.is_temp:
-                result_type = instr.result.type
-
-            self.code.append(f'\t# {instr}')
-            match instr.op:
-                case Operator.LABEL:
-                    self.code.append(f'\t{result}:')
-                
-                case Operator.GOTO:
-                    self.code.append(f'\tjmp {result}')
-
-                case Operator.IF:
-                    self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                    self.code.append(f'\tcmp {self.ACC_REG[type]}, 0')
-                    self.code.append(f'\tjne {result}')
-
-                case Operator.IFFALSE:
-                    self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                    self.code.append(f'\tcmp {self.ACC_REG[type]}, 0')
-                    self.code.append(f'\tje {result}')
-                
-                case Operator.PRINT:
-                    self.code.append(f'\t{self.MOVE[type]} {self.CALL_ARG_REG[type]}, {arg1}')
-                    self.code.append(f'\tcall {self.PRINT[type]}')
+        ]
+
+
+    def _emit(self, instr):
+        # Gera o código de uma instrução
+        result = self.__resolve_arg(instr.result)
+        arg1 = self.__resolve_arg(instr.arg1)
+        arg2 = self.__resolve_arg(instr.arg2)
+        if arg1:
+            type = instr.arg1.type
+        if instr.result and instr.result.is_temp:
+            result_type = instr.result.type
+
+        self.code.append(f'\t# {instr}')
+        match instr.op:
+            case Operator.LABEL:
+                self.code.append(f'\t{result}:')
+            
+            case Operator.GOTO:
+                self.code.append(f'\tjmp {result}')
+
+            case Operator.IF | Operator.IFFALSE:
+                taken, _ = self.__condition(instr)
+                self.code.append(f'\t{taken} {result}')
+            
+            case Operator.PRINT:
+                self.code.append(f'\t{self.MOVE[type]} {self.CALL_ARG_REG[type]}, {arg1}')
+                self.code.append(f'\tcall {self.PRINT[type]}')
+            
+            case Operator.READ:
+                self.code.append(f'\tcall {self.READ[result_type]}')
+                self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[result_type]}')
+
+            case Operator.MOVE | Operator.PLUS:
+                self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
+                self.code.append(f'\t{self.MOVE[type]} {result}, {self.ACC_REG[type]}')
+            
+            case Operator.CONVERT:
+                self.code.append(f'\t{self.MOVE[Type.INT]} {self.ACC_REG[Type.INT]}, {arg1}')
+                self.code.append(f'\tcvtsi2sd {self.ACC_REG[Type.REAL]}, {self.ACC_REG[Type.INT]}')
+                self.code.append(f'\t{self.MOVE[Type.REAL]} {result}, {self.ACC_REG[Type.REAL]}')
+
+            case Operator.MINUS:
+                self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
+                self.code.append(f'\tneg {self.ACC_REG[type]}')
+                self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
+
+            case Operator.NOT:
+                self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
+                self.code.append(f'\txor {self.ACC_REG[type]}, 1')
+                self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
                 
-                case Operator.READ:
-                    self.code.append(f'\tcall {self.READ[result_type]}')
-                    self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[result_type]}')
 
-                case Operator.MOVE | Operator.PLUS:
+            case Operator.MUL | Operator.DIV | Operator.MOD if self.__shift_of(instr):
+                # Por 2^k: deslocamento no lugar de imul, e no lugar de idiv o
+                # mesmo resultado dele (quociente truncado para zero, resto com
+                # o sinal do dividendo) somando 2^k - 1 aos negativos antes
+                k, value = self.__shift_of(instr)
+                self.code.append(f'\tmov eax, {self.__resolve_arg(value)}')
+                if instr.op == Operator.MUL:
+                    self.code.append(f'\tshl eax, {k}')
+                else:
+                    self.code.append('\tmov edx, eax')
+                    self.code.append('\tsar edx, 31')
+                    self.code.append(f'\tshr edx, {32 - k}')
+                    self.code.append('\tadd eax, edx')
+                    if instr.op == Operator.DIV:
+                        self.code.append(f'\tsar eax, {k}')
+                    else:
+                        self.code.append(f'\tand eax, {(1 << k) - 1}')
+                        self.code.append('\tsub eax, edx')
+                self.code.append(f'\tmov {result}, eax')
+
+            case _:
+                if instr.op in (Operator.SUM, Operator.SUB, Operator.MUL):
                     self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                    self.code.append(f'\t{self.MOVE[type]} {result}, {self.ACC_REG[type]}')
-                
-                case Operator.CONVERT:
-                    self.code.append(f'\t{self.MOVE[Type.INT]} {self.ACC_REG[Type.INT]}, {arg1}')
-                    self.code.append(f'\tcvtsi2sd {self.ACC_REG[Type.REAL]}, {self.ACC_REG[Type.INT]}')
-                    self.code.append(f'\t{self.MOVE[Type.REAL]} {result}, {self.ACC_REG[Type.REAL]}')
-
-                case Operator.MINUS:
-                    self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                    self.code.append(f'\tneg {self.ACC_REG[type]}')
+                    self.code.append(f'\t{self.OP_ARITH[type][instr.op]} {self.ACC_REG[type]}, {arg2}')
                     self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
-
-                case Operator.NOT:
+                elif instr.op in (Operator.EQ, Operator.NE, Operator.LT, Operator.LE, Operator.GT, Operator.GE):
                     self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                    self.code.append(f'\txor {self.ACC_REG[type]}, 1')
-                    self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
-                    
-
-                case _:
-                    if instr.op in (Operator.SUM, Operator.SUB, Operator.MUL):
+                    self.code.append(f'\t{self.CMP[type]} {self.ACC_REG[type]}, {arg2}')
+                    self.code.append(f'\t{self.OP_REL[type][instr.op]} al')
+                    self.code.append('\tmovzx eax, al')
+                    self.code.append(f'\tmov {result}, eax')
+                elif instr.op == Operator.DIV:
+                    if type == Type.REAL:
                         self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
                         self.code.append(f'\t{self.OP_ARITH[type][instr.op]} {self.ACC_REG[type]}, {arg2}')
                         self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
-                    elif instr.op in (Operator.EQ, Operator.NE, Operator.LT, Operator.LE, Operator.GT, Operator.GE):
-                        self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                        self.code.append(f'\t{self.CMP[type]} {self.ACC_REG[type]}, {arg2}')
-                        self.code.append(f'\t{self.OP_REL[type][instr.op]} al')
-                        self.code.append('\tmovzx eax, al')
+                    else:
+                        self.code.append(f'\tmov eax, {arg1}')
+                        self.code.append('\tcdq')
+                        self.code.append(f'\tmov ecx, {arg2}')
+                        self.code.append('\tidiv ecx')
+                        self.code.append(f'\tmov {result}, eax')
+                elif instr.op == Operator.MOD:
+                    if type == Type.REAL:
+                        self.code.append(f'\tmovsd xmm0, {arg1}')
+                        self.code.append(f'\tmovsd xmm1, {arg2}')
+                        self.code.append('\tmov eax, 2')
+                        self.code.append('\tcall fmod@PLT')
+                        self.code.append(f'\tmovsd {result}, xmm0')
+                    else:
+                        self.code.append(f'\tmov eax, {arg1}')
+                        self.code.append('\tcdq')
+                        self.code.append(f'\tmov ecx, {arg2}')
+                        self.code.append('\tidiv ecx')
+                        self.code.append(f'\tmov {result}, edx')
+                elif instr.op == Operator.POW:
+                    if type == Type.REAL:
+                        self.code.append(f'\tmovsd xmm0, {arg1}')
+                        self.code.append(f'\tmovsd xmm1, {arg2}')
+                        self.code.append('\tcall power')
+                        self.code.append(f'\tmovsd {result}, xmm0')
+                    else:
+                        self.code.append(f'\tmov eax, {arg1}')
+                        self.code.append('\tcvtsi2sd xmm0, eax')
+                        self.code.append(f'\tmov eax, {arg2}')
+                        self.code.append('\tcvtsi2sd xmm1, eax')
+                        self.code.append('\tcall power')
+                        self.code.append('\tcvtsd2si eax, xmm0')
                         self.code.append(f'\tmov {result}, eax')
-                    elif instr.op == Operator.DIV:
-                        if type == Type.REAL:
-                            self.code.append(f'\t{self.MOVE[type]} {self.ACC_REG[type]}, {arg1}')
-                            self.code.append(f'\t{self.OP_ARITH[type][instr.op]} {self.ACC_REG[type]}, {arg2}')
-                            self.code.append(f'\t{self.MOVE[result_type]} {result}, {self.ACC_REG[type]}')
-                        else:
-                            self.code.append(f'\tmov eax, {arg1}')
-                            self.code.append('\tcdq')
-                            self.code.append(f'\tmov ecx, {arg2}')
-                            self.code.append('\tidiv ecx')
-                            self.code.append(f'\tmov {result}, eax')
-                    elif instr.op == Operator.MOD:
-                        if type == Type.REAL:
-                            self.code.append(f'\tmovsd xmm0, {arg1}')
-                            self.code.append(f'\tmovsd xmm1, {arg2}')
-                            self.code.append('\tmov eax, 2')
-                            self.code.append('\tcall fmod@PLT')
-                            self.code.append(f'\tmovsd {result}, xmm0')
-                        else:
-                            self.code.append(f'\tmov eax, {arg1}')
-                            self.code.append('\tcdq')
-                            self.code.append(f'\tmov ecx, {arg2}')
-                            self.code.append('\tidiv ecx')
-                            self.code.append(f'\tmov {result}, edx')
-                    elif instr.op == Operator.POW:
-                        if type == Type.REAL:
-                            self.code.append(f'\tmovsd xmm0, {arg1}')
-                            self.code.append(f'\tmovsd xmm1, {arg2}')
-                            self.code.append('\tcall power')
-                            self.code.append(f'\tmovsd {result}, xmm0')
-                        else:
-                            self.code.append(f'\tmov eax, {arg1}')
-                            self.code.append('\tcvtsi2sd xmm0, eax')
-                            self.code.append(f'\tmov eax, {arg2}')
-                            self.code.append('\tcvtsi2sd xmm1, eax')
-                            self.code.append('\tcall power')
-                            self.code.append('\tcvtsd2si eax, xmm0')
-                            self.code.append(f'\tmov {result}, eax')
-
-
 
 
+    # Rotinas de E/S pelo console (printf/scanf), uma chamada por valor
+    CONSOLE_IO = [
+        '# ---------------------------------------------------------',
+        '# Rotina: print_int',
+        '# ---------------------------------------------------------',
+        'print_int:',
+        '    push rbp',
+        '    mov rbp, rsp',
+        '    sub rsp, 16',
+        '    mov esi, edi',
+        '    lea rdi, [rip + fmt_out_int]',
+        '    xor eax, eax',
+        '    call printf',
+        '    leave',
+        '    ret',
+        '',
+        '# ---------------------------------------------------------',
+        '# Rotina: print_double',
+        '# ---------------------------------------------------------',
+        'print_double:',
+        '   push rbp',
+        '   mov rbp, rsp',
+        '   sub rsp, 16                     # Alinhamento de pilha (16 bytes)',
+        '   lea rdi, [rip + fmt_out_double] # Carrega o ponteiro da string de formato',
+        '   mov eax, 1                      # Indica ao printf que existe 1 reg XMM sendo usado (XMM0)',
+        '   call printf',
+        '   leave',
+        '   ret',
+        '',
+        '# ---------------------------------------------------------',
+        '# Rotina: read_int',
+        '# Retorno: eax (o valor lido)',
+        '# ---------------------------------------------------------',
+        'read_int:',
+        '    push rbp',
+        '    mov rbp, rsp',
+        '    sub rsp, 16',
+        '',
+        '    # Exibe o prompt "input: "',
+        '    lea rdi, [rip + str_input_prompt]',
+        '    xor eax, eax',
+        '    call printf@PLT',
+        '    ',
+        '    # Realiza a leitura',
+        '    lea rdi, [rip + fmt_in_int]',
+        '    lea rsi, [rbp - 4]',
+        '    xor eax, eax',
+        '    call scanf@PLT',
+        '',
+        '    mov eax, [rbp - 4]',
+        '    leave',
+        '    ret',
+        '',
+        '# ---------------------------------------------------------',
+        '# Rotina: read_double',
+        '# Retorno: xmm0',
+        '# ---------------------------------------------------------',
+        'read_double:',
+        '    push rbp',
+        '    mov rbp, rsp',
+        '    sub rsp, 16',
+        '',
+        '    # Exibe o prompt "input: "',
+        '    lea rdi, [rip + str_input_prompt]',
+        '    xor eax, eax',
+        '    call printf@PLT',
+        '',
+        '    # Realiza a leitura',
+        '    lea rdi, [rip + fmt_in_double]',
+        '    lea rsi, [rbp - 8]',
+        '    xor eax, eax',
+        '    call scanf@PLT',
+        '',
+        '    movsd xmm0, [rbp - 8]',
+        '    leave',
+        '    ret',
+        '',
+    ]
+
+    # Rotinas de E/S em modo binário: a entrada é a sequência dos valores
+    # lidos em binário (int32 ou double, little-endian, sem separadores) e a
+    # saída, registros de 1 byte de tipo ('i' ou 'd') seguidos do valor. As
+    # duas passam por buffers de 64 KiB, com uma chamada read()/write() por
+    # buffer e não por valor (ver dlc.codegen.binary_io).
+    BINARY_IO = [
+        '# ---------------------------------------------------------',
+        '# Rotina: in_take',
+        '# Argumento: rdi (número de bytes, 4 ou 8)',
+        '# Retorno: rax (endereço dos bytes; zeros no fim da entrada)',
+        '# ---------------------------------------------------------',
+        'in_take:',
+        '    push rbx',
+        '    push r12',
+        '    sub rsp, 8',
+        '    mov rbx, rdi',
+        '.Lin_check:',
+        '    mov rax, [rip + in_len]',
+        '    sub rax, [rip + in_pos]',
+        '    cmp rax, rbx',
+        '    jge .Lin_ready',
+        '    # Move o resto para o início do buffer e lê mais',
+        '    mov r12, rax',
+        '    lea rsi, [rip + in_buf]',
+        '    add rsi, [rip + in_pos]',
+        '    lea rdi, [rip + in_buf]',
+        '    mov rcx, r12',
+        '    rep movsb',
+        '    mov qword ptr [rip + in_pos], 0',
+        '    mov [rip + in_len], r12',
+        '    xor edi, edi',
+        '    lea rsi, [rip + in_buf]',
+        '    add rsi, r12',
+        '    mov edx, 65536',
+        '    sub rdx, r12',
+        '    call read@PLT',
+        '    test rax, rax',
+        '    jle .Lin_eof',
+        '    add [rip + in_len], rax',
+        '    jmp .Lin_check',
+        '.Lin_eof:',
+        '    lea rax, [rip + in_zero]',
+        '    jmp .Lin_done',
+        '.Lin_ready:',
+        '    lea rax, [rip + in_buf]',
+        '    add rax, [rip + in_pos]',
+        '    add [rip + in_pos], rbx',
+        '.Lin_done:',
+        '    add rsp, 8',
+        '    pop r12',
+        '    pop rbx',
+        '    ret',
+        '',
+        '# ---------------------------------------------------------',
+        '# Rotina: out_put',
+        '# Argumentos: rdi (endereço dos bytes), rsi (número de bytes)',
+        '# ---------------------------------------------------------',
+        'out_put:',
+        '    push rbx',
+        '    push r12',
+        '    sub rsp, 8',
+        '    mov rbx, rdi',
+        '    mov r12, rsi',
+        '    mov rax, [rip + out_len]',
+        '    add rax, r12',
+        '    cmp rax, 65536',
+        '    jle .Lout_copy',
+        '    call flush_output',
+        '.Lout_copy:',
+        '    lea rdi, [rip + out_buf]',
+        '    add rdi, [rip + out_len]',
+        '    mov rsi, rbx',
+        '    mov rcx, r12',
+        '    rep movsb',
+        '    add [rip + out_len], r12',
+        '    add rsp, 8',
+        '    pop r12',
+        '    pop rbx',
+        '    ret',
+        '',
+        '# ---------------------------------------------------------',
+        '# Rotina: flush_output (escreve o buffer de saída em stdout)',
+        '# ---------------------------------------------------------',
+        'flush_output:',
+        '    push rbx',
+        '    xor ebx, ebx',
+        '.Lflush_loop:',
+        '    mov rdx, [rip + out_len]',
+        '    sub rdx, rbx',
+        '    jle .Lflush_done',
+        '    mov edi, 1',
+        '    lea rsi, [rip + out_buf]',
+        '    add rsi, rbx',
+        '    call write@PLT',
+        '    test rax, rax',
+        '    jle .Lflush_done',
+        '    add rbx, rax',
+        '    jmp .Lflush_loop',
+        '.Lflush_done:',
+        '    mov qword ptr [rip + out_len], 0',
+        '    pop rbx',
+        '    ret',
+        '',
+        'print_int:',
+        '    sub rsp, 24',
+        "    mov byte ptr [rsp], 'i'",
+        '    mov [rsp + 1], edi',
+        '    mov rdi, rsp',
+        '    mov esi, 5',
+        '    call out_put',
+        '    add rsp, 24',
+        '    ret',
+        '',
+        'print_double:',
+        '    sub rsp, 24',
+        "    mov byte ptr [rsp], 'd'",
+        '    movsd [rsp + 1], xmm0',
+        '    mov rdi, rsp',
+        '    mov esi, 9',
+        '    call out_put',
+        '    add rsp, 24',
+        '    ret',
+        '',
+        'read_int:',
+        '    sub rsp, 8',
+        '    mov edi, 4',
+        '    call in_take',
+        '    mov eax, [rax]',
+        '    add rsp, 8',
+        '    ret',
+        '',
+        'read_double:',
+        '    sub rsp, 8',
+        '    mov edi, 8',
+        '    call in_take',
+        '    movsd xmm0, [rax]',
+        '    add rsp, 8',
+        '    ret',
+        '',
+    ]
+
+    BINARY_IO_DATA = [
+        '\tin_zero: .quad 0',
+        '.section .bss',
+        '\t.lcomm in_buf, 65536',
+        '\t.lcomm out_buf, 65536',
+        '\t.lcomm in_pos, 8',
+        '\t.lcomm in_len, 8',
+        '\t.lcomm out_len, 8',
+    ]
+
+    def _epilogue(self):
         # Epílogo
-        self.code.extend([
-            '\t# finaliza',
-            '\tleave',
-            '\tmov eax, 0',
-            '\tret',
-            '',
-            '# ---------------------------------------------------------',
-            '# Rotina: print_int',
-            '# ---------------------------------------------------------',
-            'print_int:',
-            '    push rbp',
-            '    mov rbp, rsp',
-            '    sub rsp, 16',
-            '    mov esi, edi',
-            '    lea rdi, [rip + fmt_out_int]',
-            '    xor eax, eax',
-            '    call printf',
-            '    leave',
-            '    ret',
-            '',
-            '# ---------------------------------------------------------',
-            '# Rotina: print_double',
-            '# ---------------------------------------------------------',
-            'print_double:',
-            '   push rbp',
-            '   mov rbp, rsp',
-            '   sub rsp, 16                     # Alinhamento de pilha (16 bytes)',
-            '   lea rdi, [rip + fmt_out_double] # Carrega o ponteiro da string de formato',
-            '   mov eax, 1                      # Indica ao printf que existe 1 reg XMM sendo usado (XMM0)',
-            '   call printf',
-            '   leave',
-            '   ret',
-            '',
-            '# ---------------------------------------------------------',
-            '# Rotina: read_int',
-            '# Retorno: eax (o valor lido)',
-            '# ---------------------------------------------------------',
-            'read_int:',
-            '    push rbp',
-            '    mov rbp, rsp',
-            '    sub rsp, 16',
-            '',
-            '    # Exibe o prompt "input: "',
-            '    lea rdi, [rip + str_input_prompt]',
-            '    xor eax, eax',
-            '    call printf@PLT',
-            '    ',
-            '    # Realiza a leitura',
-            '    lea rdi, [rip + fmt_in_int]',
-            '    lea rsi, [rbp - 4]',
-            '    xor eax, eax',
-            '    call scanf@PLT',
-            '',
-            '    mov eax, [rbp - 4]',
-            '    leave',
-            '    ret',
-            '',
-            '# ---------------------------------------------------------',
-            '# Rotina: read_double',
-            '# Retorno: xmm0',
-            '# ---------------------------------------------------------',
-            'read_double:',
-            '    push rbp',
-            '    mov rbp, rsp',
-            '    sub rsp, 16',
-            '',
-            '    # Exibe o prompt "input: "',
-            '    lea rdi, [rip + str_input_prompt]',
-            '    xor eax, eax',
-            '    call printf@PLT',
-            '',
-            '    # Realiza a leitura',
-            '    lea rdi, [rip + fmt_in_double]',
-            '    lea rsi, [rbp - 8]',
-            '    xor eax, eax',
-            '    call scanf@PLT',
-            '',
-            '    movsd xmm0, [rbp - 8]',
-            '    leave',
-            '    ret',            '',
-            '',
+        code = ['\t# finaliza']
+        if self.binary_io:
+            code.append('\tcall flush_output')
+        code.extend(['\tleave', '\tmov eax, 0', '\tret', ''])
+        code.extend(self.BINARY_IO if self.binary_io else self.CONSOLE_IO)
+        code.extend([
             '# ---------------------------------------------------------',
             '# Rotina: power (Calcula XMM0 ^ XMM1)',
             '# ---------------------------------------------------------',
@@ -359,6 +649,75 @@ class X64CodeGenerator():
         ])
 
         for value in self.const_map:
-            self.code.append(f'\t{self.const_map[value]}: .double {value}')
-        
-        self.code.append('\n.section .note.GNU-stack,"",@progbits\n')
\ No newline at end of file
+            code.append(f'\t{self.const_map[value]}: .double {value}')
+        if self.binary_io:
+            code.extend(self.BINARY_IO_DATA)
+
+        code.append('\n.section .note.GNU-stack,"",@progbits\n')
+        return code
+
+
+class X64StreamCodeGenerator(X64CodeGenerator):
+    '''Gerador de código x64 em janelas, para a compilação em fluxo: cada
+    chamada de add_window() recebe as instruções de um trecho do programa
+    (um comando do bloco principal), gera seu código e o descarta.
+
+    Os temporários de variáveis vivem entre janelas e por isso ficam em
+    posições fixas da pilha ([rbp - k]); os demais são alocados a cada janela
+    por varredura linear, com spills numa área de rascunho ([rsp + k])
+    reaproveitada pelas janelas seguintes. Como o tamanho do frame só é
+    conhecido no fim, o corpo vai para um arquivo temporário e close()
+    escreve cabeçalho, corpo e rotinas auxiliares na saída.'''
+
+    def __init__(self, output, binary_io: bool=False):
+        self.binary_io = binary_io
+        self.const_map = {}
+        self.code = []
+        self.location = {}
+        self.__output = output
+        self.__body = tempfile.TemporaryFile('w+')
+        self.__var_location = {}
+        self.__var_size = 0
+        self.__scratch_size = 0
+
+    def add_window(self, instructions: list, var_temps: dict):
+        var_location = self.__var_location
+        for instr in instructions:
+            for arg in (instr.arg1, instr.arg2, instr.result):
+                if arg in var_temps and arg not in var_location:
+                    size = arg.type.size
+                    self.__var_size = (self.__var_size + size - 1) // size * size + size
+                    var_location[arg] = f'[rbp - {self.__var_size}]'
+
+        int_live_ranges, double_live_ranges = LiveRange.compute_live_ranges(instructions)
+        for live_ranges in (int_live_ranges, double_live_ranges):
+            for temp in [temp for temp in live_ranges if temp in var_temps]:
+                del live_ranges[temp]
+        int_alloc = LinearScanRegisterAllocation(int_live_ranges, self.INT_REGISTERS)
+        double_alloc = LinearScanRegisterAllocation(double_live_ranges, self.DOUBLE_REGISTERS)
+
+        # Spills da janela: inteiros a partir de rsp, depois os reais alinhados em 8
+        int_size = int_alloc.spill_count * Type.INT.size
+        double_base = (int_size + 7) // 8 * 8
+        self.__scratch_size = max(self.__scratch_size, double_base + double_alloc.spill_count * Type.REAL.size)
+        self.location = var_location | int_alloc.register_map | double_alloc.register_map
+        for temp, offset in int_alloc.spill_map.items():
+            self.location[temp] = f'[rsp + {offset - Type.INT.size}]'
+        for temp, offset in double_alloc.spill_map.items():
+            self.location[temp] = f'[rsp + {double_base + offset - Type.REAL.size}]'
+
+        self.code = []
+        for instr in instructions:
+            self._emit(instr)
+        self.__body.write('\n'.join(self.code))
+        self.__body.write('\n')
+        self.code = []
+
+    def close(self):
+        frame_size = (self.__var_size + self.__scratch_size + 15) // 16 * 16
+        self.__output.write('\n'.join(self._prologue(frame_size)))
+        self.__output.write('\n')
+        self.__body.seek(0)
+        shutil.copyfileobj(self.__body, self.__output)
+        self.__body.close()
+        self.__output.write('\n'.join(self._epilogue()))
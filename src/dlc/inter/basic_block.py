@@ -1,13 +1,15 @@
 class BasicBlock:
-    
-    __count = -1
 
-    def __init__(self):
-        BasicBlock.__count += 1
-        self.number = BasicBlock.__count
+    # A numeração é feita por compilação (ver IC.new_block)
+    def __init__(self, number: int):
+        self.number = number
         self.instructions = []
         self.successors = []
         self.predecessors = []
+        # Preenchidos por IC.link(): bloco do salto que encerra este bloco e
+        # bloco seguinte quando o salto não é tomado (None: fim do programa)
+        self.target = None
+        self.fallthrough = None
 
     def add_successor(self, bb):
         if bb not in self.successors:
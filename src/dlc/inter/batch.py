@@ -0,0 +1,190 @@
+from dlc.semantic.type import Type
+from dlc.inter.operator import Operator
+from dlc.inter.ic import IC
+import heapq
+import numpy as np
+
+
+class BatchResult:
+    '''Saídas de IC.run_batch(): values[r, k] é o valor do k-ésimo escreva
+    executado na linha r (inteiros e booleanos representados exatamente em
+    float64), reals[r, k] indica se era real e count[r], quantos escreva a
+    linha executou.'''
+
+    def __init__(self, rows: int):
+        self.count = np.zeros(rows, dtype=np.int64)
+        self.values = np.zeros((rows, 0), dtype=np.float64)
+        self.reals = np.zeros((rows, 0), dtype=np.bool_)
+
+    def _write(self, rows, value, real: bool):
+        k = self.count[rows]
+        if len(k) and k.max() >= self.values.shape[1]:
+            grow = max(4, self.values.shape[1])
+            self.values = np.pad(self.values, ((0, 0), (0, grow)))
+            self.reals = np.pad(self.reals, ((0, 0), (0, grow)))
+        self.values[rows, k] = value
+        self.reals[rows, k] = real
+        self.count[rows] = k + 1
+
+    def lines(self, row: int):
+        '''Saída da linha row, formatada como em IC.interpret().'''
+        return [f'output: {value:.4f}' if real else f'output: {int(value)}'
+                for value, real in zip(self.values[row, :self.count[row]], self.reals[row, :self.count[row]])]
+
+
+class BatchInterpreter:
+    '''Executa o TAC de um IC uma única vez para muitas linhas de entrada, com
+    um array NumPy por temporário (int32, float64 ou bool, conforme o tipo).
+    Cada bloco básico guarda a máscara das linhas que esperam executá-lo; o
+    bloco pendente de menor índice em bb_sequence roda para todas elas de uma
+    vez, e o salto no seu fim divide a máscara entre o destino e o
+    fallthrough. Escolher sempre o menor índice faz os caminhos de um
+    se/senao se reencontrarem antes de seguir, e as iterações de um laço
+    andarem juntas enquanto as linhas não divergem.
+
+    Diferenças de IC.interpret(): um temporário inteiro não pode guardar um
+    real (potência de inteiro com expoente negativo é rejeitada), leituras
+    inteiras são ajustadas a 32 bits e variáveis lidas antes de escritas
+    valem zero.'''
+
+    DTYPES = {Type.BOOL: np.bool_, Type.INT: np.int32, Type.REAL: np.float64}
+
+    BINARY = {
+        Operator.SUM: np.add,
+        Operator.SUB: np.subtract,
+        Operator.MUL: np.multiply,
+        Operator.EQ: np.equal,
+        Operator.NE: np.not_equal,
+        Operator.LT: np.less,
+        Operator.LE: np.less_equal,
+        Operator.GT: np.greater,
+        Operator.GE: np.greater_equal,
+    }
+
+    def __init__(self, ic: IC, inputs: dict, rows: int=None):
+        self.ic = ic
+        ic.link()
+        self.inputs = {}
+        for name, column in inputs.items():
+            column = np.asarray(column)
+            self.inputs[name] = column.reshape(len(column), -1) # Uma coluna por leitura
+        sizes = {len(column) for column in self.inputs.values()}
+        if rows is not None:
+            sizes.add(rows)
+        if len(sizes) > 1:
+            raise ValueError(f'Colunas de entrada com tamanhos diferentes: {sorted(sizes)}')
+        self.rows = sizes.pop() if sizes else 1
+        self.reads = {name: np.zeros(self.rows, dtype=np.int64) for name in self.inputs}
+        self.values = [None] * ic.temp_count
+        for instr in ic:
+            for arg in (instr.arg1, instr.arg2, instr.result):
+                if arg.is_temp and self.values[arg.number] is None:
+                    self.values[arg.number] = np.zeros(self.rows, dtype=self.DTYPES[arg.type])
+        self.result = BatchResult(self.rows)
+
+    def run(self):
+        blocks = self.ic.bb_sequence
+        index = {bb: i for i, bb in enumerate(blocks)}
+        pending = [None] * len(blocks) # Máscara de linhas à espera de cada bloco
+        heap = []
+
+        def send(bb, rows):
+            if bb is None or not len(rows):
+                return # Fim do programa para essas linhas
+            i = index[bb]
+            if pending[i] is None:
+                pending[i] = np.zeros(self.rows, dtype=np.bool_)
+                heapq.heappush(heap, i)
+            pending[i][rows] = True
+
+        send(blocks[0], np.arange(self.rows))
+        with np.errstate(over='ignore', invalid='ignore'):
+            while heap:
+                i = heapq.heappop(heap)
+                rows = np.flatnonzero(pending[i])
+                pending[i] = None
+                bb = blocks[i]
+                # Com todas as linhas ativas, fatias em vez de índices: sem cópias
+                where = slice(None) if len(rows) == self.rows else rows
+                jump = None
+                for instr in bb:
+                    if instr.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE):
+                        jump = instr
+                    elif instr.op != Operator.LABEL:
+                        self.__execute(instr, rows, where)
+                if jump is None:
+                    send(bb.fallthrough, rows)
+                elif jump.op == Operator.GOTO:
+                    send(bb.target, rows)
+                else:
+                    cond = self.__get(jump.arg1, where)
+                    if jump.relation is not None:
+                        cond = self.BINARY[jump.relation](cond, self.__get(jump.arg2, where))
+                    taken = np.broadcast_to(cond, rows.shape)
+                    if jump.op == Operator.IFFALSE:
+                        taken = ~taken
+                    send(bb.target, rows[taken])
+                    send(bb.fallthrough, rows[~taken])
+        return self.result
+
+    def __get(self, arg, where):
+        if arg.is_temp:
+            return self.values[arg.number][where]
+        return self.DTYPES[arg.type](arg.value)
+
+    def __execute(self, instr, rows, where):
+        op = instr.op
+        result = instr.result
+        get = self.__get
+        match op:
+            case Operator.PRINT:
+                value = np.broadcast_to(get(instr.arg1, where), rows.shape)
+                self.result._write(rows, value, instr.arg1.type == Type.REAL)
+                return
+            case Operator.READ:
+                value = self.__read(result, rows)
+            case Operator.MOVE | Operator.PLUS:
+                value = get(instr.arg1, where)
+            case Operator.MINUS:
+                value = np.negative(get(instr.arg1, where))
+            case Operator.NOT:
+                value = np.logical_not(get(instr.arg1, where))
+            case Operator.CONVERT:
+                value = np.asarray(get(instr.arg1, where), dtype=np.float64)
+            case Operator.DIV | Operator.MOD:
+                a, b = get(instr.arg1, where), get(instr.arg2, where)
+                if np.any(b == 0):
+                    raise ZeroDivisionError('divisão por zero')
+                if op == Operator.MOD:
+                    value = np.remainder(a, b)
+                elif result.type == Type.REAL:
+                    value = np.true_divide(a, b)
+                else:
+                    value = np.floor_divide(a, b)
+            case Operator.POW:
+                a, b = get(instr.arg1, where), get(instr.arg2, where)
+                if result.type != Type.REAL and np.any(b < 0):
+                    raise ValueError('Potência de inteiro com expoente negativo não é suportada em lote')
+                value = np.power(a, b)
+            case _:
+                value = self.BINARY[op](get(instr.arg1, where), get(instr.arg2, where))
+        self.values[result.number][where] = value
+
+    def __read(self, result, rows):
+        name = self.ic.var_temps.get(result)
+        if name not in self.inputs:
+            raise ValueError(f'Sem valores de entrada para "{name}"')
+        column = self.inputs[name]
+        reads = self.reads[name]
+        k = reads[rows]
+        if len(k) and k.max() >= column.shape[1]:
+            raise ValueError(f'Valores de entrada insuficientes para "{name}"')
+        reads[rows] = k + 1
+        value = column[rows, k]
+        match result.type:
+            case Type.BOOL:
+                return np.trunc(value) != 0 if value.dtype.kind == 'f' else value != 0
+            case Type.INT:
+                return value.astype(np.int64).astype(np.int32) # Trunca como int()
+            case _:
+                return value.astype(np.float64)
@@ -0,0 +1,284 @@
+from dlc.semantic.type import Type
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.inter.basic_block import BasicBlock
+from dlc.inter.console import reader, writer
+
+
+class _Halt(Exception):
+    '''Encerra a execução (entrada de dados inválida).'''
+
+
+class _Console:
+    '''Funções de entrada e saída da execução corrente (ver run()).'''
+    __slots__ = ('read', 'write')
+
+
+class _Block:
+    '''Bloco básico pré-decodificado: ops são as funções das instruções em
+    linha reta; kind é o salto que encerra o bloco (GOTO, IF, IFFALSE ou
+    None), cond, o índice da condição e target/fallthrough, os _Block
+    seguintes resolvidos por IC.link() (None encerra o programa).'''
+    __slots__ = ('ops', 'kind', 'cond', 'target', 'fallthrough')
+
+    def __init__(self):
+        self.ops = []
+        self.kind = None
+        self.cond = None
+        self.target = None
+        self.fallthrough = None
+
+
+class ClosureInterpreter:
+    '''Executa o código de três endereços de um IC como IC.interpret(), mas
+    decodifica cada bloco básico uma única vez numa lista de funções
+    especializadas por operador. Os operandos viram índices numa lista de
+    valores (as constantes também ocupam posições dessa lista, preenchidas
+    de antemão), então a execução não consulta dicionários, não percorre o
+    match de operadores e não usa ctypes para o ajuste a 32 bits.'''
+
+    def __init__(self, ic: IC):
+        self.ic = ic
+        self.__slots = {} # Valor constante -> índice
+        self.__initial = [None] * ic.temp_count
+        self.__console = _Console()
+        ic.link()
+        self.entry = self.__decode(ic.bb_sequence[0]) if ic.bb_sequence else None
+
+    def __slot(self, arg):
+        # Temporários ocupam as posições 0..temp_count-1 (Temp.number) e as
+        # constantes, as seguintes
+        if arg.is_temp:
+            return arg.number
+        if not arg.is_const:
+            return None
+        key = (type(arg.value), arg.value) # Constantes iguais compartilham a posição (True e 1 não)
+        slot = self.__slots.get(key)
+        if slot is None:
+            slot = self.__slots[key] = len(self.__initial)
+            self.__initial.append(arg.value)
+        return slot
+
+    def __decode(self, entry: BasicBlock):
+        # Decodifica entry e, sem recursão, todos os blocos alcançáveis a partir dele
+        blocks = {entry: _Block()}
+        pending = [entry]
+
+        def block_of(bb: BasicBlock):
+            if bb is None:
+                return None
+            if bb not in blocks:
+                blocks[bb] = _Block()
+                pending.append(bb)
+            return blocks[bb]
+
+        while pending:
+            bb = pending.pop()
+            block = blocks[bb]
+            for instr in bb:
+                op = instr.op
+                if op in (Operator.GOTO, Operator.IF, Operator.IFFALSE):
+                    block.kind = op
+                    block.cond = self.__slot(instr.arg1)
+                    if instr.relation is not None:
+                        # A comparação vai para uma posição só dela, lida pelo salto
+                        block.cond = len(self.__initial)
+                        self.__initial.append(None)
+                        block.ops.append(_OPS[instr.relation](self.__slot(instr.arg1), self.__slot(instr.arg2),
+                                                              block.cond))
+                elif op != Operator.LABEL:
+                    block.ops.append(self.__compile(instr))
+            block.target = block_of(bb.target)
+            block.fallthrough = block_of(bb.fallthrough)
+        return blocks[entry]
+
+    def __compile(self, instr):
+        op = instr.op
+        c = self.__slot(instr.result)
+        a = self.__slot(instr.arg1)
+        b = self.__slot(instr.arg2)
+        match op:
+            case Operator.PRINT:
+                return _print(a, self.__console)
+            case Operator.READ:
+                return _read(c, instr.result.type, self.__console)
+            case Operator.MOVE:
+                return _move(a, c)
+            case _:
+                return _OPS[op](a, b, c)
+
+    def run(self, source=None, sink=None):
+        '''source e sink substituem o console (ver dlc.inter.console).'''
+        self.__console.read = reader(source)
+        self.__console.write = writer(sink)
+        values = list(self.__initial)
+        block = self.entry
+        GOTO, IF = Operator.GOTO, Operator.IF
+        try:
+            while block is not None:
+                for op in block.ops:
+                    op(values)
+                kind = block.kind
+                if kind is not None and (kind is GOTO or (values[block.cond] if kind is IF else not values[block.cond])):
+                    block = block.target
+                else:
+                    block = block.fallthrough
+        except _Halt:
+            pass
+
+
+
+# Fábricas das funções de cada instrução: a, b e c são os índices dos
+# operandos e do resultado na lista de valores r
+
+def _move(a, c):
+    def op(r):
+        r[c] = r[a]
+    return op
+
+
+def _print(a, console: _Console):
+    def op(r):
+        console.write(r[a])
+    return op
+
+
+def _read(c, type: Type, console: _Console):
+    convert = {Type.BOOL: lambda i: bool(int(i)), Type.INT: int, Type.REAL: float}.get(type, lambda i: i)
+    def op(r):
+        try:
+            r[c] = convert(console.read())
+        except ValueError:
+            print('Entrada de dados inválida! Interpretação encerrada.')
+            raise _Halt()
+    return op
+
+
+# Os operadores aritméticos conferem a classe do resultado, como IC.operate
+# (um temporário inteiro pode guardar um real, ex.: 2 ^ -1), e ajustam os
+# inteiros a 32 bits com sinal como c_int32(v).value
+def _sum(a, b, c):
+    def op(r):
+        v = r[a] + r[b]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _sub(a, b, c):
+    def op(r):
+        v = r[a] - r[b]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _mul(a, b, c):
+    def op(r):
+        v = r[a] * r[b]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _div(a, b, c):
+    def op(r):
+        x = r[a]
+        v = x / r[b] if isinstance(x, float) else x // r[b]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _mod(a, b, c):
+    def op(r):
+        v = r[a] % r[b]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _pow(a, b, c):
+    def op(r):
+        v = r[a] ** r[b]
+        cls = v.__class__
+        # IC.operate descarta resultados complexos (ex.: -8.0 ^ 0.5)
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if cls is int else v if cls is float else None
+    return op
+
+
+def _eq(a, b, c):
+    def op(r):
+        r[c] = r[a] == r[b]
+    return op
+
+
+def _ne(a, b, c):
+    def op(r):
+        r[c] = r[a] != r[b]
+    return op
+
+
+def _lt(a, b, c):
+    def op(r):
+        r[c] = r[a] < r[b]
+    return op
+
+
+def _le(a, b, c):
+    def op(r):
+        r[c] = r[a] <= r[b]
+    return op
+
+
+def _gt(a, b, c):
+    def op(r):
+        r[c] = r[a] > r[b]
+    return op
+
+
+def _ge(a, b, c):
+    def op(r):
+        r[c] = r[a] >= r[b]
+    return op
+
+
+def _plus(a, b, c):
+    def op(r):
+        v = + r[a]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _minus(a, b, c):
+    def op(r):
+        v = - r[a]
+        r[c] = ((v + 0x80000000) & 0xFFFFFFFF) - 0x80000000 if v.__class__ is int else v
+    return op
+
+
+def _not(a, b, c):
+    def op(r):
+        r[c] = not r[a]
+    return op
+
+
+def _convert(a, b, c):
+    def op(r):
+        r[c] = float(r[a])
+    return op
+
+
+_OPS = {
+    Operator.SUM: _sum,
+    Operator.SUB: _sub,
+    Operator.MUL: _mul,
+    Operator.DIV: _div,
+    Operator.MOD: _mod,
+    Operator.POW: _pow,
+    Operator.EQ: _eq,
+    Operator.NE: _ne,
+    Operator.LT: _lt,
+    Operator.LE: _le,
+    Operator.GT: _gt,
+    Operator.GE: _ge,
+    Operator.PLUS: _plus,
+    Operator.MINUS: _minus,
+    Operator.NOT: _not,
+    Operator.CONVERT: _convert,
+}
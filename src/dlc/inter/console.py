@@ -0,0 +1,31 @@
+def reader(source=None):
+    '''Função sem argumentos que retorna a próxima entrada de um leia: a linha
+    digitada no console, com o prompt "input: ", ou o próximo item de source
+    (qualquer iterável de strings ou números, ex.: uma lista ou as linhas de
+    um arquivo). Como input() no fim da entrada, levanta EOFError quando
+    source se esgota.'''
+    if source is None:
+        return lambda: input('input: ')
+    items = iter(source)
+
+    def read():
+        try:
+            return next(items)
+        except StopIteration:
+            raise EOFError('fim da entrada') from None
+    return read
+
+
+def writer(sink=None):
+    '''Função que recebe o valor de cada escreva: imprime "output: ..." no
+    console (reais com 4 casas, inteiros e booleanos como inteiros) ou, com
+    sink, chama sink(valor) sem formatar nada (ex.: sink=lista.append).'''
+    if sink is not None:
+        return sink
+
+    def write(value):
+        if isinstance(value, float):
+            print(f'output: {value:.4f}')
+        else:
+            print(f'output: {int(value)}')
+    return write
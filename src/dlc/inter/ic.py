@@ -5,6 +5,7 @@ from dlc.inter.operator import Operator
 from dlc.inter.operand import Operand, Temp, Const, Label
 from dlc.inter.instr import Instr
 from dlc.inter.basic_block import BasicBlock
+from dlc.inter.console import reader, writer
 from dlc.tree.nodes import (
     Visitor,
     ProgramNode,
@@ -42,12 +43,17 @@ class IC(Visitor):
         Tag.GE: Operator.GE
     }
 
-    def __init__(self, ast: AST):
+    def __init__(self, ast: AST=None):
         self.__var_temp_map = {}
         self.__label_bb_map = {}
         self.__comments = {}
-        self.bb_sequence = [BasicBlock()]
-        ast.root.accept(self)
+        self.__temp_count = 0
+        self.__label_count = 0
+        self.__block_count = 0
+        self.bb_sequence = [self.new_block()]
+        self.var_temps = {} # Temporários que representam variáveis do programa -> nome
+        if ast is not None:
+            self.visit(ast.root)
 
     def __iter__(self):
         for bb in self.bb_sequence:
@@ -63,11 +69,82 @@ class IC(Visitor):
     
 
 
+    # Temporários, rótulos e blocos são numerados por compilação, e não
+    # globalmente, para que o resultado não dependa do que mais foi compilado
+    # no mesmo processo
+    def new_temp(self, type: Type):
+        self.__temp_count += 1
+        return Temp(type, self.__temp_count - 1)
+
+    @property
+    def temp_count(self):
+        return self.__temp_count
+
+    def new_label(self):
+        self.__label_count += 1
+        return Label(self.__label_count - 1)
+
+    def new_block(self):
+        self.__block_count += 1
+        return BasicBlock(self.__block_count - 1)
+
+    def label_of(self, bb):
+        '''Rótulo do início de bb, criado se o bloco ainda não tiver um.'''
+        if bb.instructions and bb.instructions[0].op == Operator.LABEL:
+            return bb.instructions[0].result
+        label = self.new_label()
+        bb.instructions.insert(0, Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, label))
+        return label
+
+    def flush(self):
+        '''Retira e retorna as instruções geradas até aqui, começando um novo
+        bloco básico. Usado na compilação em fluxo, em que cada comando do
+        bloco principal é visitado e descarregado antes do próximo: os saltos
+        nunca cruzam comandos, então os rótulos antigos podem ser esquecidos.'''
+        instructions = list(self)
+        self.bb_sequence = [self.new_block()]
+        self.__label_bb_map.clear()
+        self.__comments.clear()
+        return instructions
+
     def __bb_from_label(self, label):
         if label not in self.__label_bb_map:
-            self.__label_bb_map[label] = BasicBlock()
+            self.__label_bb_map[label] = self.new_block()
         return self.__label_bb_map[label]
 
+    def link(self):
+        '''Resolve, antes da execução, o destino do salto no fim de cada bloco
+        (bb.target) e o bloco seguinte quando ele não é tomado
+        (bb.fallthrough). Os rótulos são procurados nas instruções LABEL dos
+        blocos atuais, e não no mapa montado durante a geração, que fica
+        desatualizado quando a otimização funde ou remove blocos; pela mesma
+        razão, o fallthrough é o sucessor que não é o destino do salto,
+        qualquer que seja a ordem de bb.successors.'''
+        labels = {}
+        for bb in self.bb_sequence:
+            for instr in bb:
+                if instr.op == Operator.LABEL:
+                    labels[instr.result] = bb
+        self.__label_bb_map = labels
+
+        jumps = (Operator.GOTO, Operator.IF, Operator.IFFALSE)
+        for bb in self.bb_sequence:
+            for instr in bb.instructions[:-1]:
+                if instr.op in jumps:
+                    raise ValueError(f'{bb}: "{instr}" no meio do bloco')
+            last = bb.instructions[-1] if bb.instructions else None
+            if last is None or last.op not in jumps:
+                bb.target = None
+                bb.fallthrough = bb.successors[-1] if bb.successors else None
+                continue
+            # Um rótulo sem bloco encerra o programa, como um bloco vazio
+            bb.target = labels.get(last.result)
+            if last.op == Operator.GOTO:
+                bb.fallthrough = None
+            else:
+                others = [s for s in bb.successors if s is not bb.target]
+                bb.fallthrough = others[-1] if others else bb.target
+
 
 
     def add_instr(self, instr: Instr, comment: str=None):
@@ -89,7 +166,7 @@ class IC(Visitor):
 
         # Se a anterior foi um salto, a instrução ATUAL (não sendo label) precisa de um novo bloco
         elif instr_prev and instr_prev.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE):
-            bb_new = BasicBlock()
+            bb_new = self.new_block()
             # Se era um IF, o bloco novo é o caminho "falso" (fall-through)
             if instr_prev.op != Operator.GOTO:
                 bb.add_successor(bb_new)
@@ -108,18 +185,38 @@ class IC(Visitor):
 
 
 
-    def plot(self):
+    def graph(self, profile=None):
+        '''Grafo de fluxo (graphviz.Digraph). Com profile (ver
+        dlc.inter.profile), sobrepõe as contagens: execuções no rótulo de
+        cada bloco, com cor mais quente nos mais executados, e vezes
+        percorrida em cada aresta, com espessura proporcional.'''
         from graphviz import Digraph
         dot = Digraph()
         dot.attr(fontname="consolas")
+        hottest = max(profile.block_counts.values(), default=0) if profile else 0
+        widest = max(profile.edge_counts.values(), default=0) if profile else 0
         for bb in self.bb_sequence:
             code = [str(i) for i in bb]
-            dot.node(name=str(bb), label='\n'.join(code), shape="box", xlabel=str(bb))
+            if profile is None:
+                dot.node(name=str(bb), label='\n'.join(code), shape="box", xlabel=str(bb))
+            else:
+                count = profile.count(bb.number)
+                heat = count / hottest if hottest else 0.0
+                dot.node(name=str(bb), label='\n'.join(code), shape="box", xlabel=f'{bb} ({count}x)',
+                         style='filled', fillcolor=f'0.000 {heat:.3f} 1.000')
             for s in bb.successors:
-                dot.edge(str(bb), str(s))
+                if profile is None:
+                    dot.edge(str(bb), str(s))
+                else:
+                    count = profile.edge_count(bb.number, s.number)
+                    width = 1 + 4 * count / widest if widest else 1
+                    dot.edge(str(bb), str(s), label=str(count), penwidth=f'{width:.2f}')
             #for s in bb.predecessors:
             #    dot.edge(str(bb), str(s), color="red")
-        dot.render('out/teste_fluxo', view=True) 
+        return dot
+
+    def plot(self, profile=None):
+        self.graph(profile).render('out/teste_fluxo', view=True) 
 
 
 
@@ -139,12 +236,12 @@ class IC(Visitor):
 
 
     def visit_program_node(self, node: ProgramNode):
-        node.stmt.accept(self)
+        yield node.stmt
     
 
     def visit_block_node(self, node: BlockNode):
         for stmt in node.stmts:
-            stmt.accept(self)
+            yield stmt
         
     
     def visit_decl_node(self, node: DeclNode):
@@ -152,13 +249,14 @@ class IC(Visitor):
         
 
     def visit_assign_node(self, node: AssignNode):
-        arg = node.expr.accept(self)
+        arg = yield node.expr
 
         if (node.var.name, node.var.scope) not in self.__var_temp_map:
-            temp = Temp(node.var.type)
+            temp = self.new_temp(node.var.type)
             self.__var_temp_map[(node.var.name, node.var.scope)] = temp
+            self.var_temps[temp] = node.var.name
         
-        temp = node.var.accept(self)
+        temp = yield node.var
         comment = f'var {node.var.name} [scope={node.var.scope}]'
         self.add_instr(Instr(Operator.MOVE, arg, Operand.EMPTY, temp), comment)
 
@@ -174,8 +272,8 @@ class IC(Visitor):
 
 
     def visit_convert_node(self, node: ConvertNode):
-        arg = node.expr.accept(self)
-        temp = Temp(node.type)
+        arg = yield node.expr
+        temp = self.new_temp(node.type)
         self.add_instr(Instr(Operator.CONVERT, arg, Operand.EMPTY, temp))        
         return temp
 
@@ -185,15 +283,15 @@ class IC(Visitor):
         
         if node.token.tag == Tag.OR:
             #labels
-            lbl_true = Label()
-            lbl_false = Label()
-            lbl_end = Label()
-            temp = Temp(Type.BOOL)
+            lbl_true = self.new_label()
+            lbl_false = self.new_label()
+            lbl_end = self.new_label()
+            temp = self.new_temp(Type.BOOL)
 
             #tests
-            arg1 = node.expr1.accept(self)
+            arg1 = yield node.expr1
             self.add_instr(Instr(Operator.IF, arg1, EMPTY, lbl_true))
-            arg2 = node.expr2.accept(self)
+            arg2 = yield node.expr2
             self.add_instr(Instr(Operator.IF, arg2, EMPTY, lbl_true))
             self.add_instr(Instr(Operator.GOTO, EMPTY, EMPTY, lbl_false))
             #true
@@ -209,15 +307,15 @@ class IC(Visitor):
         
         elif node.token.tag == Tag.AND:
             #labels
-            lbl_false = Label()
-            lbl_true = Label()
-            lbl_end = Label()
-            temp = Temp(Type.BOOL)
+            lbl_false = self.new_label()
+            lbl_true = self.new_label()
+            lbl_end = self.new_label()
+            temp = self.new_temp(Type.BOOL)
 
             #tests
-            arg1 = node.expr1.accept(self)
+            arg1 = yield node.expr1
             self.add_instr(Instr(Operator.IFFALSE, arg1, EMPTY, lbl_false))
-            arg2 = node.expr2.accept(self)
+            arg2 = yield node.expr2
             self.add_instr(Instr(Operator.IFFALSE, arg2, EMPTY, lbl_false))
                 #self.add_instr(Instr(Operator.GOTO, EMPTY, EMPTY, lbl_true))
             #true
@@ -231,9 +329,9 @@ class IC(Visitor):
             #end
             self.add_instr(Instr(Operator.LABEL, EMPTY, EMPTY, lbl_end))            
         else:
-            arg1 = node.expr1.accept(self)
-            arg2 = node.expr2.accept(self)
-            temp = Temp(node.type)              
+            arg1 = yield node.expr1
+            arg2 = yield node.expr2
+            temp = self.new_temp(node.type)              
             self.add_instr(Instr(IC.__OP_MAP[node.operator], arg1, arg2, temp))
         
         return temp
@@ -242,8 +340,8 @@ class IC(Visitor):
 
 
     def visit_unary_node(self, node: UnaryNode):
-        arg = node.expr.accept(self)
-        temp = Temp(node.type)
+        arg = yield node.expr
+        temp = self.new_temp(node.type)
         
         match node.token.tag:
             case Tag.SUM:
@@ -259,57 +357,58 @@ class IC(Visitor):
 
 
     def visit_if_node(self, node: IfNode):
-        arg = node.expr.accept(self)
-        lbl_out = Label()
+        arg = yield node.expr
+        lbl_out = self.new_label()
         #test
         self.add_instr(Instr(Operator.IFFALSE, arg, Operand.EMPTY, lbl_out))
         #true
-        node.stmt.accept(self)
+        yield node.stmt
         #out
         self.add_instr(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, lbl_out))
 
 
     def visit_else_node(self, node: ElseNode):
-        arg = node.expr.accept(self)
-        lbl_else = Label()
-        lbl_out = Label()
+        arg = yield node.expr
+        lbl_else = self.new_label()
+        lbl_out = self.new_label()
         #test
         self.add_instr(Instr(Operator.IFFALSE, arg, Operand.EMPTY, lbl_else))
         #if-stmt
-        node.stmt1.accept(self)
+        yield node.stmt1
         self.add_instr(Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY, lbl_out))
         #else-stmt
         self.add_instr(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, lbl_else))
-        node.stmt2.accept(self)
+        yield node.stmt2
         #out
         self.add_instr(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, lbl_out))
 
 
 
     def visit_while_node(self, node: WhileNode):
-        lbl_begin = Label()
-        lbl_end = Label()
+        lbl_begin = self.new_label()
+        lbl_end = self.new_label()
         #test
         self.add_instr(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, lbl_begin))
-        arg = node.expr.accept(self)
+        arg = yield node.expr
         self.add_instr(Instr(Operator.IFFALSE, arg, Operand.EMPTY, lbl_end))
         #true
-        node.stmt.accept(self)
+        yield node.stmt
         self.add_instr(Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY, lbl_begin))
         #end
         self.add_instr(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, lbl_end))
 
     
     def visit_write_node(self, node: WriteNode):
-        arg = node.expr.accept(self)
+        arg = yield node.expr
         self.add_instr(Instr(Operator.PRINT, arg, Operand.EMPTY, Operand.EMPTY))
 
 
     def visit_read_node(self, node: ReadNode):
         if (node.var.name, node.var.scope) not in self.__var_temp_map:
-            temp = Temp(node.var.type)
+            temp = self.new_temp(node.var.type)
             self.__var_temp_map[(node.var.name, node.var.scope)] = temp
-        temp = node.var.accept(self)
+            self.var_temps[temp] = node.var.name
+        temp = yield node.var
         self.add_instr(Instr(Operator.READ, Operand.EMPTY, Operand.EMPTY, temp))
 
 
@@ -359,72 +458,98 @@ class IC(Visitor):
         elif isinstance(value, float):
             return c_double(value).value
 
-    def interpret(self):
-        vars = {}
-                
-        def get_value(arg):
-            if arg.is_temp:
-                return vars[arg]
-            if arg.is_const:
-                return arg.value
+    def run_batch(self, inputs: dict, rows: int=None):
+        '''Executa o TAC uma vez para muitas entradas: inputs associa o nome de
+        cada variável lida a um array com um valor por linha (ou uma coluna
+        por leitura, se a variável é lida mais de uma vez). Retorna um
+        BatchResult com as saídas de cada linha. Requer NumPy (ver
+        dlc.inter.batch).'''
+        from dlc.inter.batch import BatchInterpreter
+        return BatchInterpreter(self, inputs, rows).run()
+
+    def interpret(self, registers: bool=True, source=None, sink=None, profile=None):
+        '''Executa o TAC. Com registers, os valores dos temporários ficam numa
+        lista pré-alocada indexada por Temp.number (um banco de registradores),
+        e não num dicionário indexado pelos próprios Temp. source e sink
+        substituem o console na entrada e na saída (ver dlc.inter.console).
+        Com profile (um dlc.inter.profile.Profile), conta as execuções de
+        cada bloco e de cada aresta e mede o tempo gasto em cada bloco.'''
+        read = reader(source)
+        write = writer(sink)
+        if registers:
+            vars = [None] * self.__temp_count
+
+            def get_value(arg):
+                cls = arg.__class__
+                if cls is Temp:
+                    return vars[arg.number]
+                if cls is Const:
+                    return arg.value
+        else:
+            vars = {}
+
+            def get_value(arg):
+                if arg.is_temp:
+                    return vars[arg]
+                if arg.is_const:
+                    return arg.value
 
+        self.link()
+        if profile is not None:
+            profile.start(self)
         bb = self.bb_sequence[0]
-        while bb:
-            next_bb = None
-            for instr in bb:
-                op = instr.op
-                result = instr.result
-                value1 = get_value(instr.arg1)
-                value2 = get_value(instr.arg2)
+        try:
+            while bb:
+                if profile is not None:
+                    profile.enter(bb)
+                for instr in bb:
+                    op = instr.op
+                    result = instr.result
+                    value1 = get_value(instr.arg1)
+                    value2 = get_value(instr.arg2)
+                    dest = result.number if registers and result.__class__ is Temp else result
                 
-                match op:
-                    case Operator.LABEL:
-                        continue
-                    case Operator.IF:
-                        if value1:                    
-                            next_bb = self.__bb_from_label(result)
-                            break
-                    case Operator.IFFALSE:
-                        if not value1:
-                            next_bb =  self.__bb_from_label(result)
+                    match op:
+                        case Operator.LABEL:
+                            continue
+                        case Operator.IF:
+                            if value1 if instr.relation is None else IC.operate(instr.relation, value1, value2):
+                                break
+                        case Operator.IFFALSE:
+                            if not (value1 if instr.relation is None else IC.operate(instr.relation, value1, value2)):
+                                break
+                        case Operator.GOTO:
                             break
-                    case Operator.GOTO:
-                        next_bb = self.__bb_from_label(result)
-                        break
-                    case Operator.PRINT:
-                        if isinstance(value1, float):
-                            print(f'output: {value1:.4f}')
-                        else:
-                            print(f'output: {int(value1)}')
-                    case Operator.READ:
-                        try:
-                            i = input('input: ')
-                            match result.type:
-                                case Type.BOOL:
-                                    i = bool(int(i))
-                                case Type.INT:
-                                    i = int(i)
-                                case Type.REAL:
-                                    i = float(i)
-                            vars[result] = i
-                        except ValueError:
-                            print('Entrada de dados inválida! Interpretação encerrada.')
-                            return
-                    case Operator.CONVERT | Operator.PLUS | Operator.MINUS | Operator.NOT:
-                        vars[result] = IC.operate_unary(op, value1)
-                    case Operator.MOVE:
-                        vars[result] = value1
-                    case _:
-                        vars[result] = IC.operate(op, value1, value2)
-
-
-            #TRANSIÇÃO DE BLOCOS
-            if next_bb:
-                bb = next_bb
-            else:
-                if not bb.successors:
-                    bb = None # Fim do programa
-                elif len(bb.successors) == 1:
-                    bb = bb.successors[0]
+                        case Operator.PRINT:
+                            write(value1)
+                        case Operator.READ:
+                            try:
+                                i = read()
+                                match result.type:
+                                    case Type.BOOL:
+                                        i = bool(int(i))
+                                    case Type.INT:
+                                        i = int(i)
+                                    case Type.REAL:
+                                        i = float(i)
+                                vars[dest] = i
+                            except ValueError:
+                                print('Entrada de dados inválida! Interpretação encerrada.')
+                                if profile is not None:
+                                    profile.halt(bb, bb.instructions.index(instr))
+                                return
+                        case Operator.CONVERT | Operator.PLUS | Operator.MINUS | Operator.NOT:
+                            vars[dest] = IC.operate_unary(op, value1)
+                        case Operator.MOVE:
+                            vars[dest] = value1
+                        case _:
+                            vars[dest] = IC.operate(op, value1, value2)
+
                 else:
-                    bb = bb.successors[-1]
+                    #TRANSIÇÃO DE BLOCOS (destinos resolvidos por link())
+                    bb = bb.fallthrough
+                    continue
+                bb = bb.target
+        finally:
+            if profile is not None:
+                profile.stop()
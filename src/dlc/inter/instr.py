@@ -2,11 +2,17 @@ from dlc.inter.operator import Operator
 from dlc.inter.operand import Operand
 
 class Instr:
-    def __init__(self, op: Operator, arg1: Operand, arg2: Operand, result: Operand):
+    def __init__(self, op: Operator, arg1: Operand, arg2: Operand, result: Operand, sources: dict=None,
+                 relation: Operator=None):
         self.op = op
         self.arg1 = arg1
         self.arg2 = arg2
         self.result = result
+        # PHI: bloco predecessor -> operando que chega por ele
+        self.sources = sources
+        # IF/IFFALSE com comparação embutida: a condição é arg1 relation arg2
+        # (ver dlc.opt.simplify), e não o valor de arg1
+        self.relation = relation
             
     def __str__(self):
         op = self.op
@@ -19,6 +25,8 @@ class Instr:
                 return f'{result} {op} {arg1}'
             case Operator.LABEL: 
                 return f'{result}:'
+            case Operator.IF | Operator.IFFALSE if self.relation is not None:
+                return f'{op} {arg1} {self.relation} {arg2} {Operator.GOTO} {result}'
             case Operator.IF | Operator.IFFALSE: 
                 return f'{op} {arg1} {Operator.GOTO} {result}'
             case Operator.GOTO: 
@@ -29,6 +37,9 @@ class Instr:
                 return f'{op} {arg1}'
             case Operator.READ:
                 return f'{op} {result}'
+            case Operator.PHI:
+                args = ', '.join(f'{bb}: {arg}' for bb, arg in self.sources.items())
+                return f'{result} {Operator.MOVE} {op}({args})'
             case _: 
                 return f'{result} {Operator.MOVE} {arg1} {op} {arg2}'
 
@@ -3,6 +3,8 @@ from dlc.semantic.type import Type
 
 
 class Operand(ABC):
+    __slots__ = ()
+
     @property
     def is_temp(self): return False
 
@@ -19,11 +21,13 @@ class Operand(ABC):
 
 
 class Temp(Operand):
-    __count = -1
-    
-    def __init__(self, type: Type):
-        Temp.__count = Temp.__count + 1
-        self.number = Temp.__count
+    # A numeração é feita por compilação (ver IC.new_temp) e é densa: os
+    # temporários de um IC são t0..t{IC.temp_count - 1}, então number serve
+    # de índice numa lista de valores
+    __slots__ = ('number', 'type')
+
+    def __init__(self, type: Type, number: int):
+        self.number = number
         self.type = type
     
     @property
@@ -43,6 +47,8 @@ class Temp(Operand):
 
 
 class Const(Operand):
+    __slots__ = ('type', 'value')
+
     def __init__(self, type: Type, value):
         self.type = type
         self.value = value
@@ -62,12 +68,12 @@ class Const(Operand):
 
 
 class Label(Operand):
-    __count = -1
-    
-    def __init__(self):
+    # A numeração é feita por compilação (ver IC.new_label)
+    __slots__ = ('number',)
+
+    def __init__(self, number: int):
         super().__init__()
-        Label.__count += 1
-        self.number = Label.__count
+        self.number = number
 
     @property
     def is_label(self):
@@ -86,6 +92,8 @@ class Label(Operand):
 
 
 class Empty(Operand):
+    __slots__ = ()
+
     def __str__(self):
         return '<ic_empty>'
     
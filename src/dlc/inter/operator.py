@@ -25,6 +25,7 @@ class Operator(Enum):
     PLUS = 'plus'
     MINUS = 'minus'
     NOT = 'not'
+    PHI = 'phi'     # Só na forma SSA (ver dlc.opt.ssa)
     
 
     def __str__(self):
@@ -0,0 +1,171 @@
+from time import perf_counter
+import hashlib
+import json
+
+
+class Profile:
+    '''Perfil de execução colhido por IC.interpret(profile=...): quantas vezes
+    cada bloco básico e cada instrução executou, quantas vezes cada aresta
+    (origem, destino) entre blocos foi percorrida e o tempo de relógio gasto
+    em cada bloco (da entrada nele até a entrada no seguinte). Os blocos são
+    identificados pelo número (BasicBlock.number), que é o mesmo a cada
+    compilação do mesmo fonte, então o perfil pode ser salvo em JSON e usado
+    por compilações seguintes (ex.: na disposição dos blocos do código x64).
+    Execuções sucessivas com o mesmo Profile acumulam as contagens.'''
+
+    VERSION = 1
+
+    def __init__(self):
+        self.fingerprint = None # Identifica o TAC perfilado (ver matches())
+        self.runs = 0
+        self.block_counts = {}  # Número do bloco -> execuções
+        self.block_times = {}   # Número do bloco -> segundos
+        self.edge_counts = {}   # (origem, destino) -> vezes percorrida
+        self.instructions = {}  # Número do bloco -> texto das instruções
+        self.halts = {}         # Número do bloco -> índices das leituras que encerraram a execução
+        self.__current = None
+        self.__start = 0.0
+
+    @staticmethod
+    def fingerprint_of(ic):
+        '''Hash do TAC (blocos e instruções, sem comentários) de ic.'''
+        digest = hashlib.sha256()
+        for bb in ic.bb_sequence:
+            digest.update(f'{bb}\n'.encode())
+            for instr in bb:
+                digest.update(f'{instr}\n'.encode())
+        return digest.hexdigest()
+
+    def matches(self, ic):
+        '''Indica se o perfil foi colhido sobre o mesmo TAC de ic.'''
+        return self.fingerprint == Profile.fingerprint_of(ic)
+
+    # Chamados por IC.interpret()
+
+    def start(self, ic):
+        fingerprint = Profile.fingerprint_of(ic)
+        if self.fingerprint is None:
+            self.fingerprint = fingerprint
+            for bb in ic.bb_sequence:
+                self.instructions[bb.number] = [str(instr) for instr in bb]
+        elif self.fingerprint != fingerprint:
+            raise ValueError('O perfil foi colhido sobre outro código intermediário')
+        self.runs += 1
+        self.__current = None
+
+    def enter(self, bb):
+        now = perf_counter()
+        number = bb.number
+        current = self.__current
+        if current is not None:
+            self.block_times[current] = self.block_times.get(current, 0.0) + now - self.__start
+            edge = (current, number)
+            self.edge_counts[edge] = self.edge_counts.get(edge, 0) + 1
+        self.block_counts[number] = self.block_counts.get(number, 0) + 1
+        self.__current = number
+        self.__start = now
+
+    def halt(self, bb, index: int):
+        self.halts.setdefault(bb.number, []).append(index)
+
+    def stop(self):
+        current = self.__current
+        if current is not None:
+            self.block_times[current] = self.block_times.get(current, 0.0) + perf_counter() - self.__start
+        self.__current = None
+
+    # Consultas
+
+    def count(self, number: int):
+        return self.block_counts.get(number, 0)
+
+    def edge_count(self, source: int, target: int):
+        return self.edge_counts.get((source, target), 0)
+
+    @property
+    def instr_counts(self):
+        '''Número do bloco -> execuções de cada instrução: as do bloco, menos
+        aquelas que ficaram depois de uma leitura inválida.'''
+        counts = {}
+        for number, texts in self.instructions.items():
+            executed = self.block_counts.get(number, 0)
+            halts = self.halts.get(number, ())
+            counts[number] = [executed - sum(1 for h in halts if h < i) for i in range(len(texts))]
+        return counts
+
+    @property
+    def total_time(self):
+        return sum(self.block_times.values())
+
+    def report(self, limit: int=10):
+        '''Relatório em texto: blocos em ordem decrescente de execuções, as
+        arestas e as instruções mais executadas (até limit de cada).'''
+        instr_counts = self.instr_counts
+        total_time = self.total_time
+        total_instr = sum(sum(counts) for counts in instr_counts.values())
+        lines = [f'Perfil: {self.runs} execução(ões), {sum(self.block_counts.values())} blocos '
+                 f'e {total_instr} instruções executados em {total_time * 1000:.3f} ms',
+                 '',
+                 f'{"bloco":<8}{"execuções":>12}{"instruções":>12}{"tempo (ms)":>12}{"% tempo":>9}']
+        blocks = sorted(self.instructions, key=lambda n: (-self.count(n), n))
+        for number in blocks:
+            time = self.block_times.get(number, 0.0)
+            share = 100 * time / total_time if total_time else 0.0
+            lines.append(f'{"bb" + str(number):<8}{self.count(number):>12}{sum(instr_counts[number]):>12}'
+                         f'{time * 1000:>12.3f}{share:>9.1f}')
+
+        lines += ['', 'Arestas mais percorridas:']
+        edges = sorted(self.edge_counts.items(), key=lambda item: (-item[1], item[0]))
+        for (source, target), count in edges[:limit]:
+            lines.append(f'   bb{source} -> bb{target}: {count}')
+
+        lines += ['', 'Instruções mais executadas:']
+        instrs = sorted(((count, number, i) for number, counts in instr_counts.items()
+                         for i, count in enumerate(counts) if count),
+                        key=lambda item: (-item[0], item[1], item[2]))
+        for count, number, i in instrs[:limit]:
+            lines.append(f'   {count:>10}  bb{number}[{i}]  {self.instructions[number][i]}')
+        return '\n'.join(lines)
+
+    # Persistência
+
+    def to_json(self):
+        return {
+            'version': Profile.VERSION,
+            'fingerprint': self.fingerprint,
+            'runs': self.runs,
+            'blocks': {str(number): {'count': self.count(number),
+                                     'time': self.block_times.get(number, 0.0),
+                                     'instructions': texts,
+                                     'halts': self.halts.get(number, [])}
+                       for number, texts in self.instructions.items()},
+            'edges': [[source, target, count] for (source, target), count in self.edge_counts.items()],
+        }
+
+    @staticmethod
+    def from_json(data: dict):
+        if data.get('version') != Profile.VERSION:
+            raise ValueError(f'Versão de perfil não suportada: {data.get("version")}')
+        profile = Profile()
+        profile.fingerprint = data['fingerprint']
+        profile.runs = data['runs']
+        for key, block in data['blocks'].items():
+            number = int(key)
+            profile.instructions[number] = block['instructions']
+            if block['count']:
+                profile.block_counts[number] = block['count']
+            if block['time']:
+                profile.block_times[number] = block['time']
+            if block['halts']:
+                profile.halts[number] = block['halts']
+        profile.edge_counts = {(source, target): count for source, target, count in data['edges']}
+        return profile
+
+    def save(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.to_json(), file, indent=1)
+
+    @staticmethod
+    def load(path: str):
+        with open(path) as file:
+            return Profile.from_json(json.load(file))
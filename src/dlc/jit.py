@@ -0,0 +1,74 @@
+from dlc.lex.mmap_lexer import MmapLexer
+from dlc.opt.global_opt import optimize
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.codegen.python_codegen import PythonCodeGenerator
+from pathlib import Path
+import functools
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+
+@functools.cache
+def compiler_digest():
+    '''Hash dos fontes do pacote dlc: qualquer mudança no compilador (na
+    otimização ou na geração de código) invalida o cache.'''
+    package = Path(__file__).parent
+    digest = hashlib.sha256()
+    for path in sorted(package.rglob('*.py')):
+        digest.update(path.relative_to(package).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def cache_key(source: bytes):
+    '''Chave do cache: hash do fonte DL, dos fontes do compilador e da versão
+    do bytecode do Python (objetos de código só valem para a mesma versão).'''
+    digest = hashlib.sha256()
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(compiler_digest())
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def load(code):
+    '''Executa o objeto de código de um módulo gerado e retorna sua run().'''
+    namespace = {}
+    exec(code, namespace)
+    return namespace['run']
+
+
+def compile_file(path: str, cache_dir: str=None):
+    '''Compila o programa DL em path (com otimização global) para uma função
+    Python run() que o executa como IC.interpret(). Com cache_dir, o objeto
+    de código é guardado em disco, indexado pelo hash do fonte, e as
+    compilações seguintes do mesmo fonte não passam pelo compilador (nem
+    repetem seus avisos). Retorna None se houve erros no programa.'''
+    source = Path(path).read_bytes()
+    cache_file = Path(cache_dir) / f'{cache_key(source)}.code' if cache_dir else None
+    if cache_file is not None and cache_file.exists():
+        try:
+            return load(marshal.loads(cache_file.read_bytes()))
+        except (EOFError, ValueError, TypeError):
+            pass # Entrada corrompida: recompila e sobrescreve
+
+    with open(path, 'rb') as source_file, MmapLexer(source_file) as lexer:
+        parser = Parser(lexer)
+    if parser.had_errors or Checker(parser.ast).had_errors:
+        return None
+    ic = IC(parser.ast)
+    optimize(ic)
+    code = compile(PythonCodeGenerator(ic).source, str(path), 'exec')
+
+    if cache_file is not None:
+        # Escreve num arquivo temporário e renomeia: processos concorrentes
+        # nunca veem uma entrada pela metade
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as temp_file:
+            marshal.dump(code, temp_file)
+        os.replace(temp_name, cache_file)
+    return load(code)
@@ -1,11 +1,13 @@
 from dlc.lex.tag import Tag
 from dlc.lex.token import Token
+from dlc.lex.string_table import StringTable
 
 class Lexer:
     EOF_CHAR = ''
 
-    def __init__(self, input_stream):
+    def __init__(self, input_stream, strings: StringTable=None):
         self.__input = input_stream
+        self.strings = strings if strings is not None else StringTable()
         self.line = 1
         self.peek = ' '
         #Keywords
@@ -138,21 +140,21 @@ class Lexer:
                         lex += self.peek
                         next_char()
                     if self.peek != '.':
-                        return Token(self.line, Tag.LIT_INT, lex)
+                        return Token(self.line, Tag.LIT_INT, self.strings.intern(lex))
                     
                     while True:
                         lex += self.peek
                         next_char()
                         if not self.peek.isdigit():
                             break
-                    return Token(self.line, Tag.LIT_REAL, lex)
+                    return Token(self.line, Tag.LIT_REAL, self.strings.intern(lex))
                 elif ( self.peek.isalpha() or self.peek == '_' ):
                     while( self.peek.isalnum() or self.peek == '_' ):
                         lex += self.peek
                         next_char()
                     if ( lex in self.__words ):
                         return Token(self.line, self.__words[lex])
-                    return Token(self.line, Tag.ID, lex)
+                    return Token(self.line, Tag.ID, self.strings.intern(lex))
 
         unk = self.peek
         next_char()
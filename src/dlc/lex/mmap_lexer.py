@@ -0,0 +1,108 @@
+import mmap
+import re
+from dlc.lex.tag import Tag
+from dlc.lex.token import Token
+from dlc.lex.string_table import StringTable
+from dlc.lex.regex_lexer import RegexLexer
+
+
+class MmapLexer:
+    '''Variante do RegexLexer que varre os bytes de um mapeamento em memória
+    (mmap) do arquivo fonte, sem carregá-lo para um str. Apenas os lexemas de
+    nomes e literais são decodificados. A codificação deve ser compatível com
+    ASCII (ex.: UTF-8), como é o caso dos arquivos lidos por open().'''
+
+    KEYWORDS = {k.encode(): tag for k, tag in RegexLexer.KEYWORDS.items()}
+    OPERATORS = {k.encode(): tag for k, tag in RegexLexer.OPERATORS.items()}
+    # Sem o modo texto, \r e \r\n não viram \n: o comentário de linha também
+    # termina no \r, como no arquivo lido por open()
+    TOKEN_RE = re.compile(RegexLexer.TOKEN_RE.pattern.replace(r'//[^\n]*', r'//[^\r\n]*').encode(),
+                          re.DOTALL | re.VERBOSE)
+    SPACE_RE = re.compile(rb'[ \t\r\n]')
+
+    def __init__(self, input_file, encoding: str='utf-8', strings: StringTable=None):
+        self.__encoding = encoding
+        self.strings = strings if strings is not None else StringTable()
+        if input_file.seek(0, 2) == 0:
+            self.__buffer = b'' # Arquivos vazios não podem ser mapeados
+        else:
+            self.__buffer = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__size = len(self.__buffer)
+        self.__pos = 0
+        self.line = 1
+
+    def close(self):
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def next_token(self):
+        buffer = self.__buffer
+        match = MmapLexer.TOKEN_RE.match
+        while True:
+            m = match(buffer, self.__pos)
+            if m is None:
+                return Token(self.line, Tag.EOF)
+            kind = m.lastgroup
+            start = self.__pos
+            end = m.end()
+
+            if kind == 'SKIP':
+                if end - start == 1:
+                    self.line += buffer[start] == 10 or buffer[start] == 13
+                else:
+                    self.line += MmapLexer.__breaks(buffer[start:end])
+                self.__pos = end
+                continue
+
+            if kind == 'ID' or kind == 'NUM':
+                # Caracteres não-ASCII podem continuar nomes e números
+                if end < self.__size and buffer[end] >= 0x80:
+                    return self.__slow_token(start)
+                self.__pos = end
+                lex = m.group()
+                if kind == 'ID':
+                    tag = MmapLexer.KEYWORDS.get(lex)
+                    if tag:
+                        return Token(self.line, tag)
+                    return Token(self.line, Tag.ID, self.strings.intern(lex.decode('ascii')))
+                tag = Tag.LIT_REAL if m.group('FRAC') is not None else Tag.LIT_INT
+                return Token(self.line, tag, self.strings.intern(lex.decode('ascii')))
+
+            if kind == 'OP':
+                self.__pos = end
+                return Token(self.line, MmapLexer.OPERATORS[m.group()])
+
+            if kind == 'UNCLOSED':
+                print('Erro léxico: comentário não fechado')
+                self.line += MmapLexer.__breaks(buffer[start:])
+                self.__pos = self.__size
+                continue
+
+            # OTHER
+            if buffer[start] >= 0x80:
+                return self.__slow_token(start)
+            self.__pos = end
+            return Token(self.line, Tag.UNK, chr(buffer[start]))
+
+    @staticmethod
+    def __breaks(chunk: bytes):
+        # Quebras de linha em \n, \r\n ou \r sozinho
+        return chunk.count(b'\n') + chunk.count(b'\r') - chunk.count(b'\r\n')
+
+    def __slow_token(self, start: int):
+        # Decodifica só até o próximo espaço: bytes ASCII nunca fazem
+        # parte de uma sequência multibyte, então o corte é seguro.
+        m = MmapLexer.SPACE_RE.search(self.__buffer, start)
+        stop = m.start() if m else self.__size
+        window = self.__buffer[start:stop].decode(self.__encoding)
+        tag, lex, end = RegexLexer.scan_slow(window, 0)
+        self.__pos = start + len(window[:end].encode(self.__encoding))
+        if lex is not None and tag != Tag.UNK:
+            lex = self.strings.intern(lex)
+        return Token(self.line, tag, lex)
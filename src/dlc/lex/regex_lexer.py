@@ -0,0 +1,132 @@
+import re
+from io import StringIO
+from dlc.lex.tag import Tag
+from dlc.lex.token import Token
+from dlc.lex.string_table import StringTable
+
+
+class RegexLexer:
+    '''Analisador léxico alternativo ao Lexer: lê a entrada inteira para um
+    buffer e reconhece os tokens com uma única expressão regular mestre,
+    produzindo exatamente os mesmos Tag/lexema/linha do Lexer original.'''
+
+    KEYWORDS = {tag.value: tag for tag in (
+        Tag.PROGRAM, Tag.BEGIN, Tag.END, Tag.WRITE, Tag.READ, Tag.IF, Tag.ELSE,
+        Tag.WHILE, Tag.INT, Tag.REAL, Tag.BOOL, Tag.LIT_TRUE, Tag.LIT_FALSE
+    )}
+
+    OPERATORS = {tag.value: tag for tag in (
+        Tag.ASSIGN, Tag.SUM, Tag.SUB, Tag.MUL, Tag.DIV, Tag.MOD, Tag.POW,
+        Tag.EQ, Tag.NE, Tag.NOT, Tag.LT, Tag.LE, Tag.GT, Tag.GE, Tag.OR,
+        Tag.AND, Tag.SEMI, Tag.COMMA, Tag.DOT, Tag.LPAREN, Tag.RPAREN
+    )}
+
+    # A ordem das alternativas importa: comentários antes do operador '/',
+    # operadores de dois caracteres antes dos de um.
+    TOKEN_RE = re.compile(r'''
+         (?P<SKIP>[ \t\r\n]+|//[^\n]*|/\*.*?\*/)
+        |(?P<UNCLOSED>/\*)
+        |(?P<NUM>[0-9]+(?P<FRAC>\.[0-9]*)?)
+        |(?P<ID>[A-Za-z_]\w*)
+        |(?P<OP>==|!=|<=|>=|[=!+\-*/%^|&<>;,.()])
+        |(?P<OTHER>.)
+    ''', re.DOTALL | re.VERBOSE)
+
+    def __init__(self, input_stream, strings: StringTable=None):
+        self.__text = input_stream.read()
+        self.strings = strings if strings is not None else StringTable()
+        self.__pos = 0
+        self.line = 1
+        self.start = 0  # Posição do último token retornado
+
+    @staticmethod
+    def from_text(text: str, pos: int=0, line: int=1, strings: StringTable=None):
+        '''Cria um lexer sobre um texto já carregado, começando na posição
+        pos (início de um token) com o contador de linhas em line.'''
+        lexer = RegexLexer(StringIO(), strings)
+        lexer.__text = text
+        lexer.__pos = pos
+        lexer.line = line
+        return lexer
+
+    @staticmethod
+    def scan_slow(text: str, pos: int):
+        '''Reconhece, caractere a caractere, um token que começa ou continua
+        com caracteres não-ASCII, usando os mesmos testes do Lexer original
+        (isdigit/isalpha/isalnum). Retorna (tag, lexema, fim).'''
+        n = len(text)
+        end = pos
+        if text[pos].isdigit():
+            while end < n and text[end].isdigit():
+                end += 1
+            if end == n or text[end] != '.':
+                return Tag.LIT_INT, text[pos:end], end
+            end += 1
+            while end < n and text[end].isdigit():
+                end += 1
+            return Tag.LIT_REAL, text[pos:end], end
+        elif text[pos].isalpha() or text[pos] == '_':
+            while end < n and (text[end].isalnum() or text[end] == '_'):
+                end += 1
+            lex = text[pos:end]
+            if lex in RegexLexer.KEYWORDS:
+                return RegexLexer.KEYWORDS[lex], None, end
+            return Tag.ID, lex, end
+        return Tag.UNK, text[pos], pos + 1
+
+    def next_token(self):
+        text = self.__text
+        match = RegexLexer.TOKEN_RE.match
+        while True:
+            m = match(text, self.__pos)
+            if m is None:
+                self.start = self.__pos
+                return Token(self.line, Tag.EOF)
+            kind = m.lastgroup
+            start = self.__pos
+            end = m.end()
+
+            if kind == 'SKIP':
+                self.line += text.count('\n', start, end)
+                self.__pos = end
+                continue
+
+            self.start = start
+
+            if kind == 'ID':
+                self.__pos = end
+                lex = m.group()
+                tag = RegexLexer.KEYWORDS.get(lex)
+                if tag:
+                    return Token(self.line, tag)
+                return Token(self.line, Tag.ID, self.strings.intern(lex))
+
+            if kind == 'OP':
+                self.__pos = end
+                return Token(self.line, RegexLexer.OPERATORS[m.group()])
+
+            if kind == 'NUM':
+                # Dígitos não-ASCII (ex.: '²') continuam o número no Lexer original
+                if end < len(text) and text[end] >= '\x80':
+                    return self.__slow_token(start)
+                self.__pos = end
+                tag = Tag.LIT_REAL if m.group('FRAC') is not None else Tag.LIT_INT
+                return Token(self.line, tag, self.strings.intern(m.group()))
+
+            if kind == 'UNCLOSED':
+                print('Erro léxico: comentário não fechado')
+                self.line += text.count('\n', start)
+                self.__pos = len(text)
+                continue
+
+            # OTHER
+            if text[start] >= '\x80':
+                return self.__slow_token(start)
+            self.__pos = end
+            return Token(self.line, Tag.UNK, text[start])
+
+    def __slow_token(self, start: int):
+        tag, lex, self.__pos = RegexLexer.scan_slow(self.__text, start)
+        if lex is not None and tag != Tag.UNK:
+            lex = self.strings.intern(lex)
+        return Token(self.line, tag, lex)
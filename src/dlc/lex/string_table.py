@@ -0,0 +1,24 @@
+class StringTable:
+    '''Tabela de strings de uma unidade de compilação: cada lexema distinto
+    é guardado uma única vez e identificado por um índice denso.'''
+
+    def __init__(self):
+        self.__index: dict[str, int] = {}
+        self.strings: list[str] = []
+
+    def index(self, string: str):
+        i = self.__index.get(string)
+        if i is None:
+            i = len(self.strings)
+            self.__index[string] = i
+            self.strings.append(string)
+        return i
+
+    def intern(self, string: str):
+        return self.strings[self.index(string)]
+
+    def __getitem__(self, index: int):
+        return self.strings[index]
+
+    def __len__(self):
+        return len(self.strings)
@@ -1,6 +1,7 @@
 from dlc.lex.tag import Tag
 
 class Token:
+    __slots__ = ('line', 'tag', 'lexeme')
     
     def __init__(self, line:int, tag: Tag, lexeme: str=None):
         self.line = line
@@ -13,4 +14,4 @@ class Token:
         return f'<{self.tag.name}>'
 
     def __repr__(self):
-        return f'<Token: {str(self)} at line {self.line}>'
\ No newline at end of file
+        return f'<Token: {str(self)} at line {self.line}>'
@@ -0,0 +1,67 @@
+from array import array
+from dlc.lex.tag import Tag
+from dlc.lex.token import Token
+from dlc.lex.string_table import StringTable
+
+
+class TokenBuffer:
+    '''Fluxo de tokens em "estrutura de arrays": três arrays paralelos com o
+    índice da tag, a linha e o índice do lexema na tabela de strings (-1 quando
+    o token não tem lexema). Os objetos Token só são criados sob demanda.'''
+
+    TAGS = tuple(Tag)
+    TAG_INDEX = {tag: i for i, tag in enumerate(TAGS)}
+
+    def __init__(self, strings: StringTable=None):
+        self.strings = strings if strings is not None else StringTable()
+        self.tags = array('i')
+        self.lines = array('i')
+        self.lexemes = array('i')
+
+    @staticmethod
+    def from_lexer(lexer):
+        '''Consome o lexer até o EOF (inclusive), compartilhando sua tabela de strings.'''
+        buffer = TokenBuffer(getattr(lexer, 'strings', None))
+        while True:
+            token = lexer.next_token()
+            buffer.append(token)
+            if token.tag == Tag.EOF:
+                return buffer
+
+    def append(self, token: Token):
+        self.tags.append(TokenBuffer.TAG_INDEX[token.tag])
+        self.lines.append(token.line)
+        self.lexemes.append(-1 if token.lexeme is None else self.strings.index(token.lexeme))
+
+    def tag(self, index: int):
+        return TokenBuffer.TAGS[self.tags[index]]
+
+    def __getitem__(self, index: int):
+        lexeme = self.lexemes[index]
+        return Token(self.lines[index], TokenBuffer.TAGS[self.tags[index]],
+                     None if lexeme < 0 else self.strings[lexeme])
+
+    def __len__(self):
+        return len(self.tags)
+
+    def reader(self):
+        return TokenBufferReader(self)
+
+
+
+class TokenBufferReader:
+    '''Adapta um TokenBuffer à interface next_token() esperada pelo Parser.'''
+
+    def __init__(self, buffer: TokenBuffer):
+        self.__buffer = buffer
+        self.__pos = 0
+        self.line = 1
+
+    def next_token(self):
+        buffer = self.__buffer
+        if self.__pos >= len(buffer):
+            return Token(self.line, Tag.EOF)
+        token = buffer[self.__pos]
+        self.__pos += 1
+        self.line = token.line
+        return token
@@ -0,0 +1,329 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from abc import ABC, abstractmethod
+from collections import deque
+
+
+def bits(x: int):
+    '''Índices dos bits 1 de x, do menor para o maior.'''
+    while x:
+        low = x & -x
+        yield low.bit_length() - 1
+        x ^= low
+
+
+class CFG:
+    '''Grafo de fluxo de blocos já ligados por IC.link() (o primeiro é a
+    entrada): sucessores e predecessores pelos destinos dos saltos e pelos
+    fallthroughs, e a ordem pós-ordem reversa (RPO) a partir da entrada,
+    seguida dos blocos inalcançáveis na ordem original.'''
+
+    def __init__(self, blocks: list):
+        self.blocks = blocks
+        self.successors = {bb: [s for s in dict.fromkeys((bb.fallthrough, bb.target)) if s is not None]
+                           for bb in blocks}
+        self.predecessors = {bb: [] for bb in blocks}
+        for bb in blocks:
+            for succ in self.successors[bb]:
+                self.predecessors[succ].append(bb)
+
+        postorder = []
+        if blocks:
+            visited = {blocks[0]}
+            stack = [(blocks[0], iter(self.successors[blocks[0]]))]
+            while stack:
+                bb, pending = stack[-1]
+                succ = next(pending, None)
+                if succ is None:
+                    stack.pop()
+                    postorder.append(bb)
+                elif succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(self.successors[succ])))
+        self.rpo = postorder[::-1]
+        self.reachable = set(postorder)
+        self.rpo.extend(bb for bb in blocks if bb not in self.reachable)
+
+    @staticmethod
+    def of(ic: IC):
+        ic.link()
+        return CFG(ic.bb_sequence)
+
+
+class DominatorTree:
+    '''Dominadores dos blocos alcançáveis de um CFG (algoritmo iterativo de
+    Cooper, Harvey e Kennedy, em RPO): idom[bb] é o dominador imediato (None
+    na entrada e nos inalcançáveis), children[bb] os blocos que ele domina
+    imediatamente e frontier[bb] a fronteira de dominância, onde os caminhos
+    que saem de bb encontram outros que não passam por ele.'''
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        order = [bb for bb in cfg.rpo if bb in cfg.reachable]
+        index = {bb: i for i, bb in enumerate(order)}
+        idom = {order[0]: order[0]} if order else {}
+
+        def intersect(a, b):
+            while a is not b:
+                while index[a] > index[b]:
+                    a = idom[a]
+                while index[b] > index[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for bb in order[1:]:
+                new = None
+                for pred in cfg.predecessors[bb]:
+                    if pred in idom:
+                        new = pred if new is None else intersect(pred, new)
+                if idom.get(bb) is not new:
+                    idom[bb] = new
+                    changed = True
+
+        self.idom = {bb: None for bb in cfg.blocks}
+        self.children = {bb: [] for bb in cfg.blocks}
+        for bb in order[1:]:
+            self.idom[bb] = idom[bb]
+            self.children[idom[bb]].append(bb)
+
+        # Intervalos da pré-ordem da árvore: a domina b se o intervalo de a
+        # contém o de b
+        self.__enter, self.__exit = {}, {}
+        clock = 0
+        stack = [(order[0], False)] if order else []
+        while stack:
+            bb, done = stack.pop()
+            if done:
+                self.__exit[bb] = clock
+                continue
+            self.__enter[bb] = clock
+            clock += 1
+            stack.append((bb, True))
+            stack.extend((child, False) for child in reversed(self.children[bb]))
+
+        self.frontier = {bb: set() for bb in cfg.blocks}
+        for bb in order:
+            preds = [p for p in cfg.predecessors[bb] if p in cfg.reachable]
+            if len(preds) < 2:
+                continue
+            for pred in preds:
+                runner = pred
+                while runner is not None and runner is not self.idom[bb]:
+                    self.frontier[runner].add(bb)
+                    runner = self.idom[runner]
+
+    def dominates(self, a, b):
+        '''Indica se todo caminho da entrada até b passa por a (a domina a si mesmo).'''
+        if a not in self.__enter or b not in self.__enter:
+            return False
+        return self.__enter[a] <= self.__enter[b] and self.__exit[b] <= self.__exit[a]
+
+    def preorder(self):
+        '''Blocos alcançáveis em pré-ordem da árvore (cada um depois do seu idom).'''
+        return sorted(self.__enter, key=self.__enter.get)
+
+
+class Dataflow(ABC):
+    '''Problema de fluxo de dados resolvido por iteração até o ponto fixo.
+    As subclasses definem a direção (forward), o valor no contorno (na
+    entrada do programa, ou na saída de blocos sem sucessores, se for para
+    trás), o valor inicial dos demais (top), o encontro (meet) e a função de
+    transferência de cada bloco. A lista de trabalho é uma deque começando
+    em RPO (ou na ordem inversa, para trás), e um bloco só volta a ela
+    quando o valor que chega a ele muda.
+
+    Depois de solve(), ins[bb] e outs[bb] são os valores na entrada e na
+    saída de cada bloco, no sentido do programa (não da análise).'''
+
+    forward = True
+
+    def __init__(self, cfg: CFG):
+        self.cfg = cfg
+        self.ins = {}
+        self.outs = {}
+
+    @abstractmethod
+    def boundary(self):
+        pass
+
+    @abstractmethod
+    def top(self):
+        pass
+
+    @abstractmethod
+    def meet(self, a, b):
+        pass
+
+    @abstractmethod
+    def transfer(self, bb, value):
+        pass
+
+    def solve(self):
+        cfg = self.cfg
+        if self.forward:
+            order, sources, targets = cfg.rpo, cfg.predecessors, cfg.successors
+            before, after = self.ins, self.outs
+        else:
+            order, sources, targets = cfg.rpo[::-1], cfg.successors, cfg.predecessors
+            before, after = self.outs, self.ins
+        entry = cfg.blocks[0] if cfg.blocks else None
+        top = self.top()
+        for bb in order:
+            after[bb] = top
+
+        work = deque(order)
+        queued = set(order)
+        while work:
+            bb = work.popleft()
+            queued.discard(bb)
+            if self.forward and bb is entry:
+                value = self.boundary() # A entrada também pode ter predecessores (laço)
+                for source in sources[bb]:
+                    value = self.meet(value, after[source])
+            elif sources[bb]:
+                value = None
+                for source in sources[bb]:
+                    value = after[source] if value is None else self.meet(value, after[source])
+            else:
+                value = self.boundary()
+            before[bb] = value
+            new = self.transfer(bb, value)
+            if new != after[bb]:
+                after[bb] = new
+                for target in targets[bb]:
+                    if target not in queued:
+                        queued.add(target)
+                        work.append(target)
+        return self
+
+
+class BitVectorProblem(Dataflow):
+    '''Problema em conjuntos de bits (inteiros do Python de qualquer
+    tamanho): transfer(x) = gen | (x & ~kill), com encontro por união
+    (análises "may") ou interseção (análises "must"). local(bb) retorna o
+    par (gen, kill) de cada bloco.'''
+
+    union = True
+
+    def __init__(self, cfg: CFG, size: int):
+        super().__init__(cfg)
+        self.full = (1 << size) - 1
+        self.gen = {}
+        self.kill = {}
+        for bb in cfg.blocks:
+            self.gen[bb], self.kill[bb] = self.local(bb)
+
+    @abstractmethod
+    def local(self, bb):
+        pass
+
+    def boundary(self):
+        return 0
+
+    def top(self):
+        return 0 if self.union else self.full
+
+    def meet(self, a, b):
+        return a | b if self.union else a & b
+
+    def transfer(self, bb, value):
+        return self.gen[bb] | (value & ~self.kill[bb])
+
+
+class Liveness(BitVectorProblem):
+    '''Temporários vivos na entrada e na saída de cada bloco, com o bit
+    Temp.number de cada um (a numeração dos temporários é densa).'''
+
+    forward = False
+
+    def __init__(self, cfg: CFG, temp_count: int):
+        super().__init__(cfg, temp_count)
+        self.solve()
+
+    def local(self, bb):
+        # gen: usados antes de qualquer definição no bloco; kill: definidos
+        gen = kill = 0
+        for instr in reversed(bb.instructions):
+            if instr.result.is_temp:
+                bit = 1 << instr.result.number
+                gen &= ~bit
+                kill |= bit
+            for arg in (instr.arg1, instr.arg2):
+                if arg.is_temp:
+                    gen |= 1 << arg.number
+        return gen, kill
+
+    @staticmethod
+    def step(instr, live: int):
+        '''Vivos antes de instr, dados os vivos depois dela.'''
+        if instr.result.is_temp:
+            live &= ~(1 << instr.result.number)
+        for arg in (instr.arg1, instr.arg2):
+            if arg.is_temp:
+                live |= 1 << arg.number
+        return live
+
+
+class ReachingCopies(BitVectorProblem):
+    '''Cópias "d = s" entre temporários disponíveis em cada ponto: feitas em
+    todos os caminhos até ali sem que d ou s tenham sido redefinidos depois.
+    Cada par (d, s) distinto é um bit, então a mesma cópia feita nos dois
+    lados de um desvio continua disponível depois da junção.'''
+
+    union = False
+
+    def __init__(self, cfg: CFG):
+        self.pairs = []     # Bit -> (destino, origem)
+        self.index = {}     # (destino, origem) -> bit
+        self.involving = {} # Temporário -> bits dos pares em que aparece
+        self.by_dest = {}   # Temporário -> bits dos pares em que é o destino
+        for bb in cfg.blocks:
+            for instr in bb.instructions:
+                pair = ReachingCopies.copy_of(instr)
+                if pair is not None and pair not in self.index:
+                    bit = 1 << len(self.pairs)
+                    self.index[pair] = len(self.pairs)
+                    self.pairs.append(pair)
+                    for temp in pair:
+                        self.involving[temp] = self.involving.get(temp, 0) | bit
+                    self.by_dest[pair[0]] = self.by_dest.get(pair[0], 0) | bit
+        super().__init__(cfg, len(self.pairs))
+        self.solve()
+
+    @staticmethod
+    def copy_of(instr):
+        if (instr.op == Operator.MOVE and instr.result.is_temp and instr.arg1.is_temp
+                and instr.result is not instr.arg1):
+            return instr.result, instr.arg1
+        return None
+
+    def step(self, instr, available: int):
+        '''Cópias disponíveis depois de instr, dadas as disponíveis antes.'''
+        if instr.result.is_temp:
+            available &= ~self.involving.get(instr.result, 0)
+            pair = ReachingCopies.copy_of(instr)
+            if pair is not None:
+                available |= 1 << self.index[pair]
+        return available
+
+    def source(self, temp, available: int):
+        '''Origem da cópia disponível com destino temp, ou None.'''
+        found = available & self.by_dest.get(temp, 0)
+        return self.pairs[found.bit_length() - 1][1] if found else None
+
+    def local(self, bb):
+        gen = kill = 0
+        for instr in bb.instructions:
+            if instr.result.is_temp:
+                killed = self.involving.get(instr.result, 0)
+                gen &= ~killed
+                kill |= killed
+                pair = ReachingCopies.copy_of(instr)
+                if pair is not None:
+                    bit = 1 << self.index[pair]
+                    gen |= bit
+                    kill &= ~bit
+        return gen, kill
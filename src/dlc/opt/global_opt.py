@@ -1,7 +1,13 @@
 from dlc.inter.ic import IC
 from dlc.inter.instr import Instr
-from dlc.inter.operand import Const, Operand, Temp
+from dlc.inter.operand import Const, Operand
 from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, Liveness, ReachingCopies
+from dlc.opt.loops import each_loop, insert_preheader, induction_variables
+from dlc.opt.simplify import simplify
+from dlc.opt.ssa import to_ssa, from_ssa
+from dlc.semantic.type import Type
+from collections import deque
 
 
 class Lattice:
@@ -17,8 +23,8 @@ class Lattice:
             return v2
         if v2 == Lattice.TOP:
             return v1
-        if v1 == v2:
-            return v1
+        if v1 == v2 and v1.__class__ is v2.__class__:
+            return v1 # 1 e True, ou 1 e 1.0, são constantes diferentes
         return Lattice.BOTTOM # Constantes diferentes (ex: 5 ∧ 6)
 
 
@@ -28,15 +34,33 @@ def optimize(ic):
     while changed:
         changed = False
         
-        # 1. Resolve a matemática (Folding + Constant Prop)
-        # Transforma t1 = 10 + 5 em t1 = 15
-        changed |= global_constant_propagation_and_folding(ic)
+        # 1. Resolve a matemática (Folding + Constant Prop, esparsa)
+        # Transforma t1 = 10 + 5 em t1 = 15 e poda os desvios constantes
+        changed |= sparse_conditional_constant_propagation(ic)
+
+        # 2. Identidades algébricas e desvios (tabela de regras em simplify)
+        # t1 = x * 1 vira t1 = x, e t2 = a < b; iffalse t2 goto L vira
+        # iffalse a < b goto L
+        changed |= simplify(ic)
+        
+        # 3. Reaproveita as contas repetidas (GVN)
+        # Um segundo t5 = raio * raio vira t5 = t3, que as cópias resolvem
+        changed |= global_value_numbering(ic)
+
+        # 4. Tira dos laços as contas que não mudam entre as voltas (LICM)
+        # O a * b calculado a cada volta passa a ser calculado uma vez antes do laço
+        changed |= loop_invariant_code_motion(ic)
+
+        # 5. Redução de força: potências inteiras viram multiplicações, e
+        # i * k num laço em que i = i + 1 vira uma soma de k a cada volta
+        changed |= expand_integer_powers(ic)
+        changed |= reduce_induction_variables(ic)
         
-        # 2. Conecta os nomes (Copy Prop)
+        # 6. Conecta os nomes (Copy Prop)
         # Se tinha v2 = t1, ele troca o uso de v2 por t1 lá na frente
         changed |= global_copy_propagation(ic)
         
-        # 3. Limpa os mortos (DCE)
+        # 7. Limpa os mortos (DCE)
         # Se t1 virou 15 e ninguém mais lê t1, ele apaga a linha t1 = 15
         changed |= global_dead_code_elimination(ic)
 
@@ -47,275 +71,585 @@ def optimize(ic):
 
 
 @staticmethod
-def global_constant_propagation_and_folding(ic):
-    all_vars = set()
-    for bb in ic.bb_sequence:
+def sparse_conditional_constant_propagation(ic):
+    # Propagação de constantes condicional e esparsa (Wegman-Zadeck): um valor
+    # por definição, reavaliado quando um operando muda, e blocos avaliados
+    # só quando uma aresta executável chega a eles. Nas variáveis, o valor na
+    # entrada de um bloco é o encontro das saídas dos predecessores (um phi)
+    blocks = ic.bb_sequence
+    if not blocks:
+        return False
+    cfg = CFG.of(ic)
+    successors, predecessors = cfg.successors, cfg.predecessors
+    jumps = (Operator.GOTO, Operator.IF, Operator.IFFALSE)
+    TOP, BOTTOM = Lattice.TOP, Lattice.BOTTOM
+
+    # Definições, a definição anterior de cada operando no mesmo bloco e a
+    # última definição de cada temporário em cada bloco
+    defs, block_of, prior, last_def = {}, {}, {}, {}
+    for bb in blocks:
+        last = last_def[bb] = {}
         for instr in bb.instructions:
-            for op in [instr.result, instr.arg1, instr.arg2]:
-                if isinstance(op, Temp):
-                    all_vars.add(op)
+            block_of[instr] = bb
+            prior[instr] = (last.get(instr.arg1), last.get(instr.arg2))
+            if instr.result.is_temp:
+                defs.setdefault(instr.result, []).append(instr)
+                last[instr.result] = instr
+    merged = {temp for temp, ds in defs.items() if len(ds) > 1 or temp in ic.var_temps}
+
+    value = {}         # Instrução -> valor do temporário que ela define
+    entry = {}         # (bloco, temporário) -> valor na entrada do bloco (nó de encontro)
+    executable = set() # Arestas (origem, destino) executáveis
+    reached = set()    # Blocos executáveis
+    users = {}         # Instrução ou nó -> instruções e nós que leem o seu valor
+    block_nodes = {}   # Bloco -> temporários com nó de encontro nele
+
+    def node(bb, temp):
+        # Cria o nó (bb, temp) e, subindo pelos predecessores que não definem
+        # temp, os nós de que ele depende
+        key = (bb, temp)
+        if key in entry:
+            return key
+        entry[key] = TOP
+        block_nodes.setdefault(bb, []).append(temp)
+        work = [key]
+        while work:
+            key = work.pop()
+            for pred in predecessors[key[0]]:
+                d = last_def[pred].get(temp)
+                if d is not None:
+                    users.setdefault(d, []).append(key)
+                    continue
+                source = (pred, temp)
+                if source not in entry:
+                    entry[source] = TOP
+                    block_nodes.setdefault(pred, []).append(temp)
+                    work.append(source)
+                users.setdefault(source, []).append(key)
+        return (bb, temp)
+
+    for instr, (d1, d2) in prior.items():
+        for arg, d in ((instr.arg1, d1), (instr.arg2, d2)):
+            if not arg.is_temp:
+                continue
+            if d is None and arg in merged:
+                d = node(block_of[instr], arg)
+            elif d is None:
+                d = defs[arg][0] if arg in defs else None
+            if d is not None:
+                users.setdefault(d, []).append(instr)
+
+    def operand(instr, k):
+        arg = instr.arg2 if k else instr.arg1
+        if arg.is_const:
+            return arg.value
+        if not arg.is_temp:
+            return None
+        d = prior[instr][k]
+        if d is not None:
+            return value.get(d, TOP)
+        if arg in merged:
+            return entry[(block_of[instr], arg)]
+        ds = defs.get(arg)
+        return value.get(ds[0], TOP) if ds else TOP
+
+    flow = deque([(None, blocks[0])])
+    pending = deque() # Instruções e nós cujos operandos mudaram
+
+    def mark(bb, succ):
+        if succ is not None and (bb, succ) not in executable:
+            executable.add((bb, succ))
+            flow.append((bb, succ))
+
+    def branch(bb, force=False):
+        # Torna executáveis as arestas que saem de bb; com force, as duas de
+        # um desvio cuja condição ficou TOP (ex.: variável nunca escrita)
+        last = bb.instructions[-1] if bb.instructions else None
+        if last is None or last.op not in jumps:
+            mark(bb, bb.fallthrough)
+        elif last.op == Operator.GOTO:
+            mark(bb, bb.target)
+        else:
+            cond = operand(last, 0)
+            if last.relation is not None:
+                # Comparação embutida: TOP até os dois operandos serem conhecidos
+                args = (cond, operand(last, 1))
+                if any(a == BOTTOM or a is None for a in args):
+                    cond = BOTTOM
+                elif any(a == TOP for a in args):
+                    cond = TOP
+                else:
+                    cond = IC.operate(last.relation, *args)
+            if cond == TOP and not force:
+                return
+            if cond in (TOP, BOTTOM):
+                mark(bb, bb.target)
+                mark(bb, bb.fallthrough)
+            else:
+                taken = bool(cond) if last.op == Operator.IF else not cond
+                mark(bb, bb.target if taken else bb.fallthrough)
+
+    def lower(key, old, new, store):
+        # Desce o valor de uma instrução ou nó e agenda quem o lê
+        new = Lattice.meet(old, new)
+        if new != old or new.__class__ is not old.__class__:
+            store[key] = new
+            pending.extend(users.get(key, ()))
+
+    def evaluate(instr):
+        result = instr.result
+        if not result.is_temp:
+            return
+        op = instr.op
+        if op == Operator.MOVE:
+            new = operand(instr, 0)
+        elif op in IC.OPS:
+            unary = not (instr.arg2.is_temp or instr.arg2.is_const)
+            args = (operand(instr, 0),) if unary else (operand(instr, 0), operand(instr, 1))
+            if any(a == BOTTOM or a is None for a in args):
+                new = BOTTOM
+            elif any(a == TOP for a in args):
+                new = TOP
+            else:
+                try:
+                    new = IC.operate_unary(op, *args) if unary else IC.operate(op, *args)
+                except Exception:
+                    new = BOTTOM # Ex.: divisão por zero, que fica para a execução
+                if new is None:
+                    new = BOTTOM
+        else:
+            new = BOTTOM # READ
+        lower(instr, value.get(instr, TOP), new, value)
+
+    def merge(key):
+        bb, temp = key
+        new = TOP
+        for pred in predecessors[bb]:
+            if (pred, bb) in executable:
+                d = last_def[pred].get(temp)
+                new = Lattice.meet(new, value.get(d, TOP) if d is not None else entry[(pred, temp)])
+        lower(key, entry[key], new, entry)
+
+    while flow or pending:
+        while flow or pending:
+            if flow:
+                _, bb = flow.popleft()
+                reached.add(bb)
+                # Uma aresta nova muda os encontros do bloco
+                for temp in block_nodes.get(bb, ()):
+                    merge((bb, temp))
+                for instr in bb.instructions:
+                    evaluate(instr)
+                branch(bb)
+                continue
+            item = pending.popleft()
+            if item.__class__ is tuple:
+                merge(item)
+                continue
+            bb = block_of[item]
+            if bb in reached:
+                if item is bb.instructions[-1] and item.op in jumps:
+                    branch(bb)
+                else:
+                    evaluate(item)
+        for bb in blocks:
+            if bb in reached:
+                branch(bb, force=True)
 
-    in_states = {bb: {v: Lattice.TOP for v in all_vars} for bb in ic.bb_sequence}
-    out_states = {bb: {v: Lattice.TOP for v in all_vars} for bb in ic.bb_sequence}
-    
-    worklist = list(ic.bb_sequence)
+    # Reescrita: constantes nos usos, contas resolvidas viram MOVE e os
+    # desvios com um só lado executável viram GOTO ou somem
+    changed = False
+    pruned = False
+    for bb in blocks:
+        if bb not in reached:
+            continue # Removido abaixo, quando ficar inalcançável
+        for instr in bb.instructions:
+            constants = [operand(instr, k) for k in (0, 1)]
+            for k, attr in enumerate(('arg1', 'arg2')):
+                arg = getattr(instr, attr)
+                v = constants[k]
+                if arg.is_temp and v not in (TOP, BOTTOM, None):
+                    setattr(instr, attr, Const(arg.type, v))
+                    changed = True
+            v = value.get(instr, TOP)
+            if instr.op != Operator.MOVE and instr.op in IC.OPS and v not in (TOP, BOTTOM):
+                instr.op = Operator.MOVE
+                instr.arg1 = Const(instr.result.type, v)
+                instr.arg2 = Operand.EMPTY
+                changed = True
 
-    while worklist:
-        bb = worklist.pop(0)
+        last = bb.instructions[-1] if bb.instructions else None
+        if last is None or last.op not in (Operator.IF, Operator.IFFALSE) or bb.target is bb.fallthrough:
+            continue
+        if (bb, bb.fallthrough) not in executable:
+            bb.instructions[-1] = Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY, last.result)
+            dead = bb.fallthrough
+        elif (bb, bb.target) not in executable:
+            bb.instructions.pop()
+            dead = bb.target
+        else:
+            continue
+        if dead is not None and dead in bb.successors:
+            bb.successors.remove(dead)
+            dead.predecessors.remove(bb)
+        changed = pruned = True
 
-        # MEET
-        if bb.predecessors:
-            new_in = {v: Lattice.TOP for v in all_vars}
-            for pred in bb.predecessors:
-                for v in all_vars:
-                    new_in[v] = Lattice.meet(new_in[v], out_states[pred][v])
-            in_states[bb] = new_in
+    if pruned:
+        remove_unreachable_blocks(ic)
+        merge_blocks(ic)
+    return changed
 
-        # TRANSFER + FOLDING INTEGRADO
-        old_out = out_states[bb].copy()
-        current_vals = in_states[bb].copy()
 
-        for instr in bb.instructions:
-            # 1. Resolve os operandos (Lattice ou constante literal)
-            val1 = current_vals.get(instr.arg1) if isinstance(instr.arg1, Temp) else instr.arg1.value if isinstance(instr.arg1, Const) else None
-            val2 = current_vals.get(instr.arg2) if isinstance(instr.arg2, Temp) else instr.arg2.value if isinstance(instr.arg2, Const) else None
 
-            res_lat = Lattice.BOTTOM
 
-            # 2. Tenta o Folding durante a análise
+@staticmethod
+def global_value_numbering(ic):
+    # Numeração de valores pela árvore de dominadores, na forma SSA: uma conta
+    # já disponível vira cópia do resultado que a domina (a * b e b * a
+    # também). Sem mudança, o IC volta ao que era antes da SSA
+    if not ic.bb_sequence:
+        return False
+    saved = [(bb, list(bb.instructions)) for bb in ic.bb_sequence]
+    fields = [(instr, instr.arg1, instr.arg2, instr.result) for bb in ic.bb_sequence for instr in bb]
+    var_temps = dict(ic.var_temps)
+    dom = to_ssa(ic)
+
+    value = {} # Temporário -> operando com o mesmo valor (ele mesmo, se é novo)
+
+    def key(arg):
+        arg = value.get(arg, arg)
+        if arg.is_temp:
+            return ('t', arg.number)
+        if arg.is_const:
+            return ('c', arg.value.__class__.__name__, arg.value)
+        return ('-',)
+
+    commutative = (Operator.SUM, Operator.MUL, Operator.EQ, Operator.NE)
+    effects = (Operator.LABEL, Operator.GOTO, Operator.IF, Operator.IFFALSE, Operator.PRINT, Operator.READ)
+    available = {} # Expressão -> temporário com o seu valor
+    changed = moved = False
+    work = [(dom.preorder()[0], None)]
+    while work:
+        bb, added = work.pop()
+        if added is not None: # Saída do bloco: as expressões dele deixam de valer
+            for expr in added:
+                del available[expr]
+            continue
+        added = []
+        for instr in bb:
+            result = instr.result
+            if instr.op in effects or not result.is_temp:
+                continue
             if instr.op == Operator.MOVE:
-                res_lat = val1 if val1 is not None else Lattice.BOTTOM
-            elif instr.op in IC.OPS:
-                # Se ambos os operandos viraram constantes numéricas, calculamos AGORA
-                if isinstance(val1, (int, float)) and isinstance(val2, (int, float)):
-                    try:
-                        res_lat = IC.operate(instr.op, val1, val2)
-                    except Exception:
-                        res_lat = Lattice.BOTTOM
-                elif isinstance(val1, (int, float)) and (instr.arg2 == Operand.EMPTY or instr.arg2 is None):
-                    try:
-                        res_lat = IC.operate_unary(instr.op, val1)
-                    except Exception:
-                        res_lat = Lattice.BOTTOM
-            
-            if isinstance(instr.result, Temp):
-                current_vals[instr.result] = res_lat
-
-        out_states[bb] = current_vals
-        if out_states[bb] != old_out:
-            for succ in bb.successors:
-                if succ not in worklist:
-                    worklist.append(succ)
+                value[result] = value.get(instr.arg1, instr.arg1)
+                continue
+            if instr.op == Operator.PHI:
+                args = {key(arg) for arg in instr.sources.values()} - {key(result)}
+                if len(args) == 1 and len(instr.sources) == len(dom.cfg.predecessors[bb]):
+                    first = next(arg for arg in instr.sources.values() if key(arg) != key(result))
+                    value[result] = value.get(first, first)
+                    continue
+                expr = (Operator.PHI, bb.number) + tuple(sorted((pred.number, key(arg))
+                                                                for pred, arg in instr.sources.items()))
+            else:
+                k1, k2 = key(instr.arg1), key(instr.arg2)
+                if instr.op in commutative and k2 < k1:
+                    k1, k2 = k2, k1
+                expr = (instr.op, k1, k2)
+            if expr in available:
+                same = available[expr]
+                if instr.op == Operator.PHI:
+                    moved = True
+                instr.op, instr.arg1, instr.arg2, instr.sources = Operator.MOVE, same, Operand.EMPTY, None
+                value[result] = same
+                changed = True
+            else:
+                available[expr] = result
+                added.append(expr)
+        if moved:
+            # Um PHI que virou cópia vai para depois dos PHIs do bloco
+            order = {Operator.LABEL: 0, Operator.PHI: 1}
+            bb.instructions.sort(key=lambda instr: order.get(instr.op, 2))
+            moved = False
+        work.append((bb, added))
+        work.extend((child, None) for child in reversed(dom.children[bb]))
 
-    # 3. APPLY (Reescreve o TAC com as constantes e as contas resolvidas)
-    return apply_global_folding(ic, in_states)
+    if changed:
+        from_ssa(ic)
+    else:
+        for bb, instructions in saved:
+            bb.instructions = instructions
+        for instr, arg1, arg2, result in fields:
+            instr.arg1, instr.arg2, instr.result = arg1, arg2, result
+        ic.var_temps = var_temps
+    return changed
 
 
 
 @staticmethod
-def apply_global_folding(ic, in_states):
-    changed = False
-    for bb in ic.bb_sequence:
-        # Começamos com os valores conhecidos na entrada do bloco
-        current_vals = in_states[bb].copy()
-        
-        for instr in bb.instructions:
-            # --- PASSO 1: SUBSTITUIÇÃO DE USOS ---
-            # Verifica se os argumentos da instrução atual são constantes conhecidas
-            if isinstance(instr.arg1, Temp):
-                val = current_vals.get(instr.arg1)
-                if isinstance(val, (int, float)):
-                    instr.arg1 = Const(instr.arg1.type, val)
-                    changed = True
-            
-            if isinstance(instr.arg2, Temp):
-                val = current_vals.get(instr.arg2)
-                if isinstance(val, (int, float)):
-                    instr.arg2 = Const(instr.arg2.type, val)
-                    changed = True
+def loop_invariant_code_motion(ic):
+    # Tira dos laços, dos internos para os externos, as contas invariantes
+    # para um bloco antes do cabeçalho. Só saem as que não podem falhar: a
+    # divisão por um temporário é protegida pelo sinal do divisor
+    if not ic.bb_sequence:
+        return False
+    liveness = {} # Vivacidade da versão atual do CFG, calculada quando é preciso
 
-            # --- PASSO 2: CONSTANT FOLDING (SIMPLIFICAÇÃO) ---
-            # Agora que substituímos os argumentos, verificamos se podemos resolver a operação
-            val1 = instr.arg1.value if isinstance(instr.arg1, Const) else None
-            val2 = instr.arg2.value if isinstance(instr.arg2, Const) else None
-            
-            res_lat = Lattice.BOTTOM
+    def hoist(loop, cfg, dom):
+        if cfg not in liveness:
+            liveness.clear()
+            liveness[cfg] = Liveness(cfg, ic.temp_count)
+        return hoist_loop_invariants(ic, loop, cfg, dom, liveness[cfg])
 
-            if instr.op == Operator.MOVE:
-                # Se for MOVE de uma constante, o resultado é essa constante
-                res_lat = val1 if val1 is not None else Lattice.BOTTOM
-                
-            elif instr.op in IC.OPS:
-                # Se os operandos necessários são constantes, calculamos o resultado
-                if isinstance(val1, (int, float)) and isinstance(val2, (int, float)):
-                    try:
-                        res_lat = IC.operate(instr.op, val1, val2)
-                        # Transforma a conta em um MOVE constante: t1 = 10 + 5 -> t1 = 15
-                        instr.op = Operator.MOVE
-                        instr.arg1 = Const(instr.result.type, res_lat)
-                        instr.arg2 = Operand.EMPTY
-                        changed = True
-                    except Exception:
-                        res_lat = Lattice.BOTTOM
-                
-                # Caso para operações unárias (ex: NOT, NEG)
-                elif isinstance(val1, (int, float)) and (instr.arg2 in (Operand.EMPTY, None)):
-                    try:
-                        res_lat = IC.operate_unary(instr.op, val1)
-                        instr.op = Operator.MOVE
-                        instr.arg1 = Const(instr.result.type, res_lat)
-                        changed = True
-                    except Exception:
-                        res_lat = Lattice.BOTTOM
-
-            # --- PASSO 3: ATUALIZAÇÃO DO ESTADO LOCAL ---
-            # Atualizamos o dicionário para que a PRÓXIMA linha do mesmo bloco 
-            # já veja os valores atualizados por esta linha
-            if isinstance(instr.result, Temp):
-                current_vals[instr.result] = res_lat
-                
-    return changed
+    return each_loop(ic, hoist)
 
 
+@staticmethod
+def hoist_loop_invariants(ic, loop, cfg, dom, liveness):
+    # Tira de um laço as suas contas invariantes (ver
+    # loop_invariant_code_motion). Retorna se alguma saiu
+    blocks = [bb for bb in cfg.rpo if bb in loop]
+    defs = {} # Temporário -> número de definições no laço
+    for bb in blocks:
+        for instr in bb:
+            if instr.result.is_temp:
+                defs[instr.result] = defs.get(instr.result, 0) + 1
+    # Um valor que passa de uma volta para a seguinte (vivo na entrada do
+    # cabeçalho) fica no laço: inclui o temporário refeito pelo caminho
+    # lento de uma divisão protegida, que assim não sai de novo
+    carried = liveness.ins[loop.header]
+    # Uma conta morta também fica (é da eliminação de código morto): o
+    # caminho lento cujo uso já foi apagado não é mais vivo no cabeçalho, e
+    # sairia de novo a cada rodada de optimize
+    dead = set()
+    for bb in blocks:
+        live = liveness.outs[bb]
+        for instr in reversed(bb.instructions):
+            if instr.result.is_temp and not live >> instr.result.number & 1:
+                dead.add(instr)
+            live = Liveness.step(instr, live)
+
+    pure = (Operator.SUM, Operator.SUB, Operator.MUL, Operator.EQ, Operator.NE, Operator.LT, Operator.LE,
+            Operator.GT, Operator.GE, Operator.PLUS, Operator.MINUS, Operator.NOT, Operator.CONVERT)
+    hoisted = {} # Resultado invariante -> (temporário calculado fora do laço, bloco da instrução)
+    plan = []    # (instrução, operandos fora do laço, temporário novo, guarda)
+    for bb in blocks:
+        for instr in bb:
+            result = instr.result
+            if (instr.op not in pure and instr.op not in (Operator.DIV, Operator.MOD, Operator.POW)
+                    or not result.is_temp or carried >> result.number & 1 or instr in dead):
+                continue
+            args = []
+            for arg in (instr.arg1, instr.arg2):
+                if arg.is_temp and arg in defs:
+                    source = hoisted.get(arg)
+                    if defs[arg] != 1 or source is None or not dom.dominates(source[1], bb):
+                        break
+                    arg = source[0]
+                args.append(arg)
+            else:
+                guard = None
+                divisor = args[1]
+                if instr.op in (Operator.DIV, Operator.MOD):
+                    if divisor.is_const:
+                        if divisor.value == 0 or divisor.value == -1 and not divisor.type.is_float:
+                            continue
+                    elif divisor.type.is_float:
+                        guard = (Operator.NE, Const(Type.REAL, 0.0))
+                    else:
+                        guard = (Operator.GT, Const(Type.INT, 0))
+                elif instr.op == Operator.POW:
+                    if not (result.type.is_integral and divisor.is_const and divisor.value >= 0):
+                        continue
+                temp = ic.new_temp(result.type)
+                plan.append((instr, args, temp, guard))
+                if guard is None:
+                    hoisted[result] = (temp, bb)
+    if not plan:
+        return False
+    tail = insert_preheader(ic, loop, cfg)
+    if tail is None:
+        return False
+
+    block_of = {instr: bb for bb in blocks for instr in bb}
+    for instr, args, temp, guard in plan:
+        computed = Instr(instr.op, args[0], args[1], temp)
+        if guard is None:
+            tail.instructions.append(computed)
+            instr.op, instr.arg1, instr.arg2 = Operator.MOVE, temp, Operand.EMPTY
+            continue
+
+        # Antes do laço: se a guarda vale, calcula; senão, pula a conta
+        op, zero = guard
+        safe = ic.new_temp(Type.BOOL)
+        skip = ic.new_label()
+        tail.instructions += [Instr(op, args[1], zero, safe), Instr(Operator.IFFALSE, safe, Operand.EMPTY, skip)]
+        compute, joined = ic.new_block(), ic.new_block()
+        compute.instructions.append(computed)
+        joined.instructions.append(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, skip))
+        header = tail.successors[0]
+        header.predecessors = [joined if pred is tail else pred for pred in header.predecessors]
+        tail.successors = [joined, compute]
+        compute.predecessors, compute.successors = [tail], [joined]
+        joined.predecessors, joined.successors = [tail, compute], [header]
+        at = ic.bb_sequence.index(tail)
+        ic.bb_sequence[at + 1:at + 1] = [compute, joined]
+        tail = joined
+
+        # No laço: se a guarda vale, usa o valor de fora; senão, refaz a conta
+        bb = block_of[instr]
+        i = bb.instructions.index(instr)
+        fast = ic.new_label()
+        slow, after = ic.new_block(), ic.new_block()
+        slow.instructions.append(Instr(instr.op, instr.arg1, instr.arg2, temp))
+        after.instructions = [Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, fast)] + bb.instructions[i:]
+        bb.instructions[i:] = [Instr(Operator.IF, safe, Operand.EMPTY, fast)]
+        after.successors = bb.successors
+        for succ in after.successors:
+            succ.predecessors = [after if pred is bb else pred for pred in succ.predecessors]
+        bb.successors = [after, slow]
+        slow.predecessors, slow.successors = [bb], [after]
+        after.predecessors = [bb, slow]
+        for moved in after.instructions:
+            block_of[moved] = after
+        at = ic.bb_sequence.index(bb)
+        ic.bb_sequence[at + 1:at + 1] = [slow, after]
+        instr.op, instr.arg1, instr.arg2 = Operator.MOVE, temp, Operand.EMPTY
+    return True
+
 
 
 @staticmethod
-def global_copy_propagation(ic):
-    all_vars = set()
+def expand_integer_powers(ic, limit=32):
+    # a ^ n, com a inteiro e n constante entre 0 e limit, vira multiplicações
+    # por quadrados sucessivos (no máximo 2 log2(n)), que dão a volta em 32
+    # bits como o a ^ n truncado. Potências reais ficam: pow() arredonda
+    # diferente e falha por estouro onde o produto dá infinito
+    changed = False
     for bb in ic.bb_sequence:
+        expanded = []
         for instr in bb.instructions:
-            for op in [instr.result, instr.arg1, instr.arg2]:
-                if isinstance(op, Temp):
-                    all_vars.add(op)
-
-    # IN e OUT guardam um dicionário { var_destino: var_origem }
-    # Inicializamos com todas as cópias possíveis (Universal Set) para a interseção funcionar
-    # Exceto o bloco de entrada, que começa vazio.
-    in_states = {bb: {} for bb in ic.bb_sequence}
-    out_states = {bb: {v: v for v in all_vars} for bb in ic.bb_sequence} # Estado "Universal"
-    
-    ic.bb_sequence[0].predecessors = [] # Garantir entrada
-    out_states[ic.bb_sequence[0]] = {} 
+            exponent = instr.arg2
+            if (instr.op != Operator.POW or not instr.result.type.is_integral or not instr.arg1.type.is_integral
+                    or not exponent.is_const or not 0 <= exponent.value <= limit):
+                expanded.append(instr)
+                continue
+            changed = True
+            n = exponent.value
+            if n <= 1:
+                instr.op, instr.arg2 = Operator.MOVE, Operand.EMPTY
+                if n == 0:
+                    instr.arg1 = Const(instr.result.type, 1)
+                expanded.append(instr)
+                continue
+            # Da esquerda para a direita pelos bits de n: eleva ao quadrado a
+            # cada bit e multiplica pela base nos bits 1
+            power = instr.arg1
+            for bit in bin(n)[3:]:
+                square = ic.new_temp(instr.result.type)
+                expanded.append(Instr(Operator.MUL, power, power, square))
+                power = square
+                if bit == '1':
+                    product = ic.new_temp(instr.result.type)
+                    expanded.append(Instr(Operator.MUL, power, instr.arg1, product))
+                    power = product
+            last = expanded[-1]
+            last.result = instr.result
+            expanded[-1] = instr
+            instr.op, instr.arg1, instr.arg2 = Operator.MUL, last.arg1, last.arg2
+        bb.instructions = expanded
+    return changed
 
-    worklist = list(ic.bb_sequence)
 
-    while worklist:
-        bb = worklist.pop(0)
+@staticmethod
+def reduce_induction_variables(ic):
+    # Redução de força (ver loops.induction_variables): cada derivada
+    # j = f * i + o vira a cópia de um acumulador, iniciado antes do laço e
+    # somado de f * c depois de cada i = i + c. Acumuladores com a mesma
+    # básica, fator e deslocamento são compartilhados
+    if not ic.bb_sequence:
+        return False
 
-        # 1. MEET (Interseção das cópias que vêm de todos os predecessores)
-        if bb.predecessors:
-            new_in = None
-            for pred in bb.predecessors:
-                if new_in is None:
-                    new_in = out_states[pred].copy()
+    def key(arg):
+        return ('c', arg.value) if arg.is_const else ('t', arg.number)
+
+    def reduce(loop, cfg, dom):
+        ivs = induction_variables(loop)
+        targets = [iv for iv in ivs.values() if not iv.is_basic and iv.update.op == Operator.MUL]
+        if not targets:
+            return False
+        preheader = insert_preheader(ic, loop, cfg)
+        if preheader is None:
+            return False
+        accumulators = {}
+        for iv in targets:
+            where = (iv.basic, key(iv.factor), key(iv.offset))
+            if where not in accumulators:
+                basic = ivs[iv.basic]
+                total = ic.new_temp(Type.INT)
+                preheader.instructions.append(Instr(Operator.MUL, iv.basic, iv.factor, total))
+                if not iv.offset.is_const or iv.offset.value != 0:
+                    preheader.instructions.append(Instr(Operator.SUM, total, iv.offset, total))
+                if basic.step.is_const and iv.factor.is_const:
+                    step = Const(Type.INT, IC.operate(Operator.MUL, basic.step.value, iv.factor.value))
+                elif basic.step.is_const and basic.step.value == 1:
+                    step = iv.factor
                 else:
-                    # Interseção: apenas cópias presentes em TODOS os caminhos
-                    new_in = {k: v for k, v in new_in.items() 
-                                if k in out_states[pred] and out_states[pred][k] == v}
-            in_states[bb] = new_in or {}
+                    step = ic.new_temp(Type.INT)
+                    preheader.instructions.append(Instr(Operator.MUL, basic.step, iv.factor, step))
+                after = basic.block.instructions.index(basic.update) + 1
+                basic.block.instructions.insert(after, Instr(Operator.SUM, total, step, total))
+                accumulators[where] = total
+            iv.update.op, iv.update.arg1, iv.update.arg2 = Operator.MOVE, accumulators[where], Operand.EMPTY
+        return True
 
-        # 2. TRANSFER
-        old_out = out_states[bb].copy()
-        current_copies = in_states[bb].copy()
+    return each_loop(ic, reduce)
 
-        for instr in bb.instructions:
-            # Se a instrução é v2 = t1 (MOVE entre registradores)
-            if instr.op == Operator.MOVE and isinstance(instr.result, Temp) and isinstance(instr.arg1, Temp):
-                # v2 agora é uma cópia de t1 (ou de quem t1 já era cópia)
-                src = current_copies.get(instr.arg1, instr.arg1)
-                current_copies[instr.result] = src
-            
-            # KILL: Se a variável é alterada, ela não pode mais ser destino nem origem de cópias
-            elif isinstance(instr.result, Temp):
-                res = instr.result
-                # Remove se ela era o destino: v2 = ...
-                current_copies.pop(res, None)
-                # Remove qualquer par onde ela era a origem: ... = v2
-                current_copies = {k: v for k, v in current_copies.items() if v != res}
-
-        out_states[bb] = current_copies
-
-        if out_states[bb] != old_out:
-            for succ in bb.successors:
-                if succ not in worklist:
-                    worklist.append(succ)
 
-    # 3. APPLY
-    return apply_copy_propagation(ic, in_states)
 
 @staticmethod
-def apply_copy_propagation(ic, in_states):
+def global_copy_propagation(ic):
+    # Cópias disponíveis (ver dataflow.ReachingCopies): um uso de v2 depois
+    # de v2 = t1 vira uso de t1 se, em todos os caminhos até ali, nem v2 nem
+    # t1 foram redefinidos (inclusive por outra cópia)
+    copies = ReachingCopies(CFG.of(ic))
     changed = False
     for bb in ic.bb_sequence:
-        current_copies = in_states[bb].copy()
+        available = copies.ins[bb]
         for instr in bb.instructions:
-            # Substitui arg1 e arg2 se houver uma cópia disponível
-            if isinstance(instr.arg1, Temp) and instr.arg1 in current_copies:
-                instr.arg1 = current_copies[instr.arg1]
-                changed = True
-            if isinstance(instr.arg2, Temp) and instr.arg2 in current_copies:
-                instr.arg2 = current_copies[instr.arg2]
-                changed = True
-            
-            # Atualiza o estado local para a próxima instrução
-            if instr.op == Operator.MOVE and isinstance(instr.result, Temp) and isinstance(instr.arg1, Temp):
-                current_copies[instr.result] = current_copies.get(instr.arg1, instr.arg1)
-            elif isinstance(instr.result, Temp):
-                res = instr.result
-                current_copies.pop(res, None)
-                current_copies = {k: v for k, v in current_copies.items() if v != res}
+            # O estado seguinte vem da cópia original, antes da substituição
+            after = copies.step(instr, available)
+            if available:
+                for k in ('arg1', 'arg2'):
+                    arg = getattr(instr, k)
+                    if arg.is_temp:
+                        # v3 = v2 e v2 = t1 disponíveis: v3 vale t1
+                        src = copies.source(arg, available)
+                        while src is not None:
+                            arg = src
+                            src = copies.source(arg, available)
+                        if arg is not getattr(instr, k):
+                            setattr(instr, k, arg)
+                            changed = True
+            available = after
     return changed
 
 
 
 @staticmethod
 def global_dead_code_elimination(ic):
-    # 1. ANÁLISE DE VIVACIDADE (Liveness Analysis)
-    # Inicializa IN e OUT de cada bloco como conjuntos vazios
-    in_sets = {bb: set() for bb in ic.bb_sequence}
-    out_sets = {bb: set() for bb in ic.bb_sequence}
-    
-    worklist = list(reversed(ic.bb_sequence))
-    
-    while worklist:
-        bb = worklist.pop(0)
-        
-        # OUT[bb] = união dos INs de todos os sucessores
-        new_out = set()
-        for succ in bb.successors:
-            new_out.update(in_sets[succ])
-        out_sets[bb] = new_out
-        
-        # IN[bb] = (OUT[bb] - DEFs) + USEs
-        # Processamos as instruções do bloco de trás para frente para calcular o IN
-        current_live = out_sets[bb].copy()
-        for instr in reversed(bb.instructions):
-            # Se a instrução define algo, isso "mata" a vivacidade para cima
-            if isinstance(instr.result, Temp):
-                current_live.discard(instr.result)
-            # Se a instrução usa algo, isso "gera" vivacidade para cima
-            if isinstance(instr.arg1, Temp):
-                current_live.add(instr.arg1)
-            if isinstance(instr.arg2, Temp):
-                current_live.add(instr.arg2)
-        
-        if current_live != in_sets[bb]:
-            in_sets[bb] = current_live
-            # Se o IN mudou, os predecessores precisam ser reanalisados
-            for pred in bb.predecessors:
-                if pred not in worklist:
-                    worklist.append(pred)
+    # 1. ANÁLISE DE VIVACIDADE (ver dataflow.Liveness)
+    liveness = Liveness(CFG.of(ic), ic.temp_count)
 
     # 2. ELIMINAÇÃO (Baseada na análise)
     changed = False
     for bb in ic.bb_sequence:
         new_instrs = []
         # Começamos com as variáveis vivas na SAÍDA do bloco
-        live_at_this_point = out_sets[bb].copy()
+        live = liveness.outs[bb]
         
         # Analisamos de trás para frente para saber o que está vivo em cada linha
         for instr in reversed(bb.instructions):
-            is_dead = False
             res = instr.result
             
             # Regra de Ouro do DCE:
@@ -323,25 +657,16 @@ def global_dead_code_elimination(ic):
             # 1. O resultado é um Temp (registrador/variável)
             # 2. Esse Temp NÃO está vivo no momento
             # 3. A instrução não tem efeitos colaterais (como PRINT ou CALL)
-            if isinstance(res, Temp):
-                if res not in live_at_this_point and instr.op not in (Operator.PRINT, Operator.READ):
-                    is_dead = True
-            
-            if is_dead:
+            if (res.is_temp and not live >> res.number & 1
+                    and instr.op not in (Operator.PRINT, Operator.READ)):
                 changed = True
                 continue # Remove a instrução
             
             # Se não for removida, atualizamos o que está vivo para a linha de cima
-            if isinstance(instr.result, Temp):
-                live_at_this_point.discard(instr.result)
-            if isinstance(instr.arg1, Temp):
-                live_at_this_point.add(instr.arg1)
-            if isinstance(instr.arg2, Temp):
-                live_at_this_point.add(instr.arg2)
-            
+            live = Liveness.step(instr, live)
             new_instrs.append(instr)
         
-        bb.instructions = list(reversed(new_instrs))
+        bb.instructions = new_instrs[::-1]
         
     return changed
 
@@ -357,7 +682,7 @@ def simplify_graph_branches(ic: IC):
         last = bb.instructions[-1]
         
         # Foco: Transformar IFFALSE constante em GOTO ou nada
-        if last.op == Operator.IFFALSE and last.arg1.is_const:
+        if last.op == Operator.IFFALSE and last.arg1.is_const and last.relation is None:
             val = last.arg1.value
             target_label = last.result
             
@@ -383,6 +708,21 @@ def simplify_graph_branches(ic: IC):
                 bb.successors.remove(target_bb)
                 target_bb.predecessors.remove(bb)
 
+        # Desvio para o mesmo lugar pelos dois lados: o fallthrough é um
+        # bloco vazio que só cai no alvo (a guarda de uma divisão que o LICM
+        # tirou do laço, depois que o DCE apagou a conta)
+        elif last.op in (Operator.IF, Operator.IFFALSE) and last.relation is None and len(bb.successors) == 2:
+            target_bb, empty = bb.successors
+            if empty.instructions or empty.predecessors != [bb] or empty.successors != [target_bb]:
+                continue
+            changed = True
+            bb.instructions.pop()
+            bb.successors = [target_bb]
+            empty.predecessors.clear()
+            target_bb.predecessors = [pred for pred in target_bb.predecessors if pred is not empty]
+            if bb not in target_bb.predecessors:
+                target_bb.predecessors.append(bb)
+
     # APÓS simplificar as arestas, chame a limpeza
     if changed:
         remove_unreachable_blocks(ic)
@@ -429,36 +769,59 @@ def remove_unreachable_blocks(ic):
 @staticmethod
 def merge_blocks(ic):
     changed = False
-    i = 0
-    while i < len(ic.bb_sequence) - 1:
-        curr = ic.bb_sequence[i]
+    entry = ic.bb_sequence[0] if ic.bb_sequence else None
+    merged = set() # Blocos absorvidos, tirados da sequência só no fim
+    # Vizinhos de cada bloco na sequência sem os absorvidos (lista duplamente ligada)
+    after = dict(zip(ic.bb_sequence, ic.bb_sequence[1:] + [None]))
+    before = dict(zip(ic.bb_sequence, [None] + ic.bb_sequence[:-1]))
+    for curr in ic.bb_sequence:
+        if curr in merged:
+            continue
         
         # Só podemos fundir se:
         # 1. curr tem exatamente 1 sucessor (succ)
         # 2. succ tem exatamente 1 predecessor (curr)
-        if len(curr.successors) == 1:
+        # (e succ não é o próprio curr nem a entrada, num laço)
+        # Depois de fundir, curr é testado de novo com o novo sucessor
+        while len(curr.successors) == 1:
             succ = curr.successors[0]
-            if len(succ.predecessors) == 1:
-                # FUNDIR!
-                # a) Remove instrução de pulo incondicional (GOTO) no final de curr se houver
-                if curr.instructions and curr.instructions[-1].op == Operator.GOTO:
-                    curr.instructions.pop()
-                
-                # b) Anexa instruções do sucessor no atual
-                # Se a primeira instrução do sucessor for um LABEL, podemos ignorá-lo na fusão
-                start_idx = 1 if succ.instructions and succ.instructions[0].op == Operator.LABEL else 0
-                curr.instructions.extend(succ.instructions[start_idx:])
-                
-                # c) O atual herda os sucessores do bloco "comido"
-                curr.successors = succ.successors
-                
-                # d) Atualizar os predecessores dos novos sucessores
-                for s in curr.successors:
-                    s.predecessors = [p if p != succ else curr for p in s.predecessors]
-                
-                # e) Remover o bloco succ da lista global e reiniciar o teste no curr atual
-                ic.bb_sequence.remove(succ)
-                changed = True
-                continue 
-        i += 1
-    return changed
\ No newline at end of file
+            if len(succ.predecessors) != 1 or succ is curr or succ is entry:
+                break
+            # Um succ longe de curr que cai no bloco seguinte a ele perderia
+            # esse fallthrough ao ir para o fim de curr
+            if after[curr] is not succ and not (succ.instructions and succ.instructions[-1].op == Operator.GOTO):
+                break
+            # FUNDIR!
+            # a) Remove instrução de pulo incondicional (GOTO) no final de curr se houver,
+            # e também um pulo condicional para succ, que vai para o mesmo lugar nos
+            # dois casos (se ficasse, seria um salto para um rótulo que deixa de existir)
+            if curr.instructions and curr.instructions[-1].op == Operator.GOTO:
+                curr.instructions.pop()
+            elif (curr.instructions and curr.instructions[-1].op in (Operator.IF, Operator.IFFALSE)
+                  and succ.instructions and succ.instructions[0].op == Operator.LABEL
+                  and curr.instructions[-1].result == succ.instructions[0].result):
+                curr.instructions.pop()
+            
+            # b) Anexa instruções do sucessor no atual
+            # Se a primeira instrução do sucessor for um LABEL, podemos ignorá-lo na fusão
+            start_idx = 1 if succ.instructions and succ.instructions[0].op == Operator.LABEL else 0
+            curr.instructions.extend(succ.instructions[start_idx:])
+            
+            # c) O atual herda os sucessores do bloco "comido"
+            curr.successors = succ.successors
+            
+            # d) Atualizar os predecessores dos novos sucessores
+            for s in curr.successors:
+                s.predecessors = [p if p != succ else curr for p in s.predecessors]
+            
+            # e) Marca o bloco succ para sair da lista global
+            merged.add(succ)
+            if before[succ] is not None:
+                after[before[succ]] = after[succ]
+            if after[succ] is not None:
+                before[after[succ]] = before[succ]
+            changed = True
+    
+    if merged:
+        ic.bb_sequence = [bb for bb in ic.bb_sequence if bb not in merged]
+    return changed
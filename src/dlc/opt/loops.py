@@ -0,0 +1,230 @@
+from dlc.inter.ic import IC
+from dlc.inter.instr import Instr
+from dlc.inter.operand import Const, Operand
+from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, DominatorTree
+from dlc.opt.ssa import phis
+from dlc.semantic.type import Type
+
+
+class Loop:
+    '''Laço natural: o cabeçalho (header), por onde se entra no laço, os
+    blocos de onde saem as arestas de volta para ele (latches) e o corpo
+    (body), com o cabeçalho e todo bloco que chega a um latch sem passar
+    pelo cabeçalho.'''
+
+    def __init__(self, header, latches: list, body: set):
+        self.header = header
+        self.latches = latches
+        self.body = body
+
+    def __contains__(self, bb):
+        return bb in self.body
+
+    def __repr__(self):
+        return f'<loop {self.header}: {len(self.body)} blocos>'
+
+
+def natural_loops(cfg: CFG, dom: DominatorTree):
+    '''Laços naturais dos blocos alcançáveis do CFG, um por cabeçalho (as
+    arestas de volta s -> h, em que h domina s, que chegam ao mesmo h formam
+    um só laço), dos mais internos para os mais externos.'''
+    latches = {}
+    for bb in cfg.rpo:
+        if bb not in cfg.reachable:
+            continue
+        for succ in cfg.successors[bb]:
+            if dom.dominates(succ, bb):
+                latches.setdefault(succ, []).append(bb)
+
+    loops = []
+    for header, sources in latches.items():
+        body = {header}
+        work = list(sources)
+        while work:
+            bb = work.pop()
+            if bb not in body and bb in cfg.reachable:
+                body.add(bb)
+                work.extend(cfg.predecessors[bb])
+        loops.append(Loop(header, sources, body))
+    # Um laço interno tem menos blocos que qualquer laço que o contenha
+    position = {bb: i for i, bb in enumerate(cfg.rpo)}
+    loops.sort(key=lambda loop: (len(loop.body), position[loop.header]))
+    return loops
+
+
+def each_loop(ic: IC, transform):
+    '''Chama transform(loop, cfg, dom) para cada laço natural do IC, dos
+    internos para os externos. Quando transform muda o IC (e retorna True),
+    o CFG e os dominadores são refeitos e os laços que faltam são procurados
+    de novo no grafo novo. Retorna se algum laço mudou.'''
+    changed = False
+    done = set() # Cabeçalhos dos laços já tratados
+    pending = None
+    while pending is None or pending:
+        if pending is None:
+            cfg = CFG.of(ic)
+            dom = DominatorTree(cfg)
+            pending = [loop for loop in natural_loops(cfg, dom) if loop.header not in done]
+            continue
+        loop = pending.pop(0)
+        done.add(loop.header)
+        if transform(loop, cfg, dom):
+            changed = True
+            pending = None
+    return changed
+
+
+def insert_preheader(ic: IC, loop: Loop, cfg: CFG):
+    '''Cria um bloco vazio (só com um rótulo) logo antes do cabeçalho do laço,
+    por onde passam todas as entradas no laço: os saltos de fora para o
+    cabeçalho passam a ir para ele, e as arestas de volta continuam indo
+    direto para o cabeçalho. Na forma SSA, os operandos dos PHIs do
+    cabeçalho que vinham de fora passam a vir do bloco novo (juntos num PHI
+    dele, se vinham de mais de um predecessor). Retorna o bloco, ou None se
+    o bloco anterior ao cabeçalho é do laço e cai nele por um desvio
+    condicional (não há onde pôr o bloco novo sem inverter o desvio).
+
+    cfg deve ser o grafo atual do IC; as listas successors e predecessors
+    dos blocos são atualizadas, mas cfg não.'''
+    header = loop.header
+    outside = [pred for pred in cfg.predecessors[header] if pred not in loop]
+    at = ic.bb_sequence.index(header)
+    previous = ic.bb_sequence[at - 1] if at > 0 else None
+    if previous is not None and previous in loop and previous.fallthrough is header:
+        last = previous.instructions[-1] if previous.instructions else None
+        if last is not None and last.op in (Operator.IF, Operator.IFFALSE):
+            return None
+        previous.instructions.append(Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY, ic.label_of(header)))
+
+    preheader = ic.new_block()
+    label = ic.new_label()
+    preheader.instructions.append(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, label))
+    first = header.instructions[0] if header.instructions else None
+    header_label = first.result if first is not None and first.op == Operator.LABEL else None
+    for pred in outside:
+        last = pred.instructions[-1] if pred.instructions else None
+        if (last is not None and last.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE)
+                and header_label is not None and last.result == header_label):
+            last.result = label
+        pred.successors = [preheader if succ is header else succ for succ in pred.successors]
+    preheader.predecessors = outside
+    preheader.successors = [header]
+    header.predecessors = [preheader] + [pred for pred in header.predecessors if pred not in outside]
+
+    for phi in list(phis(header)):
+        incoming = {pred: phi.sources.pop(pred) for pred in outside if pred in phi.sources}
+        if len(incoming) == 1:
+            phi.sources[preheader] = next(iter(incoming.values()))
+        elif incoming:
+            merged = ic.new_temp(phi.result.type)
+            if phi.result in ic.var_temps:
+                ic.var_temps[merged] = ic.var_temps[phi.result]
+            preheader.instructions.append(Instr(Operator.PHI, Operand.EMPTY, Operand.EMPTY, merged, incoming))
+            phi.sources[preheader] = merged
+
+    ic.bb_sequence.insert(at, preheader)
+    return preheader
+
+
+class InductionVariable:
+    '''Variável de indução inteira de um laço: logo depois de update (a
+    instrução do laço que a define), temp vale factor * basic + offset, com
+    factor e offset constantes ou temporários invariantes no laço. Numa
+    variável básica, basic é o próprio temp, e update soma step a ela a
+    cada volta.'''
+
+    def __init__(self, temp, basic, factor, offset, block, update, step=None):
+        self.temp = temp
+        self.basic = basic
+        self.factor = factor
+        self.offset = offset
+        self.block = block
+        self.update = update
+        self.step = step
+
+    @property
+    def is_basic(self):
+        return self.temp is self.basic
+
+    def __repr__(self):
+        return f'<iv {self.temp} = {self.factor} * {self.basic} + {self.offset}>'
+
+
+def induction_variables(loop: Loop):
+    '''Variáveis de indução inteiras do laço, por temporário. As básicas têm
+    uma só definição no laço, i = i + c, c + i ou i - c (ou t = i + c
+    seguida de i = t no mesmo bloco), com c invariante (só constante na
+    subtração). As derivadas também têm uma só definição, j = u * k, u + k,
+    k + u ou u - k, com k invariante e u de indução; uma derivada só vale em
+    função do valor atual da básica até a próxima atualização dela, então u
+    derivada tem de vir antes, no mesmo bloco, sem atualização no meio.
+    Fator e deslocamento temporários não se combinam com outros (i * k + c
+    é derivada só se k ou c é constante).'''
+    blocks = sorted(loop.body, key=lambda bb: bb.number)
+    defs = {}
+    for bb in blocks:
+        for instr in bb:
+            if instr.result.is_temp:
+                defs.setdefault(instr.result, []).append((bb, instr))
+
+    def invariant(arg):
+        return arg.is_const or arg.is_temp and arg not in defs
+
+    def single(temp):
+        found = defs.get(temp, ())
+        return found[0] if len(found) == 1 and temp.type.is_integral else (None, None)
+
+    one, zero = Const(Type.INT, 1), Const(Type.INT, 0)
+    ivs = {}
+    for temp in defs:
+        bb, update = single(temp)
+        if update is None:
+            continue
+        instr = update
+        if instr.op == Operator.MOVE and instr.arg1.is_temp:
+            source_bb, instr = single(instr.arg1)
+            if source_bb is not bb or bb.instructions.index(instr) > bb.instructions.index(update):
+                continue
+        if instr.op == Operator.SUM and instr.arg1 is temp and invariant(instr.arg2):
+            step = instr.arg2
+        elif instr.op == Operator.SUM and instr.arg2 is temp and invariant(instr.arg1):
+            step = instr.arg1
+        elif instr.op == Operator.SUB and instr.arg1 is temp and instr.arg2.is_const:
+            step = Const(Type.INT, IC.operate_unary(Operator.MINUS, instr.arg2.value))
+        else:
+            continue
+        if step.type.is_integral:
+            ivs[temp] = InductionVariable(temp, temp, one, zero, bb, update, step)
+
+    updates = {iv.update: iv.basic for iv in ivs.values()}
+    for bb in blocks:
+        valid = {} # Derivadas do bloco que ainda acompanham as suas básicas
+        for instr in bb:
+            if instr in updates:
+                valid = {temp: iv for temp, iv in valid.items() if iv.basic is not updates[instr]}
+                continue
+            result = instr.result
+            if result in ivs or single(result)[1] is not instr:
+                continue
+            form = None
+            for u, k in ((instr.arg1, instr.arg2), (instr.arg2, instr.arg1)):
+                source = ivs.get(u) if u in ivs and ivs[u].is_basic else valid.get(u)
+                if source is None or not invariant(k) or not k.type.is_integral:
+                    continue
+                factor, offset = source.factor, source.offset
+                if instr.op == Operator.MUL:
+                    if factor.is_const and offset.is_const and k.is_const:
+                        form = (Const(Type.INT, IC.operate(Operator.MUL, factor.value, k.value)),
+                                Const(Type.INT, IC.operate(Operator.MUL, offset.value, k.value)))
+                    elif source.is_basic:
+                        form = (k, zero)
+                elif instr.op == Operator.SUM or instr.op == Operator.SUB and u is instr.arg1:
+                    if offset.is_const and k.is_const:
+                        form = (factor, Const(Type.INT, IC.operate(instr.op, offset.value, k.value)))
+                    elif offset.is_const and offset.value == 0 and instr.op == Operator.SUM:
+                        form = (factor, k)
+                if form is not None:
+                    ivs[result] = valid[result] = InductionVariable(result, source.basic, *form, bb, instr)
+                    break
+    return ivs
@@ -0,0 +1,154 @@
+from dlc.inter.ic import IC
+from dlc.inter.operand import Const, Operand
+from dlc.inter.operator import Operator
+from dlc.semantic.type import Type
+
+RELATIONAL = (Operator.EQ, Operator.NE, Operator.LT, Operator.LE, Operator.GT, Operator.GE)
+
+
+def is_number(arg, value):
+    return arg.is_const and not arg.type.is_boolean and arg.value == value
+
+
+def is_truth(arg, value: bool):
+    return arg.is_const and arg.type.is_boolean and arg.value == value
+
+
+def integral(instr):
+    return instr.result.type.is_integral
+
+
+def move(arg):
+    return Operator.MOVE, arg, Operand.EMPTY
+
+
+def negate(arg):
+    return Operator.NOT, arg, Operand.EMPTY
+
+
+def single_use(arg, state):
+    return state.uses.get(arg, 0) == 1
+
+
+def branch_on_not(instr, state):
+    d = state.definition(instr.arg1)
+    return (instr.relation is None and d is not None and d.op == Operator.NOT
+            and single_use(instr.arg1, state))
+
+
+def branch_on_relation(instr, state):
+    d = state.definition(instr.arg1)
+    return (instr.relation is None and d is not None and d.op in RELATIONAL
+            and single_use(instr.arg1, state))
+
+
+def inverted(instr, state):
+    op = Operator.IFFALSE if instr.op == Operator.IF else Operator.IF
+    return op, state.definition(instr.arg1).arg1, Operand.EMPTY
+
+
+def fused(instr, state):
+    d = state.definition(instr.arg1)
+    return instr.op, d.arg1, d.arg2, d.op
+
+
+# Regras (operador, condição, reescrita): a condição e a reescrita recebem a
+# instrução e o estado do bloco (definições locais ainda válidas e número de
+# usos de cada temporário), e a reescrita retorna o novo (op, arg1, arg2) e,
+# nos desvios, a comparação embutida. Nos reais, só as identidades exatas
+# para todo valor (x + 0 muda -0.0, x * 0 e x - x mudam inf e nan).
+RULES = [
+    (Operator.SUM, lambda i, s: integral(i) and is_number(i.arg2, 0), lambda i, s: move(i.arg1)),
+    (Operator.SUM, lambda i, s: integral(i) and is_number(i.arg1, 0), lambda i, s: move(i.arg2)),
+    (Operator.SUB, lambda i, s: is_number(i.arg2, 0), lambda i, s: move(i.arg1)),
+    (Operator.SUB, lambda i, s: integral(i) and i.arg1.is_temp and i.arg1 is i.arg2,
+     lambda i, s: move(Const(Type.INT, 0))),
+    (Operator.MUL, lambda i, s: is_number(i.arg2, 1), lambda i, s: move(i.arg1)),
+    (Operator.MUL, lambda i, s: is_number(i.arg1, 1), lambda i, s: move(i.arg2)),
+    (Operator.MUL, lambda i, s: integral(i) and (is_number(i.arg1, 0) or is_number(i.arg2, 0)),
+     lambda i, s: move(Const(Type.INT, 0))),
+    (Operator.DIV, lambda i, s: is_number(i.arg2, 1), lambda i, s: move(i.arg1)),
+    (Operator.MOD, lambda i, s: integral(i) and is_number(i.arg2, 1), lambda i, s: move(Const(Type.INT, 0))),
+    # !!b
+    (Operator.NOT, lambda i, s: getattr(s.definition(i.arg1), 'op', None) == Operator.NOT,
+     lambda i, s: move(s.definition(i.arg1).arg1)),
+    # b == verdade, b != falso, b == falso, b != verdade (e com os lados trocados)
+    (Operator.EQ, lambda i, s: is_truth(i.arg2, True), lambda i, s: move(i.arg1)),
+    (Operator.EQ, lambda i, s: is_truth(i.arg1, True), lambda i, s: move(i.arg2)),
+    (Operator.NE, lambda i, s: is_truth(i.arg2, False), lambda i, s: move(i.arg1)),
+    (Operator.NE, lambda i, s: is_truth(i.arg1, False), lambda i, s: move(i.arg2)),
+    (Operator.EQ, lambda i, s: is_truth(i.arg2, False), lambda i, s: negate(i.arg1)),
+    (Operator.EQ, lambda i, s: is_truth(i.arg1, False), lambda i, s: negate(i.arg2)),
+    (Operator.NE, lambda i, s: is_truth(i.arg2, True), lambda i, s: negate(i.arg1)),
+    (Operator.NE, lambda i, s: is_truth(i.arg1, True), lambda i, s: negate(i.arg2)),
+    # Conversão de um valor que já é real (convert de convert)
+    (Operator.CONVERT, lambda i, s: i.arg1.type.is_float, lambda i, s: move(i.arg1)),
+    # Desvio pela negação: if !c vira iffalse c
+    (Operator.IF, branch_on_not, inverted),
+    (Operator.IFFALSE, branch_on_not, inverted),
+    # Comparação seguida de desvio: t = a < b; iffalse t goto L vira
+    # iffalse a < b goto L (cmp + jcc no x64)
+    (Operator.IF, branch_on_relation, fused),
+    (Operator.IFFALSE, branch_on_relation, fused),
+]
+
+RULES_BY_OP = {}
+for rule in RULES:
+    RULES_BY_OP.setdefault(rule[0], []).append(rule[1:])
+
+
+class BlockState:
+    '''Definições de um bloco básico que ainda valem no ponto atual (nenhum
+    operando delas foi redefinido depois) e usos de cada temporário no IC.'''
+
+    def __init__(self, uses: dict):
+        self.uses = uses
+        self.defs = {}    # Temporário -> instrução que o definiu
+        self.readers = {} # Temporário -> (resultado, instrução) das definições que o leem
+
+    def definition(self, arg):
+        return self.defs.get(arg) if arg.is_temp else None
+
+    def define(self, instr):
+        result = instr.result
+        if not result.is_temp:
+            return
+        for temp, d in self.readers.pop(result, ()):
+            if self.defs.get(temp) is d:
+                del self.defs[temp]
+        self.defs.pop(result, None)
+        args = [arg for arg in (instr.arg1, instr.arg2) if arg.is_temp]
+        if result in args:
+            return # i = i + 1 lê o i antigo
+        self.defs[result] = instr
+        for arg in args:
+            self.readers.setdefault(arg, []).append((result, instr))
+
+
+def simplify(ic: IC):
+    '''Simplificação algébrica e peephole no TAC, pela tabela RULES: cada
+    instrução é reescrita pela primeira regra do seu operador que casa, até
+    nenhuma casar. As definições que sobram sem uso (a comparação de um
+    desvio que a incorporou, o primeiro not de !!b) ficam para a eliminação
+    de código morto. Retorna se algo mudou.'''
+    uses = {}
+    for instr in ic:
+        for arg in (instr.arg1, instr.arg2):
+            if arg.is_temp:
+                uses[arg] = uses.get(arg, 0) + 1
+
+    changed = False
+    for bb in ic.bb_sequence:
+        state = BlockState(uses)
+        for instr in bb.instructions:
+            rewritten = True
+            while rewritten:
+                rewritten = False
+                for when, then in RULES_BY_OP.get(instr.op, ()):
+                    if when(instr, state):
+                        instr.op, instr.arg1, instr.arg2, *relation = then(instr, state)
+                        instr.relation = relation[0] if relation else None
+                        changed = rewritten = True
+                        break
+            state.define(instr)
+    return changed
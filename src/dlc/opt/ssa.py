@@ -0,0 +1,331 @@
+from dlc.inter.ic import IC
+from dlc.inter.instr import Instr
+from dlc.inter.operand import Operand
+from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, DominatorTree, Liveness
+
+
+def phis(bb):
+    '''PHIs de bb, que ficam no início do bloco (depois do rótulo, se houver).'''
+    for instr in bb.instructions:
+        if instr.op == Operator.PHI:
+            yield instr
+        elif instr.op != Operator.LABEL:
+            break
+
+
+class SSALiveness(Liveness):
+    '''Vivacidade na forma SSA: o resultado de um PHI é definido na entrada
+    do bloco, e cada operando é usado no fim do predecessor de onde vem, e
+    não no bloco do PHI. edge_uses[bb] são os operandos usados assim no fim
+    de bb, que ficam vivos na saída dele além de outs[bb].'''
+
+    def __init__(self, cfg: CFG, temp_count: int):
+        self.edge_uses = {bb: 0 for bb in cfg.blocks}
+        for bb in cfg.blocks:
+            for phi in phis(bb):
+                for pred, arg in phi.sources.items():
+                    if arg.is_temp and pred in self.edge_uses and pred in cfg.predecessors[bb]:
+                        self.edge_uses[pred] |= 1 << arg.number
+        super().__init__(cfg, temp_count)
+
+    def transfer(self, bb, value):
+        return super().transfer(bb, value | self.edge_uses[bb])
+
+
+def to_ssa(ic: IC):
+    '''Põe o IC na forma SSA (Cytron et al.), em que cada temporário tem uma
+    única definição, que domina os seus usos. Os temporários definidos mais
+    de uma vez e os das variáveis do programa ganham um temporário novo por
+    definição (as novas versões de uma variável continuam em ic.var_temps),
+    com PHIs nas fronteiras de dominância iteradas dos blocos que os definem,
+    só onde estão vivos (SSA podada). Um uso sem definição que o alcance
+    (variável não inicializada) continua com o temporário original.
+
+    Os blocos inalcançáveis também são renomeados, cada um como raiz, com o
+    que chega a eles indefinido. Retorna a árvore de dominadores.'''
+    cfg = CFG.of(ic)
+    dom = DominatorTree(cfg)
+    if not cfg.blocks:
+        return dom
+
+    def_blocks = {}
+    for bb in cfg.blocks:
+        for instr in bb.instructions:
+            if instr.result.is_temp:
+                def_blocks.setdefault(instr.result, {})[bb] = True
+    renamed = sorted((temp for temp, blocks in def_blocks.items() if len(blocks) > 1 or temp in ic.var_temps),
+                     key=lambda temp: temp.number)
+
+    # 1. Inserção dos PHIs
+    liveness = Liveness(cfg, ic.temp_count)
+    placed = {}  # Bloco -> PHIs novos, na ordem dos temporários
+    phi_var = {} # PHI -> temporário original
+    for temp in renamed:
+        bit = 1 << temp.number
+        work = list(def_blocks[temp])
+        seen = set()
+        while work:
+            for df in dom.frontier[work.pop()]:
+                if df in seen or not liveness.ins[df] & bit:
+                    continue
+                seen.add(df)
+                phi = Instr(Operator.PHI, Operand.EMPTY, Operand.EMPTY, temp, {})
+                placed.setdefault(df, []).append(phi)
+                phi_var[phi] = temp
+                if df not in def_blocks[temp]:
+                    work.append(df)
+    for bb, new in placed.items():
+        at = 1 if bb.instructions and bb.instructions[0].op == Operator.LABEL else 0
+        bb.instructions[at:at] = new
+
+    # 2. Renomeação, em pré-ordem na árvore de dominadores
+    stacks = {temp: [] for temp in renamed}
+
+    def fresh(temp):
+        new = ic.new_temp(temp.type)
+        if temp in ic.var_temps:
+            ic.var_temps[new] = ic.var_temps[temp]
+        stacks[temp].append(new)
+        return new
+
+    def current(arg):
+        stack = stacks.get(arg)
+        return stack[-1] if stack else arg
+
+    roots = [cfg.blocks[0]] + [bb for bb in cfg.blocks if bb not in cfg.reachable]
+    for root in roots:
+        work = [(root, None)]
+        while work:
+            bb, pushed = work.pop()
+            if pushed is not None: # Saída do bloco: desfaz as suas definições
+                for temp in pushed:
+                    stacks[temp].pop()
+                continue
+            pushed = []
+            for instr in bb.instructions:
+                if instr.op == Operator.PHI:
+                    temp = phi_var[instr]
+                    instr.result = fresh(temp)
+                    pushed.append(temp)
+                    continue
+                instr.arg1 = current(instr.arg1)
+                instr.arg2 = current(instr.arg2)
+                if instr.result in stacks:
+                    temp = instr.result
+                    instr.result = fresh(temp)
+                    pushed.append(temp)
+            for succ in cfg.successors[bb]:
+                for phi in phis(succ):
+                    phi.sources[bb] = current(phi_var[phi])
+            work.append((bb, pushed))
+            work.extend((child, None) for child in reversed(dom.children[bb]))
+    return dom
+
+
+def from_ssa(ic: IC):
+    '''Tira o IC da forma SSA, trocando cada PHI por cópias nos
+    predecessores. Antes, os temporários ligados por PHIs e por cópias que
+    não interferem (nenhum está vivo onde o outro é definido) são fundidos
+    num só, o de menor número (o original, no caso das variáveis), e as
+    cópias entre eles somem. As cópias de uma aresta são paralelas: são
+    ordenadas para que nenhuma sobrescreva a origem de outra, com um
+    temporário novo para desfazer os ciclos (ex.: troca de dois valores).
+    Uma aresta que sai de um desvio condicional é dividida num bloco novo
+    para as cópias. Retorna se havia algum PHI.'''
+    cfg = CFG.of(ic)
+    phi_blocks = [bb for bb in cfg.blocks if next(phis(bb), None) is not None]
+    if not phi_blocks:
+        return False
+
+    # 1. Fusão (coalescing) dos temporários
+    rep = _coalesce(ic, cfg)
+
+    def rename(arg):
+        return rep.get(arg, arg)
+
+    for bb in cfg.blocks:
+        kept = []
+        for instr in bb.instructions:
+            instr.arg1, instr.arg2, instr.result = rename(instr.arg1), rename(instr.arg2), rename(instr.result)
+            if instr.op == Operator.PHI:
+                instr.sources = {pred: rename(arg) for pred, arg in instr.sources.items()}
+            elif instr.op == Operator.MOVE and instr.arg1 is instr.result:
+                continue
+            kept.append(instr)
+        bb.instructions = kept
+
+    # 2. Cópias nas arestas
+    edges = {} # Predecessor -> {bloco: cópias paralelas (destino, origem)}
+    for bb in phi_blocks:
+        block_phis = list(phis(bb))
+        for pred in cfg.predecessors[bb]:
+            copies = [(phi.result, phi.sources[pred]) for phi in block_phis
+                      if pred in phi.sources and phi.sources[pred] is not phi.result]
+            if copies:
+                edges.setdefault(pred, {})[bb] = copies
+        bb.instructions = [instr for instr in bb.instructions if instr.op != Operator.PHI]
+    split = {} # Predecessor -> blocos novos que ficam logo depois dele
+    for pred, copies in edges.items():
+        split[pred] = _insert_copies(ic, pred, copies)
+    ic.bb_sequence = [new for bb in ic.bb_sequence for new in [bb] + split.get(bb, [])]
+    return True
+
+
+def _coalesce(ic: IC, cfg: CFG):
+    # Temporário -> representante da classe, para os que foram fundidos
+    liveness = SSALiveness(cfg, ic.temp_count)
+    pairs = []
+    for bb in cfg.blocks:
+        for instr in bb.instructions:
+            if instr.op == Operator.PHI:
+                pairs.extend((instr.result, arg) for arg in instr.sources.values() if arg.is_temp)
+    for bb in cfg.blocks:
+        for instr in bb.instructions:
+            if instr.op == Operator.MOVE and instr.result.is_temp and instr.arg1.is_temp:
+                pairs.append((instr.result, instr.arg1))
+    candidates = {temp for pair in pairs for temp in pair}
+    candidates.update(instr.result for instr in ic if instr.result in ic.var_temps)
+
+    # Temporário -> vivos onde ele é definido: dois valores interferem se um
+    # está vivo na definição do outro (na forma SSA, isso basta). O destino de
+    # uma cópia não interfere com a origem, já que os dois têm o mesmo valor
+    rows = {temp: 0 for temp in candidates}
+    for bb in cfg.blocks:
+        live = liveness.outs[bb] | liveness.edge_uses[bb]
+        for instr in reversed(bb.instructions):
+            if instr.op == Operator.PHI:
+                break
+            result = instr.result
+            if result in rows:
+                conflicts = live & ~(1 << result.number)
+                if instr.op == Operator.MOVE and instr.arg1.is_temp:
+                    conflicts &= ~(1 << instr.arg1.number)
+                rows[result] |= conflicts
+            live = Liveness.step(instr, live)
+        for phi in phis(bb):
+            if phi.result in rows:
+                rows[phi.result] |= live & ~(1 << phi.result.number)
+
+    parent = {}
+    members = {temp: 1 << temp.number for temp in candidates}
+    # Variáveis com versões na classe e as lidas por READ nela: o READ acha
+    # a variável pelo nome do destino (ver BatchInterpreter), então a classe
+    # de um READ não junta versões de outra variável
+    names = {temp: {ic.var_temps[temp]} if temp in ic.var_temps else set() for temp in candidates}
+    reads = {temp: set() for temp in candidates}
+    for instr in ic:
+        if instr.op == Operator.READ and instr.result in reads:
+            reads[instr.result].add(ic.var_temps.get(instr.result))
+
+    def find(temp):
+        root = temp
+        while root in parent:
+            root = parent[root]
+        while temp is not root:
+            parent[temp], temp = root, parent[temp]
+        return root
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra is rb or ra.type != rb.type:
+            continue
+        if rows[ra] & members[rb] or rows[rb] & members[ra]:
+            continue
+        if (reads[ra] or reads[rb]) and len(names[ra] | names[rb] | reads[ra] | reads[rb]) > 1:
+            continue
+        parent[rb] = ra
+        members[ra] |= members[rb]
+        rows[ra] |= rows[rb]
+        names[ra] |= names[rb]
+        reads[ra] |= reads[rb]
+
+    # Representante: uma versão de variável, se a classe tem alguma (a de
+    # menor número, ou então, se são todas versões de uma só, o temporário
+    # original dela, desde que ele não tenha ficado em algum uso indefinido);
+    # senão, o de menor número
+    originals = {}
+    for temp in ic.var_temps:
+        if ic.var_temps[temp] not in originals or temp.number < originals[ic.var_temps[temp]].number:
+            originals[ic.var_temps[temp]] = temp
+    used = set()
+    for instr in ic:
+        used.update((instr.arg1, instr.arg2, instr.result))
+        if instr.op == Operator.PHI:
+            used.update(instr.sources.values())
+    best = {}
+    for temp in sorted(candidates, key=lambda temp: temp.number):
+        root = find(temp)
+        if root not in best or temp in ic.var_temps and best[root] not in ic.var_temps:
+            best[root] = temp
+    for root in best:
+        if len(names[root]) == 1:
+            original = originals.get(next(iter(names[root])))
+            if original is not None and original not in used and original.type == root.type:
+                best[root] = original
+                used.add(original)
+    return {temp: best[find(temp)] for temp in candidates if best[find(temp)] is not temp}
+
+
+def _sequentialize(ic: IC, copies: list):
+    # Cópias paralelas (destino, origem) -> instruções MOVE em sequência
+    pending = dict(copies)
+    moves = []
+    while pending:
+        sources = set(pending.values())
+        ready = [dest for dest in pending if dest not in sources]
+        if ready:
+            for dest in ready:
+                moves.append(Instr(Operator.MOVE, pending.pop(dest), Operand.EMPTY, dest))
+        else:
+            # Só restam ciclos: guarda um destino num temporário novo
+            dest = next(iter(pending))
+            saved = ic.new_temp(dest.type)
+            moves.append(Instr(Operator.MOVE, dest, Operand.EMPTY, saved))
+            pending = {d: saved if s is dest else s for d, s in pending.items()}
+    return moves
+
+
+def _insert_copies(ic: IC, pred, copies: dict):
+    # copies: bloco sucessor de pred -> cópias paralelas da aresta. Retorna
+    # os blocos novos, que devem ficar logo depois de pred, nessa ordem
+    last = pred.instructions[-1] if pred.instructions else None
+    if last is None or last.op not in (Operator.IF, Operator.IFFALSE) or pred.target is pred.fallthrough:
+        # Um só sucessor: as cópias vão no fim de pred, antes do GOTO (um
+        # desvio condicional para o bloco seguinte não faz nada e sai)
+        (moves,) = copies.values()
+        moves = _sequentialize(ic, moves)
+        if last is not None and last.op == Operator.GOTO:
+            pred.instructions[-1:-1] = moves
+        else:
+            if last is not None and last.op in (Operator.IF, Operator.IFFALSE):
+                pred.instructions.pop()
+            pred.instructions.extend(moves)
+        return []
+
+    target, fallthrough = pred.target, pred.fallthrough
+    if target in copies and fallthrough not in copies:
+        # Inverte o desvio: a aresta com cópias passa a ser o fallthrough
+        last.op = Operator.IFFALSE if last.op == Operator.IF else Operator.IF
+        last.result = ic.label_of(fallthrough)
+        target, fallthrough = fallthrough, target
+
+    # Blocos novos logo depois de pred: primeiro o do fallthrough, que
+    # termina num salto para o sucessor, e depois o do destino do desvio
+    split = {}
+    for succ in (fallthrough, target):
+        if succ not in copies:
+            continue
+        bb = ic.new_block()
+        if succ is target:
+            label = ic.new_label()
+            bb.instructions.append(Instr(Operator.LABEL, Operand.EMPTY, Operand.EMPTY, label))
+            last.result = label
+        bb.instructions.extend(_sequentialize(ic, copies[succ]))
+        bb.instructions.append(Instr(Operator.GOTO, Operand.EMPTY, Operand.EMPTY, ic.label_of(succ)))
+        bb.successors = [succ]
+        bb.predecessors = [pred]
+        succ.predecessors = [bb if p is pred else p for p in succ.predecessors]
+        split[succ] = bb
+    pred.successors = [split.get(target, target), split.get(fallthrough, fallthrough)]
+    return list(split.values())
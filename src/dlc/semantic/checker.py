@@ -1,5 +1,5 @@
 from dlc.lex.tag import Tag
-from dlc.semantic.env import Env, SymbolInfo
+from dlc.semantic.env import SymbolTable, SymbolInfo
 from dlc.semantic.type import Type
 from dlc.tree.ast import AST
 from dlc.tree.nodes import (
@@ -23,57 +23,64 @@ import colorama
 
 class Checker(Visitor):
     
-    def __init__(self, ast: AST):
-        self.__env_top = Env()
+    def __init__(self, ast: AST=None):
+        self.__symbols = SymbolTable()
         self.had_errors = False
-        ast.root.accept(self)
+        if ast is not None:
+            self.visit(ast.root)
 
 
     def __error(self, line: int, msg: str):
         self.had_errors = True
-        colorama.init()
+        colorama.just_fix_windows_console()
         print(colorama.Fore.RED, end='')
         print(f'Erro semântico na linha {line}: {msg}')
         print(colorama.Style.RESET_ALL, end='')
 
     def __warning(self, line: int, msg: str):
-        colorama.init()
+        colorama.just_fix_windows_console()
         print(colorama.Fore.YELLOW, end='')
         print(f'Aviso na linha {line}: {msg}') 
         print(colorama.Style.RESET_ALL, end='')
         
         
     def visit_program_node(self, node: ProgramNode):
-        node.stmt.accept(self)
+        yield node.stmt
         
 
     def visit_block_node(self, node: BlockNode):
-        saved_env = self.__env_top
-        self.__env_top = Env(self.__env_top)
+        self.open_block()
         for stmt in node.stmts:
-            stmt.accept(self)        
-        for var in self.__env_top.var_list():
-            info = self.__env_top.get_local(var)
+            yield stmt        
+        self.close_block()
+
+    # Abertura e fechamento de escopo, também usados na compilação em fluxo
+    # (Parser.stream), em que os comandos do bloco principal chegam um a um
+    # e são verificados com visit()
+    def open_block(self):
+        self.__symbols.open_scope()
+
+    def close_block(self):
+        for var, info in self.__symbols.close_scope():
             if not info.used:
                 self.__warning(info.declaration_line, f'variável "{var}" declarada mas não usada.')
-        self.__env_top = saved_env
 
 
     def visit_decl_node(self, node: DeclNode):
         for var in node.vars:
             #var_name = var.name
-            if self.__env_top.get_local(var.name) is None:
+            if self.__symbols.get_local(var.name) is None:
                 var.type = Type.tag_to_type(node.token.tag)
-                var.scope = self.__env_top.number
-                self.__env_top.put(var.name, SymbolInfo(var.type, var.scope, node.line))
+                var.scope = self.__symbols.number
+                self.__symbols.put(var.name, SymbolInfo(var.type, var.scope, node.line))
             else:
                 var.type = Type.UNDEF
                 self.__error(node.line, f'"{var.name}" já declarada!')
 
 
     def visit_assign_node(self, node: AssignNode):
-        node.expr.accept(self)
-        info = self.__env_top.get(node.var.name)
+        yield node.expr
+        info = self.__symbols.get(node.var.name)
         if info:
             node.var.type = info.type
             node.var.scope = info.scope
@@ -97,32 +104,32 @@ class Checker(Visitor):
 
 
     def visit_if_node(self, node: IfNode):
-        node.expr.accept(self)
+        yield node.expr
         if not node.expr.type.is_boolean:
             self.__error(node.line, 'Esperada uma expressão lógica')
-        node.stmt.accept(self)
+        yield node.stmt
 
 
     def visit_else_node(self, node: ElseNode):
-        node.expr.accept(self)
+        yield node.expr
         if not node.expr.type.is_boolean:
             self.__error(node.line, 'Esperada uma expressão lógica')
-        node.stmt1.accept(self)
-        node.stmt2.accept(self)
+        yield node.stmt1
+        yield node.stmt2
 
 
     def visit_while_node(self, node: IfNode):
-        node.expr.accept(self)
+        yield node.expr
         if not node.expr.type.is_boolean:
             self.__error(node.line, 'Esperada uma expressão lógica')
-        node.stmt.accept(self)
+        yield node.stmt
 
 
     def visit_write_node(self, node: WriteNode):
-        node.expr.accept(self)
+        yield node.expr
 
     def visit_read_node(self, node: ReadNode):
-        info = self.__env_top.get(node.var.name)
+        info = self.__symbols.get(node.var.name)
         if info:
             node.var.type = info.type
             node.var.scope = info.scope
@@ -133,7 +140,7 @@ class Checker(Visitor):
 
 
     def visit_var_node(self, node: VarNode):
-        info = self.__env_top.get(node.name)
+        info = self.__symbols.get(node.name)
         if info:
             node.type = info.type
             node.scope = info.scope
@@ -166,8 +173,8 @@ class Checker(Visitor):
 
 
     def visit_binary_node(self, node: BinaryNode):
-        node.expr1.accept(self)
-        node.expr2.accept(self)
+        yield node.expr1
+        yield node.expr2
         
         t1 = node.expr1.type
         t2 = node.expr2.type
@@ -198,7 +205,7 @@ class Checker(Visitor):
 
 
     def visit_unary_node(self, node: UnaryNode):
-        node.expr.accept(self)
+        yield node.expr
         type = node.expr.type
 
         node.type = Type.UNDEF
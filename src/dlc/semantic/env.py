@@ -1,6 +1,8 @@
 from dlc.semantic.type import Type
 
 class SymbolInfo:
+    __slots__ = ('type', 'scope', 'declaration_line', 'initialized', 'used')
+
     def __init__(self, type: Type, scope: int, declaration_line: int):
         self.type = type
         self.scope = scope
@@ -9,28 +11,56 @@ class SymbolInfo:
         self.used = False
         
         
-class Env():
-    __count = -1
-    
-    def __init__(self, prev_env=None):
-        self.__symbol_table: dict[str, SymbolInfo] = {}
-        self.__prev_env = prev_env
-        Env.__count += 1
-        self.number = Env.__count
-        
+class SymbolTable:
+    '''Tabela de símbolos única para todos os escopos aninhados: cada nome
+    aponta para a pilha de suas declarações visíveis, [(escopo, info), ...],
+    com a mais interna no topo, de modo que get() custa O(1) qualquer que
+    seja a profundidade. Cada escopo aberto guarda num registro de desfazer
+    os nomes que declarou; close_scope() os desempilha.'''
+
+    def __init__(self):
+        self.__symbols: dict[str, list[tuple[int, SymbolInfo]]] = {}
+        self.__scopes = []
+        self.__undo_log = []
+        self.__count = -1
+        self.open_scope()
+
+    @property
+    def number(self):
+        '''Número do escopo corrente.'''
+        return self.__scopes[-1]
+
+    def open_scope(self):
+        self.__count += 1
+        self.__scopes.append(self.__count)
+        self.__undo_log.append([])
+
+    def close_scope(self):
+        '''Fecha o escopo corrente e retorna [(nome, info), ...] das variáveis
+        declaradas nele, na ordem de declaração.'''
+        self.__scopes.pop()
+        declared = []
+        for name in self.__undo_log.pop():
+            stack = self.__symbols[name]
+            declared.append((name, stack.pop()[1]))
+            if not stack:
+                del self.__symbols[name]
+        return declared
+
     def put(self, symbol_name: str, symbol_info: SymbolInfo):
-        self.__symbol_table[symbol_name] = symbol_info
-        
+        stack = self.__symbols.setdefault(symbol_name, [])
+        if stack and stack[-1][0] == self.__scopes[-1]:
+            stack[-1] = (self.__scopes[-1], symbol_info)
+        else:
+            stack.append((self.__scopes[-1], symbol_info))
+            self.__undo_log[-1].append(symbol_name)
+
     def get(self, symbol_name: str):
-        env = self
-        while env is not None:
-            if symbol_name in env.__symbol_table:
-                return env.__symbol_table[symbol_name]
-            env = env.__prev_env
-        return None
-    
+        stack = self.__symbols.get(symbol_name)
+        return stack[-1][1] if stack else None
+
     def get_local(self, symbol_name: str):
-        return self.__symbol_table.get(symbol_name)
-    
-    def var_list(self):
-        return self.__symbol_table.keys()
+        stack = self.__symbols.get(symbol_name)
+        if stack and stack[-1][0] == self.__scopes[-1]:
+            return stack[-1][1]
+        return None
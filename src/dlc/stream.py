@@ -0,0 +1,45 @@
+from dlc.lex.mmap_lexer import MmapLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.codegen.x64_codegen import X64StreamCodeGenerator
+from dlc.tree.nodes import BlockNode
+
+
+def compile_stream(input_file, output_file):
+    '''Compila o programa DL do arquivo binário input_file para assembly x64
+    em output_file, um comando do bloco principal por vez: cada comando é
+    analisado, verificado, traduzido para TAC e para x64 e então descartado,
+    de modo que a memória usada depende do maior comando, e não do tamanho
+    do programa. Não há otimização global nesse modo.
+    Retorna False se houve erros léxicos/sintáticos/semânticos.'''
+    with MmapLexer(input_file) as lexer:
+        parser = Parser(lexer, parse=False)
+        checker = Checker()
+        ic = IC()
+        codegen = X64StreamCodeGenerator(output_file)
+
+        def compile_stmt(stmt):
+            # Após o primeiro erro sintático, só a análise sintática continua
+            if parser.had_errors:
+                return
+            checker.visit(stmt)
+            if not checker.had_errors:
+                ic.visit(stmt)
+                codegen.add_window(ic.flush(), ic.var_temps)
+
+        stream = parser.stream()
+        program = next(stream, None)
+        if program is not None:
+            if isinstance(program.stmt, BlockNode):
+                checker.open_block()
+                for stmt in stream:
+                    compile_stmt(stmt)
+                if not parser.had_errors:
+                    checker.close_block()
+            else:
+                compile_stmt(program.stmt)
+                for _ in stream:
+                    pass
+        codegen.close()
+    return not (parser.had_errors or checker.had_errors)
@@ -0,0 +1,264 @@
+from bisect import bisect_left, bisect_right
+from contextlib import redirect_stdout
+from io import StringIO
+from dlc.lex.tag import Tag
+from dlc.lex.token import Token
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.lex.string_table import StringTable
+from dlc.syntax.parser import Parser
+from dlc.tree.nodes import BlockNode, IfNode, ElseNode, WhileNode
+
+
+class TextEnd:
+    '''Quebras de linha do texto atual de um IncrementalParser, compartilhado
+    pelos seus tokens para converter as linhas relativas ao fim.'''
+    __slots__ = ('breaks',)
+
+    def __init__(self, breaks: int):
+        self.breaks = breaks
+
+
+class SpanToken(Token):
+    '''Token que também guarda sua posição no texto. Posições e linhas > 0
+    são absolutas; as negativas são relativas ao fim do texto (ver
+    IncrementalParser), o que torna uma edição local barata de aplicar.
+    line devolve sempre a linha absoluta.'''
+    __slots__ = ('start', 'end')
+
+    def __init__(self, line: int, tag: Tag, lexeme: str, start: int, end: TextEnd):
+        self.end = end
+        super().__init__(line, tag, lexeme)
+        self.start = start
+
+    @property
+    def line(self):
+        line = Token.line.__get__(self)
+        return line if line > 0 else line + self.end.breaks + 2
+
+    @line.setter
+    def line(self, line: int):
+        Token.line.__set__(self, line)
+
+
+
+class TokenCursor:
+    '''Expõe a fatia [start, stop) de uma lista de tokens pela interface
+    next_token(); ao chegar em stop devolve EOF.'''
+
+    def __init__(self, tokens: list, start: int, stop: int):
+        self.__tokens = tokens
+        self.__pos = start
+        self.__stop = stop
+
+    def next_token(self):
+        if self.__pos >= self.__stop:
+            line = self.__tokens[self.__stop].line if self.__stop < len(self.__tokens) else 1
+            return Token(line, Tag.EOF)
+        token = self.__tokens[self.__pos]
+        self.__pos += 1
+        return token
+
+
+
+class IncrementalParser:
+    '''Mantém texto, fluxo de tokens e AST de um programa DL entre edições.
+
+    A cada edit(), apenas o trecho danificado do fluxo de tokens é relexado
+    (até o lexer voltar a coincidir com os tokens antigos) e apenas os comandos
+    do BlockNode mais interno que contém o dano são reanalisados; os demais
+    nós da AST são reaproveitados. Se a reanálise local não for possível
+    (erro, dano no cabeçalho do programa, "inicio"/"fim" desbalanceados), a
+    AST inteira é reconstruída a partir dos tokens já atualizados.
+
+    As posições e as linhas dos tokens usam um "gap": tokens antes do gap
+    guardam valores absolutos e os demais, valores relativos ao fim do texto,
+    de modo que uma edição só converte os tokens entre o gap anterior e o
+    novo.'''
+
+    def __init__(self, text: str):
+        self.strings = StringTable()
+        self.text = text
+        self.tokens = []
+        self.__end = TextEnd(text.count('\n'))
+        self.__gap = 0
+        self.__block_end = {}
+        self.full_parses = 0
+        lexer = RegexLexer.from_text(text, strings=self.strings)
+        while True:
+            token = lexer.next_token()
+            self.tokens.append(SpanToken(token.line, token.tag, token.lexeme, lexer.start, self.__end))
+            if token.tag == Tag.EOF:
+                break
+        self.__gap = len(self.tokens)
+        self.__full_parse()
+
+    # ---------------------------------------------------------------
+    # Posições
+    # ---------------------------------------------------------------
+    def offset(self, token: SpanToken):
+        start = token.start
+        return start if start >= 0 else start + len(self.text) + 1
+
+    def __move_gap(self, index: int):
+        shift = len(self.text) + 1
+        lines = self.__end.breaks + 2
+        tokens = self.tokens
+        for i in range(index, self.__gap):
+            tokens[i].start -= shift
+            tokens[i].line -= lines
+        for i in range(self.__gap, index):
+            tokens[i].start += shift
+            tokens[i].line = tokens[i].line # Guarda a linha absoluta
+        self.__gap = index
+
+    def __index(self, token: SpanToken):
+        return bisect_left(self.tokens, self.offset(token), key=self.offset)
+
+    # ---------------------------------------------------------------
+    # Edição
+    # ---------------------------------------------------------------
+    def edit(self, offset: int, removed: int, inserted: str):
+        '''Substitui text[offset:offset+removed] por inserted e atualiza tokens e AST.'''
+        old_text = self.text
+        new_text = old_text[:offset] + inserted + old_text[offset + removed:]
+        delta = len(inserted) - removed
+        tokens = self.tokens
+        n = len(tokens)
+
+        # 1. Relexa a partir do último token que começa antes da edição
+        i0 = max(bisect_left(tokens, offset, key=self.offset) - 1, 0)
+        start = self.offset(tokens[i0]) if i0 > 0 else 0
+        line = tokens[i0].line if i0 > 0 else 1
+        lexer = RegexLexer.from_text(new_text, start, line, self.strings)
+        j = bisect_left(tokens, offset + removed, key=self.offset)
+        edit_end = offset + len(inserted)
+        fresh = []
+        while True:
+            token = lexer.next_token()
+            pos = lexer.start
+            if pos >= edit_end:
+                # Sincroniza quando um token novo coincide com um antigo deslocado
+                while j < n and self.offset(tokens[j]) + delta < pos:
+                    j += 1
+                if (j < n and self.offset(tokens[j]) + delta == pos
+                        and tokens[j].tag == token.tag and tokens[j].lexeme == token.lexeme):
+                    break
+            fresh.append(SpanToken(token.line, token.tag, token.lexeme, pos, self.__end))
+            if token.tag == Tag.EOF:
+                j = n
+                break
+
+        lines = inserted.count('\n') - old_text.count('\n', offset, offset + removed)
+        unchanged = len(fresh) == j - i0 and all(
+            t.tag == old.tag and t.lexeme == old.lexeme for t, old in zip(fresh, tokens[i0:j]))
+        target = None if unchanged or self.had_errors else self.__damaged_stmts(i0, j)
+
+        # 2. Atualiza o fluxo de tokens (o texto após a edição não muda em
+        # relação ao fim, então os tokens além do gap continuam válidos)
+        self.__move_gap(j)
+        if unchanged:
+            for t, old in zip(fresh, tokens[i0:j]):
+                old.start = t.start
+                old.line = t.line
+        else:
+            tokens[i0:j] = fresh
+        self.text = new_text
+        self.__gap = i0 + len(fresh)
+        self.__end.breaks += lines
+
+        # 3. Reanálise
+        if unchanged:
+            return self.ast
+        if target is None or not self.__reparse(*target):
+            self.__full_parse()
+        return self.ast
+
+    def __damaged_stmts(self, i0: int, j: int):
+        '''Encontra o bloco mais interno que contém os tokens antigos [i0, j)
+        e o intervalo de comandos dele atingido pela edição.'''
+        root = self.ast.root
+        if not isinstance(root.stmt, BlockNode):
+            return None
+        first = self.offset(self.tokens[i0])
+        last = self.offset(self.tokens[max(j - 1, i0)])
+        stmt_offset = lambda stmt: self.offset(stmt.token)
+
+        target = None
+        candidates = [root.stmt]
+        while candidates:
+            block = next((b for b in candidates
+                          if self.__index(b.token) < i0 and self.__index(self.__block_end[b]) >= j), None)
+            if block is None:
+                break
+            stmts = block.stmts
+            k0 = max(bisect_right(stmts, first, key=stmt_offset) - 1, 0)
+            k1 = bisect_right(stmts, last, key=stmt_offset) - 1
+            target = (block, k0, k1)
+            candidates = IncrementalParser.__inner_blocks(stmts[k0]) if stmts and k0 == k1 else []
+        return target
+
+    @staticmethod
+    def __inner_blocks(stmt):
+        while True:
+            if isinstance(stmt, BlockNode):
+                return [stmt]
+            if isinstance(stmt, (IfNode, WhileNode)):
+                stmt = stmt.stmt
+            elif isinstance(stmt, ElseNode):
+                return IncrementalParser.__inner_blocks(stmt.stmt1) + IncrementalParser.__inner_blocks(stmt.stmt2)
+            else:
+                return []
+
+    def __reparse(self, block: BlockNode, k0: int, k1: int):
+        # Índices no fluxo já atualizado: o primeiro token do comando k0 não
+        # se move (a relexação começa nele ou antes dele) e os tokens de
+        # stmts[k1+1] e do "fim" do bloco estão além do trecho relexado.
+        stmts = block.stmts
+        start = self.__index(stmts[k0].token) if k0 <= k1 else self.__index(block.token) + 1
+        if k1 + 1 < len(stmts):
+            stop = self.__index(stmts[k1 + 1].token)
+        else:
+            stop = self.__index(self.__block_end[block])
+
+        with redirect_stdout(StringIO()):
+            parser = Parser(TokenCursor(self.tokens, start, stop), parse=False)
+            new_stmts = parser.parse_stmts()
+        if parser.had_errors:
+            return False
+
+        for stmt in stmts[k0:k1 + 1]:
+            for node in IncrementalParser.__blocks(stmt):
+                self.__block_end.pop(node, None)
+        stmts[k0:k1 + 1] = new_stmts
+        self.__map_block_ends(start, stop, new_stmts)
+        return True
+
+    def __full_parse(self):
+        self.full_parses += 1
+        parser = Parser(TokenCursor(self.tokens, 0, len(self.tokens)))
+        self.ast = parser.ast
+        self.had_errors = parser.had_errors or parser.ast.root is None
+        self.__block_end = {}
+        if not self.had_errors:
+            self.__map_block_ends(0, len(self.tokens), [self.ast.root])
+
+    def __map_block_ends(self, start: int, stop: int, nodes: list):
+        end_of = {}
+        open_blocks = []
+        for token in self.tokens[start:stop]:
+            if token.tag == Tag.BEGIN:
+                open_blocks.append(token)
+            elif token.tag == Tag.END and open_blocks:
+                end_of[id(open_blocks.pop())] = token
+        for node in nodes:
+            for block in IncrementalParser.__blocks(node):
+                self.__block_end[block] = end_of[id(block.token)]
+
+    @staticmethod
+    def __blocks(node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, BlockNode):
+                yield node
+            stack.extend(node)
@@ -21,16 +21,17 @@ import colorama
 
 class Parser:
     
-    def __init__(self, lex):
+    def __init__(self, lex, parse: bool=True):
         self.lexer = lex
         self.lookahead = None
         self.ast = None
         self.had_errors = False
         self.__move()
-        self.__parse()
+        if parse:
+            self.__parse()
 
     def __error(self, line: int, msg: str):
-        colorama.init()
+        colorama.just_fix_windows_console()
         print(colorama.Fore.RED, end='')
         print(f'Erro sintático na linha {line}: {msg}')
         print(colorama.Style.RESET_ALL, end='')
@@ -79,6 +80,45 @@ class Parser:
         root = self.__program()
         self.ast = AST(root)
 
+    def parse_stmts(self):
+        '''Analisa uma sequência <STMTS> até o fim da entrada, sem o "inicio" e
+        o "fim" que a delimitam. Usado na reanálise incremental de um trecho
+        de bloco (Parser criado com parse=False).'''
+        block = BlockNode(None)
+        self.__stmts(block)
+        try:
+            self.__match(Tag.EOF)
+        except SyntaxError:
+            pass
+        return block.stmts
+
+    def stream(self):
+        '''Analisa o programa sob demanda (Parser criado com parse=False): gera
+        primeiro o ProgramNode e depois, um a um, os comandos do bloco
+        principal, sem guardá-los no BlockNode. Se o corpo do programa não for
+        um bloco, o ProgramNode já vem com ele e nada mais é gerado.
+        Erros são tratados como em Parser(lex): ao final, had_errors indica
+        se houve algum.'''
+        match = self.__match
+        try:
+            prog_tok = match(Tag.PROGRAM)
+            prog_name_tok = match(Tag.ID)
+            if self.lookahead.tag != Tag.BEGIN:
+                yield ProgramNode(prog_tok, prog_name_tok.lexeme, self.__stmt())
+            else:
+                yield ProgramNode(prog_tok, prog_name_tok.lexeme, BlockNode(match(Tag.BEGIN)))
+                while self.lookahead.tag not in (Tag.END, Tag.EOF):
+                    try:
+                        yield self.__stmt()
+                        match(Tag.SEMI)
+                    except SyntaxError:
+                        self.__synchronize()
+                match(Tag.END)
+            match(Tag.DOT)
+            match(Tag.EOF)
+        except SyntaxError:
+            pass
+
     def __program(self):
         try:
             match = self.__match
@@ -92,10 +132,8 @@ class Parser:
             pass
 
 
-    def __block(self):
+    def __stmts(self, block: BlockNode):
         match = self.__match
-        begin_tok = match(Tag.BEGIN)
-        block = BlockNode(begin_tok)
         while self.lookahead.tag not in (Tag.END, Tag.EOF):
             try:
                 stmt = self.__stmt()
@@ -103,28 +141,96 @@ class Parser:
                 match(Tag.SEMI)
             except SyntaxError:
                 self.__synchronize()
-        match(Tag.END)
-        return block
 
 
+    # Estados do analisador de comandos
+    __OPEN, __CLOSE, __NEXT = range(3)
+
     def __stmt(self):
-        match self.lookahead.tag:
-            case Tag.BEGIN: 
-                return self.__block()
-            case Tag.INT | Tag.REAL | Tag.BOOL: 
-                return self.__decl()
-            case Tag.ID: 
-                return self.__assign()
-            case Tag.IF: 
-                return self.__if()
-            case Tag.WHILE:
-                return self.__while()
-            case Tag.WRITE: 
-                return self.__write()
-            case Tag.READ:
-                return self.__read()
-            case _: 
-                self.__error(self.lookahead.line, f'"{Parser.token_to_msg(self.lookahead)}" não é um comando válido!')
+        # Comandos compostos (blocos, se, senao, enquanto) ficam numa pilha
+        # explícita em vez da pilha de chamadas, então o aninhamento não tem
+        # limite de profundidade. Cada quadro é [tag, token, ...]:
+        #   [BEGIN, bloco]  [IF, token, expr]  [ELSE, token, expr, stmt1]  [WHILE, token, expr]
+        # Um SyntaxError é tratado pelo bloco aberto mais interno, como faria
+        # o laço de <STMTS> na versão recursiva.
+        OPEN, CLOSE, NEXT = Parser.__OPEN, Parser.__CLOSE, Parser.__NEXT
+        match = self.__match
+        stack = []
+        stmt = None
+        state = OPEN
+        while True:
+            try:
+                if state == OPEN:
+                    # Desce: inicia um comando
+                    match self.lookahead.tag:
+                        case Tag.BEGIN:
+                            stack.append([Tag.BEGIN, BlockNode(match(Tag.BEGIN))])
+                            state = NEXT
+                        case Tag.IF:
+                            if_tok = match(Tag.IF)
+                            stack.append([Tag.IF, if_tok, self.__paren_expr()])
+                        case Tag.WHILE:
+                            while_tok = match(Tag.WHILE)
+                            stack.append([Tag.WHILE, while_tok, self.__paren_expr()])
+                        case Tag.INT | Tag.REAL | Tag.BOOL:
+                            stmt, state = self.__decl(), CLOSE
+                        case Tag.ID:
+                            stmt, state = self.__assign(), CLOSE
+                        case Tag.WRITE:
+                            stmt, state = self.__write(), CLOSE
+                        case Tag.READ:
+                            stmt, state = self.__read(), CLOSE
+                        case _:
+                            self.__error(self.lookahead.line, f'"{Parser.token_to_msg(self.lookahead)}" não é um comando válido!')
+
+                elif state == NEXT:
+                    # Laço <STMTS> do bloco no topo da pilha
+                    if self.lookahead.tag in (Tag.END, Tag.EOF):
+                        stmt = stack.pop()[1]
+                        match(Tag.END)
+                        state = CLOSE
+                    else:
+                        state = OPEN
+
+                else:
+                    # Sobe: completa o comando pendente no topo da pilha
+                    if not stack:
+                        return stmt
+                    frame = stack[-1]
+                    match frame[0]:
+                        case Tag.BEGIN:
+                            frame[1].add_stmt(stmt)
+                            match(Tag.SEMI)
+                            state = NEXT
+                        case Tag.IF:
+                            if self.lookahead.tag != Tag.ELSE:
+                                stack.pop()
+                                stmt = IfNode(frame[1], frame[2], stmt)
+                            else:
+                                match(Tag.ELSE)
+                                frame[0] = Tag.ELSE
+                                frame.append(stmt)
+                                state = OPEN
+                        case Tag.ELSE:
+                            stack.pop()
+                            stmt = ElseNode(frame[1], frame[2], frame[3], stmt)
+                        case Tag.WHILE:
+                            stack.pop()
+                            stmt = WhileNode(frame[1], frame[2], stmt)
+
+            except SyntaxError:
+                while stack and stack[-1][0] != Tag.BEGIN:
+                    stack.pop()
+                if not stack:
+                    raise
+                self.__synchronize()
+                state = NEXT
+
+    def __paren_expr(self):
+        self.__match(Tag.LPAREN)
+        expr = self.__expr()
+        self.__match(Tag.RPAREN)
+        return expr
 
 
     def __decl(self):
@@ -147,28 +253,6 @@ class Parser:
         var = VarNode(var_tok)
         return AssignNode(var_tok, var, expr)
 
-    def __if(self):
-        match = self.__match
-        if_tok = match(Tag.IF)
-        match(Tag.LPAREN)
-        expr = self.__expr()
-        match(Tag.RPAREN)
-        stmt1 = self.__stmt()
-        if self.lookahead.tag != Tag.ELSE:
-            return IfNode(if_tok, expr, stmt1)
-        match(Tag.ELSE)
-        stmt2 = self.__stmt()
-        return ElseNode(if_tok, expr, stmt1, stmt2)
-
-    def __while(self):
-        match = self.__match
-        while_tok = match(Tag.WHILE)
-        match(Tag.LPAREN)
-        expr = self.__expr()
-        match(Tag.RPAREN)
-        stmt = self.__stmt()
-        return WhileNode(while_tok, expr, stmt)
-
     def __write(self):
         match = self.__match
         write_tok = match(Tag.WRITE)
@@ -185,76 +269,76 @@ class Parser:
         match(Tag.RPAREN)
         return ReadNode(read_tok, var)
 
-    def __expr(self):
-        expr = self.__land()
-        while self.lookahead.tag == Tag.OR:
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__land())
-        return expr
-
-    def __land(self):
-        expr = self.__equal()
-        while self.lookahead.tag == Tag.AND:
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__equal())
-        return expr
-
-    def __equal(self):
-        expr = self.__rel()
-        while self.lookahead.tag in (Tag.EQ, Tag.NE):
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__rel())
-        return expr
-
-    def __rel(self):
-        expr = self.__arith()
-        while self.lookahead.tag in (Tag.LT, Tag.LE, Tag.GT, Tag.GE):
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__arith())
-        return expr
+    # Precedência dos operadores binários (todos associativos à esquerda).
+    # Os unários prefixados ficam acima de todos eles e o "^", associativo à
+    # direita, acima dos unários: -a^b = -(a^b) e a^-b^c = a^(-(b^c)).
+    __BINARY_PREC = {
+        Tag.OR: 1,
+        Tag.AND: 2,
+        Tag.EQ: 3, Tag.NE: 3,
+        Tag.LT: 4, Tag.LE: 4, Tag.GT: 4, Tag.GE: 4,
+        Tag.SUM: 5, Tag.SUB: 5,
+        Tag.MUL: 6, Tag.DIV: 6, Tag.MOD: 6,
+    }
+    __UNARY_PREC = 7
+    __POW_PREC = 8
 
-    def __arith(self):
-        expr = self.__term()
-        while self.lookahead.tag in (Tag.SUM, Tag.SUB):
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__term())
-        return expr
+    def __expr(self):
+        # Precedence climbing com pilhas explícitas de operadores e operandos:
+        # gera as mesmas árvores BinaryNode/UnaryNode da gramática de <EXPR>
+        # sem uma chamada recursiva por nível de precedência ou parêntese.
+        # Na pilha de operadores, (0, None) marca um "(" aberto.
+        BINARY_PREC = Parser.__BINARY_PREC
+        operators = []
+        operands = []
+        open_parens = 0
 
-    def __term(self):
-        expr = self.__unary()
-        while self.lookahead.tag in (Tag.MUL, Tag.DIV, Tag.MOD):
-            op_tok = self.__move()
-            expr = BinaryNode(op_tok, expr, self.__unary())
-        return expr
+        def reduce(min_prec):
+            while operators and operators[-1][0] >= min_prec:
+                prec, op_tok = operators.pop()
+                if prec == Parser.__UNARY_PREC:
+                    operands.append(UnaryNode(op_tok, operands.pop()))
+                else:
+                    expr2 = operands.pop()
+                    operands.append(BinaryNode(op_tok, operands.pop(), expr2))
 
-    def __unary(self):
-        if self.lookahead.tag in (Tag.SUM, Tag.SUB, Tag.NOT):
-            op = self.__move()
-            return UnaryNode(op, self.__unary())
-        else:
-            return self.__pow()
-
-    def __pow(self):
-        expr = self.__factor()
-        if self.lookahead.tag == Tag.POW:
-            op = self.__move()
-            return BinaryNode(op, expr, self.__unary())
-        return expr
+        while True:
+            # Espera um operando: unários e "(" prefixados, depois um fator
+            tag = self.lookahead.tag
+            while tag in (Tag.SUM, Tag.SUB, Tag.NOT, Tag.LPAREN):
+                if tag == Tag.LPAREN:
+                    self.__move()
+                    operators.append((0, None))
+                    open_parens += 1
+                else:
+                    operators.append((Parser.__UNARY_PREC, self.__move()))
+                tag = self.lookahead.tag
+            match tag:
+                case Tag.LIT_INT | Tag.LIT_REAL | Tag.LIT_TRUE | Tag.LIT_FALSE:
+                    operands.append(LiteralNode(self.__move()))
+                case Tag.ID:
+                    operands.append(VarNode(self.__move()))
+                case _:
+                    self.__error(self.lookahead.line, f'"{Parser.token_to_msg(self.lookahead)}" invalidou a expressão!')
 
-    def __factor(self):
-        match = self.__match
-        expr = None
-        match self.lookahead.tag:
-            case Tag.LPAREN:
-                match(Tag.LPAREN)
-                expr = self.__expr()
-                match(Tag.RPAREN)
-            case Tag.LIT_INT | Tag.LIT_REAL | Tag.LIT_TRUE | Tag.LIT_FALSE:
-                lit_tok = self.__move()
-                expr = LiteralNode(lit_tok)
-            case Tag.ID:
-                var_tok = self.__move()
-                expr = VarNode(var_tok)
-            case _:
-                self.__error(self.lookahead.line, f'"{Parser.token_to_msg(self.lookahead)}" invalidou a expressão!')
-        return expr
+            # Espera um operador: fecha parênteses e decide como continuar
+            while True:
+                tag = self.lookahead.tag
+                if tag == Tag.RPAREN and open_parens:
+                    self.__move()
+                    reduce(1)
+                    operators.pop()
+                    open_parens -= 1
+                    continue
+                break
+            if tag == Tag.POW:
+                operators.append((Parser.__POW_PREC, self.__move()))
+            elif tag in BINARY_PREC:
+                prec = BINARY_PREC[tag]
+                reduce(prec)
+                operators.append((prec, self.__move()))
+            else:
+                if open_parens:
+                    self.__match(Tag.RPAREN)
+                reduce(1)
+                return operands.pop()
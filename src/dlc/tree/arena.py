@@ -0,0 +1,249 @@
+from array import array
+from dlc.lex.token_buffer import TokenBuffer
+from dlc.semantic.type import Type
+from dlc.tree.ast import AST
+from dlc.tree.nodes import (
+    Node,
+    ProgramNode,
+    BlockNode,
+    DeclNode,
+    AssignNode,
+    IfNode,
+    ElseNode,
+    WhileNode,
+    WriteNode,
+    ReadNode,
+    VarNode,
+    LiteralNode,
+    BinaryNode,
+    UnaryNode,
+    ConvertNode
+)
+
+
+class NodeArena:
+    '''Armazenamento alternativo da AST: cada nó é um registro em arrays
+    paralelos (tipo do nó, índice do token, primeiro filho, próximo irmão,
+    tipo semântico e escopo), com os tokens num TokenBuffer. Os nós são vistos
+    por meio de visões finas (ver view()), que mantêm a interface dos nós
+    comuns: visitantes, AST.__str__ e o Checker funcionam sem alterações.'''
+
+    KINDS = (ProgramNode, BlockNode, DeclNode, AssignNode, IfNode, ElseNode, WhileNode,
+             WriteNode, ReadNode, VarNode, LiteralNode, BinaryNode, UnaryNode, ConvertNode)
+    TYPES = (Type.BOOL, Type.INT, Type.REAL, Type.UNDEF)
+    TYPE_INDEX = {type: i for i, type in enumerate(TYPES)}
+
+    def __init__(self, tokens: TokenBuffer=None):
+        self.tokens = tokens if tokens is not None else TokenBuffer()
+        self.kind = array('b')
+        self.token = array('i')
+        self.first_child = array('i')
+        self.next_sibling = array('i')
+        self.type = array('b')
+        self.scope = array('i')
+        self.values = {}  # Valores de literais e nomes de programa, por índice
+
+    @staticmethod
+    def from_ast(ast: AST):
+        '''Copia uma AST de nós comuns para uma nova arena e retorna a AST
+        equivalente, cuja raiz é uma visão.'''
+        arena = NodeArena()
+        return AST(arena.view(arena.add(ast.root)))
+
+    def __len__(self):
+        return len(self.kind)
+
+    def view(self, index: int):
+        return NodeArena.VIEWS[self.kind[index]](self, index)
+
+    def children(self, index: int):
+        child = self.first_child[index]
+        next_sibling = self.next_sibling
+        while child >= 0:
+            yield child
+            child = next_sibling[child]
+
+    def add(self, node: Node):
+        '''Acrescenta node e sua subárvore (sem recursão) e retorna o índice do
+        registro. Visões desta arena são reaproveitadas, não copiadas.'''
+        if isinstance(node, ArenaView) and node.arena is self:
+            return node.index
+        root = self.__new(node)
+        stack = [(root, node)]
+        while stack:
+            index, node = stack.pop()
+            prev = -1
+            for child in node:
+                if isinstance(child, ArenaView) and child.arena is self:
+                    i = child.index
+                else:
+                    i = self.__new(child)
+                    stack.append((i, child))
+                if prev < 0:
+                    self.first_child[index] = i
+                else:
+                    self.next_sibling[prev] = i
+                self.next_sibling[i] = -1
+                prev = i
+        return root
+
+    def __new(self, node: Node):
+        index = len(self.kind)
+        self.kind.append(NodeArena.KIND_INDEX[type(node)])
+        if node.token is None:
+            self.token.append(-1)
+        else:
+            self.token.append(len(self.tokens))
+            self.tokens.append(node.token)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        type_ = getattr(node, 'type', None)
+        self.type.append(-1 if type_ is None else NodeArena.TYPE_INDEX[type_])
+        scope = getattr(node, 'scope', None)
+        self.scope.append(-1 if scope is None else scope)
+        if isinstance(node, LiteralNode):
+            self.values[index] = node.value
+        elif isinstance(node, ProgramNode):
+            self.values[index] = node.name
+        return index
+
+    def _child(self, index: int, position: int):
+        child = self.first_child[index]
+        for _ in range(position):
+            child = self.next_sibling[child]
+        return child
+
+    def _replace_child(self, index: int, position: int, node: Node):
+        prev = -1
+        old = self.first_child[index]
+        for _ in range(position):
+            prev, old = old, self.next_sibling[old]
+        following = self.next_sibling[old]
+        new = self.add(node) # Pode adotar old como filho (ex.: ConvertNode)
+        if new == old:
+            self.next_sibling[old] = following
+            return
+        self.next_sibling[new] = following
+        if prev < 0:
+            self.first_child[index] = new
+        else:
+            self.next_sibling[prev] = new
+
+    def _append_child(self, index: int, node: Node):
+        new = self.add(node)
+        self.next_sibling[new] = -1
+        last = -1
+        for last in self.children(index):
+            pass
+        if last < 0:
+            self.first_child[index] = new
+        else:
+            self.next_sibling[last] = new
+
+
+
+class ArenaView:
+    '''Visão de um registro da NodeArena. Duas visões do mesmo registro são
+    iguais; os filhos são obtidos pelos encadeamentos da arena.'''
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena: NodeArena, index: int):
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, ArenaView) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    @property
+    def token(self):
+        i = self.arena.token[self.index]
+        return self.arena.tokens[i] if i >= 0 else None
+
+    @property
+    def line(self):
+        # Nós sem token (ConvertNode) ficam na linha do operando
+        arena, index = self.arena, self.index
+        while arena.token[index] < 0:
+            index = arena.first_child[index]
+            if index < 0:
+                return None
+        return arena.tokens.lines[arena.token[index]]
+
+    @property
+    def type(self):
+        i = self.arena.type[self.index]
+        return NodeArena.TYPES[i] if i >= 0 else None
+
+    @type.setter
+    def type(self, type: Type):
+        self.arena.type[self.index] = -1 if type is None else NodeArena.TYPE_INDEX[type]
+
+    @property
+    def scope(self):
+        scope = self.arena.scope[self.index]
+        return scope if scope >= 0 else None
+
+    @scope.setter
+    def scope(self, scope: int):
+        self.arena.scope[self.index] = -1 if scope is None else scope
+
+    @property
+    def value(self):
+        return self.arena.values.get(self.index)
+
+    @value.setter
+    def value(self, value):
+        self.arena.values[self.index] = value
+
+    @property
+    def name(self):
+        if self.arena.kind[self.index] == NodeArena.KIND_INDEX[ProgramNode]:
+            return self.arena.values[self.index]
+        return self.token.lexeme
+
+    def __iter__(self):
+        arena = self.arena
+        for child in arena.children(self.index):
+            yield arena.view(child)
+
+    def __len__(self):
+        return sum(1 for _ in self.arena.children(self.index))
+
+    def add_stmt(self, stmt: Node):
+        self.arena._append_child(self.index, stmt)
+
+    def add_var(self, var: Node):
+        self.arena._append_child(self.index, var)
+
+
+
+def _field(position: int):
+    def get(self):
+        child = self.arena._child(self.index, position)
+        return self.arena.view(child) if child >= 0 else None
+
+    def set(self, node: Node):
+        self.arena._replace_child(self.index, position, node)
+    return property(get, set)
+
+
+def _sequence(self):
+    return list(self)
+
+
+# Uma classe de visão por tipo de nó, subclasse da classe do nó e com o mesmo
+# nome: herda accept, __str__ e os demais métodos, e troca os atributos por
+# propriedades.
+NodeArena.VIEWS = tuple(
+    type(kind.__name__, (ArenaView, kind), {
+        '__module__': __name__,
+        '__slots__': (),
+        **{name: _field(i) for i, name in enumerate(kind.FIELDS)},
+        **({kind.SEQUENCE: property(_sequence)} if kind.SEQUENCE else {})
+    }) for kind in NodeArena.KINDS
+)
+NodeArena.KIND_INDEX = {kind: i for i, kind in enumerate(NodeArena.KINDS)}
+NodeArena.KIND_INDEX.update({view: i for i, view in enumerate(NodeArena.VIEWS)})
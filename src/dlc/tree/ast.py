@@ -6,13 +6,16 @@ class AST:
         self.root = root
         
     def __str__(self):
-        self.str_tree = ['.\n']
-        return self.__str_ast(self.root)
-
-    def __str_ast(self, node, prefix:str='', is_last=True):
-        connector = '└───' if is_last else '├───'
-        self.str_tree.append(f'{prefix}{connector}{str(node)}\n')
-        new_prefix = f'{prefix}{"    " if is_last else "│   "}'
-        for i, n in enumerate(node) or []:
-            self.__str_ast(n, new_prefix, i==len(node)-1)
-        return ''.join(self.str_tree)
+        # Percurso em pré-ordem com pilha explícita: (nó, prefixo, é_o_último)
+        str_tree = ['.\n']
+        stack = [(self.root, '', True)]
+        while stack:
+            node, prefix, is_last = stack.pop()
+            connector = '└───' if is_last else '├───'
+            str_tree.append(f'{prefix}{connector}{str(node)}\n')
+            new_prefix = f'{prefix}{"    " if is_last else "│   "}'
+            children = list(node)
+            last = len(children) - 1
+            for i in range(last, -1, -1):
+                stack.append((children[i], new_prefix, i == last))
+        return ''.join(str_tree)
@@ -5,6 +5,10 @@ from dlc.tree.visitor import Visitor
 
 
 class Node(ABC):
+    # Nomes dos atributos filhos, na ordem de visita, e do atributo que
+    # guarda uma lista de filhos (se houver)
+    FIELDS = ()
+    SEQUENCE = None
     
     def __init__(self, token: Token):
         self.token = token
@@ -18,16 +22,18 @@ class Node(ABC):
         pass
     
     def __iter__(self):
-        for attr in vars(self).values():
-            if isinstance(attr, Node):
-                yield attr
-            elif isinstance(attr, list):
-                for item in attr:
-                    if isinstance(item, Node):
-                        yield item
+        for name in self.FIELDS:
+            child = getattr(self, name)
+            if child is not None:
+                yield child
+        if self.SEQUENCE:
+            yield from getattr(self, self.SEQUENCE)
 
     def __len__(self):
-        return sum(1 for _ in self)
+        count = sum(1 for name in self.FIELDS if getattr(self, name) is not None)
+        if self.SEQUENCE:
+            count += len(getattr(self, self.SEQUENCE))
+        return count
 
     def __repr__(self):
         return f'<{self.__class__.__name__}:{str(self)}>'
@@ -85,6 +91,8 @@ class LiteralNode(ExprNode):
 
 
 class BinaryNode(ExprNode):
+    FIELDS = ('expr1', 'expr2')
+
     def __init__(self, token: Token, expr1: ExprNode, expr2: ExprNode):
         super().__init__(token)
         self.expr1 = expr1
@@ -105,6 +113,8 @@ class BinaryNode(ExprNode):
 
 
 class UnaryNode(ExprNode):
+    FIELDS = ('expr',)
+
     def __init__(self, token: Token, expr: ExprNode):
         super().__init__(token)
         self.expr = expr
@@ -125,6 +135,8 @@ class UnaryNode(ExprNode):
 
 
 class ConvertNode(ExprNode):
+    FIELDS = ('expr',)
+
     def __init__(self, expr: ExprNode):
         super().__init__(None)
         self.expr = expr
@@ -157,6 +169,8 @@ class StmtNode(Node):
 
 
 class ProgramNode(StmtNode):
+    FIELDS = ('stmt',)
+
     def __init__(self, token: Token, name: str, stmt: StmtNode):
         super().__init__(token)
         self.name = name
@@ -169,6 +183,8 @@ class ProgramNode(StmtNode):
 
 
 class BlockNode(StmtNode):
+    SEQUENCE = 'stmts'
+
     def __init__(self, token: Token):
         super().__init__(token)
         self.stmts = []
@@ -183,6 +199,8 @@ class BlockNode(StmtNode):
 
 
 class DeclNode(StmtNode):
+    SEQUENCE = 'vars'
+
     def __init__(self, token: Token):
         super().__init__(token)
         self.vars = []
@@ -197,6 +215,8 @@ class DeclNode(StmtNode):
 
 
 class AssignNode(StmtNode):
+    FIELDS = ('var', 'expr')
+
     def __init__(self, token: Token, var: VarNode, expr: ExprNode):
         super().__init__(token)
         self.var = var
@@ -209,6 +229,8 @@ class AssignNode(StmtNode):
 
 
 class IfNode(StmtNode):
+    FIELDS = ('expr', 'stmt')
+
     def __init__(self, token: Token, expr: ExprNode, stmt: StmtNode):
         super().__init__(token)
         self.expr = expr
@@ -219,6 +241,8 @@ class IfNode(StmtNode):
 
 
 class ElseNode(StmtNode):
+    FIELDS = ('expr', 'stmt1', 'stmt2')
+
     def __init__(self, token: Token, expr: ExprNode, stmt1: StmtNode, stmt2: StmtNode):
         super().__init__(token)
         self.expr = expr
@@ -230,6 +254,8 @@ class ElseNode(StmtNode):
 
 
 class WhileNode(StmtNode):
+    FIELDS = ('expr', 'stmt')
+
     def __init__(self, token: Token, expr: ExprNode, stmt: StmtNode):
         super().__init__(token)
         self.expr = expr
@@ -241,6 +267,8 @@ class WhileNode(StmtNode):
 
 
 class WriteNode(StmtNode):
+    FIELDS = ('expr',)
+
     def __init__(self, token: Token, expr: ExprNode):
         super().__init__(token)
         self.expr = expr
@@ -251,6 +279,8 @@ class WriteNode(StmtNode):
 
 
 class ReadNode(StmtNode):
+    FIELDS = ('var',)
+
     def __init__(self, token: Token, var: VarNode):
         super().__init__(token)
         self.var = var
@@ -1,7 +1,96 @@
 from abc import ABC, abstractmethod
+from inspect import isgeneratorfunction
+import re
 
 class Visitor(ABC):
-    
+    '''Um método visit_* pode ser uma função comum (nós folha) ou um gerador
+    que faz "valor = yield filho" para visitar cada filho e receber o valor que
+    a visita dele retornou; o "return" do gerador é o valor da visita do nó.
+
+    visit() executa esses métodos com uma pilha explícita de geradores, sem
+    recursão na pilha do Python e sem passar por Node.accept: o método de cada
+    classe de nó é resolvido uma única vez e guardado numa tabela por classe
+    de visitante. Subclasses podem sobrescrever pre_visit/post_visit.'''
+
+    __tables = {}
+
+    def pre_visit(self, node):
+        '''Chamado antes da visita de cada nó.'''
+
+    def post_visit(self, node, value):
+        '''Chamado após a visita de cada nó; o retorno substitui o valor da visita.'''
+        return value
+
+    @classmethod
+    def __method(cls, node_class):
+        table = Visitor.__tables.setdefault(cls, {})
+        entry = table.get(node_class)
+        if entry is None:
+            for klass in node_class.__mro__:
+                name = 'visit_' + re.sub(r'(?<!^)(?=[A-Z])', '_', klass.__name__).lower()
+                method = getattr(cls, name, None)
+                if method is not None:
+                    break
+            else:
+                raise TypeError(f'{cls.__name__} não sabe visitar {node_class.__name__}')
+            entry = table[node_class] = (method, isgeneratorfunction(method))
+        return entry
+
+    def visit(self, node):
+        '''Visita a árvore a partir de node e retorna o valor da visita da raiz.'''
+        cls = type(self)
+        if cls.pre_visit is not Visitor.pre_visit or cls.post_visit is not Visitor.post_visit:
+            return self.__visit_with_hooks(node)
+        lookup = Visitor.__tables.setdefault(cls, {}).get
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        generator = None
+        while True:
+            method, is_generator = lookup(node.__class__) or cls.__method(node.__class__)
+            if is_generator:
+                if generator is not None:
+                    push(generator)
+                generator = method(self, node)
+                value = None
+            else:
+                # Folha: chamada direta, sem gerador
+                value = method(self, node)
+            while True:
+                if generator is None:
+                    return value
+                try:
+                    node = generator.send(value)
+                    break
+                except StopIteration as stop:
+                    value = stop.value
+                    generator = pop() if stack else None
+
+    def __visit_with_hooks(self, node):
+        cls = type(self)
+        lookup = Visitor.__tables.setdefault(cls, {}).get
+        pre = self.pre_visit
+        post = self.post_visit
+        stack = []
+        while True:
+            pre(node)
+            method, is_generator = lookup(node.__class__) or cls.__method(node.__class__)
+            if is_generator:
+                stack.append((method(self, node), node))
+                value = None
+            else:
+                value = post(node, method(self, node))
+            while stack:
+                generator, parent = stack[-1]
+                try:
+                    node = generator.send(value)
+                    break
+                except StopIteration as stop:
+                    stack.pop()
+                    value = post(parent, stop.value)
+            else:
+                return value
+
     @abstractmethod
     def visit_program_node(self, node): pass
     
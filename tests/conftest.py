@@ -0,0 +1,56 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.opt.global_opt import optimize
+from dlc.codegen.x64_codegen import X64CodeGenerator
+from dlc.codegen.binary_io import encode_input, decode_output
+from io import StringIO
+import pytest
+import shutil
+import subprocess
+
+
+@pytest.fixture
+def build():
+    # build(source, optimized=False): o IC do programa, verificado
+    def build(source: str, optimized: bool=False):
+        ast = Parser(RegexLexer(StringIO(source))).ast
+        Checker(ast)
+        ic = IC(ast)
+        if optimized:
+            optimize(ic)
+        return ic
+    return build
+
+
+@pytest.fixture
+def run():
+    # run(ic, data, errors=()): saídas do interpretador do IC com as entradas
+    # de data; uma exceção de errors vira a última saída, com o nome dela
+    def run(ic: IC, data: list, errors: tuple=()):
+        output = []
+        try:
+            ic.interpret(source=data, sink=output.append)
+        except errors as e:
+            output.append(type(e).__name__)
+        return output
+    return run
+
+
+@pytest.fixture
+def native_run(tmp_path):
+    # native_run(ic, data, **options): saídas do executável gerado pelo x64
+    # com E/S binária (options vão para o X64CodeGenerator); sem gcc, o
+    # teste é pulado
+    if shutil.which('gcc') is None:
+        pytest.skip('gcc indisponível')
+
+    def native_run(ic: IC, data: list, **options):
+        asm = tmp_path / 'prog.s'
+        asm.write_text('\n'.join(X64CodeGenerator(ic, binary_io=True, **options).code))
+        subprocess.run(['gcc', str(asm), '-o', str(tmp_path / 'prog'), '-lm'], check=True)
+        out = subprocess.run([str(tmp_path / 'prog')], input=encode_input(data),
+                             capture_output=True, check=True).stdout
+        return decode_output(out)
+    return native_run
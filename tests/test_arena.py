@@ -0,0 +1,58 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.tree.arena import NodeArena
+from dlc.tree.nodes import BinaryNode, ConvertNode
+from io import StringIO
+from pathlib import Path
+import pytest
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+
+def parse(source: str):
+    return Parser(RegexLexer(StringIO(source))).ast
+
+
+@pytest.mark.parametrize('path', inputs, ids=[p.stem for p in inputs])
+def test_arena_ast_matches_object_ast(path, capsys):
+    source = path.read_text()
+    ast = parse(source)
+    arena_ast = NodeArena.from_ast(parse(source))
+    assert str(arena_ast) == str(ast)
+
+    Checker(ast)
+    expected = capsys.readouterr().out
+    Checker(arena_ast)
+    assert capsys.readouterr().out == expected
+    assert str(arena_ast) == str(ast)
+
+    assert str(IC(arena_ast)) == str(IC(ast))
+
+
+def test_views_are_thin_and_children_are_linked():
+    ast = NodeArena.from_ast(parse('programa p inicio real x; x = 1 + 2.5; fim.'))
+    arena = ast.root.arena
+    assign = ast.root.stmt.stmts[1]
+    assert isinstance(assign.expr, BinaryNode)
+    assert assign.expr == assign.expr and assign.expr is not assign.expr
+    assert not vars(assign)  # Nada além de arena e índice
+    assert len(assign.expr) == 2
+
+    Checker(ast)
+    # A ampliação do inteiro 1 para real insere um ConvertNode na arena
+    left, right = assign.expr
+    assert isinstance(left, ConvertNode) and str(next(iter(left))) == '1:int'
+    assert str(right) == '2.5:real'
+    assert arena.next_sibling[left.index] == right.index
+
+
+def test_convert_node_takes_the_line_of_its_operand():
+    ast = NodeArena.from_ast(parse('programa p inicio real x;\nx =\n1 + 2.5;\nescreva(x);\nfim.'))
+    Checker(ast)
+    left, right = ast.root.stmt.stmts[1].expr
+    # O ConvertNode não tem token; antes, o índice -1 dava a linha do
+    # último token da arena (4)
+    assert isinstance(left, ConvertNode)
+    assert left.line == right.line == 3
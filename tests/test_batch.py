@@ -0,0 +1,83 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from pathlib import Path
+import pytest
+
+np = pytest.importorskip('numpy')
+
+inputs = Path(__file__).parent / 'inputs'
+
+# Lê duas vezes a mesma variável e diverge num laço com número variável de voltas
+SUM_DIGITS = '''programa digitos inicio
+    inteiro n, s; real media; booleano par;
+    leia(n); s = 0;
+    enquanto (n > 0) inicio s = s + n % 10; n = n / 10; fim;
+    escreva(s);
+    leia(n); media = (s + n) / 2.0; escreva(media);
+    par = media == 2.0 * (s + n) / 4.0 & s % 2 == 0;
+    se (par) escreva(par) senao escreva(-s * 1000000);
+fim.'''
+
+# A versão de a do se (uma conta) e o leia(a) do senao se juntam num
+# temporário só quando a SSA é desfeita: ele tem de ser uma variável, a, para
+# o leia achar a coluna de entrada
+READ_AFTER_BRANCH = '''programa juncao inicio
+    inteiro a, b, c, d;
+    leia(c); leia(d); leia(b);
+    a = 8 * (c + d) * (b * (c + d));
+    se (d < c) a = a + d - a * a + b + d senao leia(a);
+    escreva(a);
+fim.'''
+
+
+def interpret(ic: IC, values: list, monkeypatch, capsys):
+    values = iter(values)
+    monkeypatch.setattr('builtins.input', lambda prompt: str(next(values)))
+    ic.interpret()
+    return capsys.readouterr().out.splitlines()
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+def test_primo_matches_interpret(optimized, monkeypatch, capsys, build):
+    ic = build((inputs / 'primo.dl').read_text(), optimized)
+    nums = np.arange(-5, 120)
+    result = ic.run_batch({'num': nums})
+    for row, num in enumerate(nums):
+        assert result.lines(row) == interpret(ic, [num], monkeypatch, capsys)
+
+
+def test_repeated_reads_and_divergent_loops(monkeypatch, capsys, build):
+    ic = build(SUM_DIGITS, True)
+    data = np.array([[0, 3], [7, 1], [123456, 9], [99999999, -4], [2147483647, 2147483647]])
+    result = ic.run_batch({'n': data})
+    assert list(result.count) == [3] * len(data)
+    for row, values in enumerate(data):
+        assert result.lines(row) == interpret(ic, list(values), monkeypatch, capsys)
+
+
+def test_reads_keep_their_variable_after_optimization(build):
+    ic = build(READ_AFTER_BRANCH, True)
+    reads = [instr.result for instr in ic if instr.op == Operator.READ]
+    assert [ic.var_temps.get(temp) for temp in reads] == ['c', 'd', 'b', 'a']
+    # A linha do meio passa pelo leia(a), as outras pela conta
+    columns = {'a': np.array([5, -7, 11]), 'b': np.array([1, 2, 3]),
+               'c': np.array([3, -2, 9]), 'd': np.array([2, 8, 1])}
+    result = ic.run_batch(columns)
+    expected = build(READ_AFTER_BRANCH).run_batch(columns)
+    assert [result.lines(row) for row in range(3)] == [expected.lines(row) for row in range(3)]
+
+
+def test_program_without_reads(build):
+    result = build((inputs / 'prog.dl').read_text(), True).run_batch({}, rows=3)
+    assert result.values.shape[0] == 3
+    assert result.lines(0) == result.lines(2)
+
+
+def test_input_errors(build):
+    ic = build(SUM_DIGITS, True)
+    with pytest.raises(ValueError, match='insuficientes'):
+        ic.run_batch({'n': np.array([1, 2])})
+    with pytest.raises(ValueError, match='Sem valores'):
+        ic.run_batch({'x': np.array([1, 2])})
+    with pytest.raises(ValueError, match='tamanhos'):
+        ic.run_batch({'n': np.ones((2, 2))}, rows=3)
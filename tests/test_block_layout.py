@@ -0,0 +1,80 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.inter.profile import Profile
+from dlc.codegen.block_layout import BlockLayout
+from pathlib import Path
+import pytest
+
+PRIMO = (Path(__file__).parent / 'inputs' / 'primo.dl').read_text()
+
+NESTED = '''programa ninhos inicio
+    inteiro n, i, j, s; real r;
+    leia(n); i = 0; s = 0; r = 0.5;
+    enquanto (i < n) inicio
+        j = 0;
+        enquanto (j < i) inicio
+            se (j % 3 == 0) s = s + j senao s = s - 1;
+            j = j + 1;
+        fim;
+        se (s > 100 | s < -100) s = s % 7;
+        r = r * 1.5;
+        escreva(s);
+        i = i + 1;
+    fim;
+    escreva(r);
+fim.'''
+
+
+def profiled(ic: IC, data: list):
+    profile = Profile()
+    ic.interpret(source=data, sink=lambda value: None, profile=profile)
+    return profile
+
+
+def taken(order: list, profile: Profile):
+    # Saltos tomados na execução perfilada com os blocos nessa ordem
+    following = {bb: order[i + 1] if i + 1 < len(order) else None for i, bb in enumerate(order)}
+    return sum(count for (source, target), count in profile.edge_counts.items()
+               if following[next(bb for bb in order if bb.number == source)].number != target)
+
+
+@pytest.mark.parametrize('source, data', [(PRIMO, [97]), (PRIMO, [91]), (NESTED, [40])], ids=['primo', 'composto', 'ninhos'])
+@pytest.mark.parametrize('mode', ['sem layout', 'estático', 'perfil'])
+def test_native_output_matches_interpreter(source, data, mode, build, run, native_run):
+    ic = build(source, True)
+    expected = run(ic, data)
+    profile = profiled(ic, data) if mode == 'perfil' else None
+    output = native_run(ic, data, layout=mode != 'sem layout', profile=profile)
+    assert output == [int(v) if isinstance(v, bool) else v for v in expected]
+
+
+def test_loops_are_bottom_tested(build):
+    # O goto do fim de cada enquanto some: o teste do laço vem logo depois do corpo
+    ic = build(NESTED, True)
+    original = {bb: i for i, bb in enumerate(ic.bb_sequence)}
+    order = BlockLayout(ic).order
+    following = {bb: order[i + 1] if i + 1 < len(order) else None for i, bb in enumerate(order)}
+    loops = 0
+    for bb in ic.bb_sequence:
+        last = bb.instructions[-1] if bb.instructions else None
+        if last is not None and last.op == Operator.GOTO and original[bb.target] < original[bb]:
+            loops += 1
+            assert following[bb] is bb.target
+    assert loops == 2
+
+
+@pytest.mark.parametrize('source, data', [(PRIMO, [97]), (NESTED, [40])], ids=['primo', 'ninhos'])
+def test_profile_reduces_taken_branches(source, data, build):
+    ic = build(source, True)
+    profile = profiled(ic, data)
+    original = taken(ic.bb_sequence, profile)
+    static = taken(BlockLayout(ic).order, profile)
+    guided = taken(BlockLayout(ic, profile).order, profile)
+    assert static < original
+    assert guided < original
+
+
+def test_profile_of_another_program_is_rejected(build):
+    profile = profiled(build(PRIMO, True), [7])
+    with pytest.raises(ValueError):
+        BlockLayout(build(NESTED, True), profile)
@@ -0,0 +1,35 @@
+from dlc.build import build, compile_file
+from pathlib import Path
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+
+def test_output_is_deterministic_within_a_process(tmp_path):
+    first = compile_file(str(inputs[0]), str(tmp_path / 'a'), link=False)
+    second = compile_file(str(inputs[0]), str(tmp_path / 'b'), link=False)
+    assert first.ok and second.ok
+    assert Path(first.assembly).read_text() == Path(second.assembly).read_text()
+
+
+def test_parallel_build_matches_serial_build(tmp_path):
+    bad = tmp_path / 'bad.dl'
+    bad.write_text('programa p inicio y = 1; fim.')
+    sources = [str(p) for p in inputs] + [str(bad)]
+    serial = build(sources, 1, str(tmp_path / 'serial'), link=False)
+    parallel = build(sources, 2, str(tmp_path / 'parallel'), link=False)
+    assert [r.ok for r in parallel] == [True] * (len(sources) - 1) + [False]
+    assert '"y" não declarada!' in parallel[-1].messages
+    for s, p in zip(serial, parallel):
+        if s.ok:
+            assert Path(s.assembly).name == Path(p.assembly).name
+            assert Path(s.assembly).read_text() == Path(p.assembly).read_text()
+
+
+def test_repeated_sources_are_compiled_once(tmp_path):
+    # Compilados juntos, escreveriam ao mesmo tempo no mesmo .s
+    source = str(inputs[0])
+    same = f'{inputs[0].parent}/./{inputs[0].name}'
+    results = build([source, str(inputs[1]), same, source], 2, str(tmp_path), link=False)
+    assert [r.source for r in results] == [source, str(inputs[1]), source, source]
+    assert results[0] is results[2] is results[3]
+    assert all(r.ok for r in results)
@@ -0,0 +1,50 @@
+from dlc.inter.ic import IC
+from dlc.inter.closure_interpreter import ClosureInterpreter
+from pathlib import Path
+import pytest
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+# Estouro de 32 bits, divisão e resto com negativos, potência negativa e reais
+ARITHMETIC = '''programa aritmetica inicio
+    inteiro a, b, i; real r; booleano p;
+    a = 2147483647; b = -7;
+    escreva(a + 1); escreva(a * a); escreva(-(a + 1));
+    escreva(b / 2); escreva(b % 3); escreva(7 % -3);
+    escreva(2 ^ -1); escreva(2 ^ 31);
+    r = 7.5; escreva(r / 2); escreva(r % 2);
+    p = !(a > b) | b == -7; escreva(p);
+    i = 0;
+    enquanto (i < 40) inicio a = a * 3 + i; i = i + 1; fim;
+    escreva(a);
+fim.'''
+
+
+def outputs(ic: IC, monkeypatch, capsys, data: str):
+    result = []
+    for run in (lambda: ic.interpret(registers=False), ic.interpret, ClosureInterpreter(ic).run):
+        monkeypatch.setattr('builtins.input', lambda prompt: data)
+        run()
+        result.append(capsys.readouterr().out)
+    return result
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+@pytest.mark.parametrize('data', ['7', '12', '1', 'x'])
+@pytest.mark.parametrize('path', inputs, ids=lambda p: p.name)
+def test_same_output_as_interpret(path, data, optimized, monkeypatch, capsys, build):
+    expected, registers, closures = outputs(build(path.read_text(), optimized), monkeypatch, capsys, data)
+    assert registers == expected and closures == expected
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+def test_int32_arithmetic(optimized, monkeypatch, capsys, build):
+    expected, registers, closures = outputs(build(ARITHMETIC, optimized), monkeypatch, capsys, '')
+    assert registers == expected and closures == expected
+    assert 'output: -2147483648\n' in expected and 'output: 0.5000\n' in expected
+
+
+def test_temps_are_densely_numbered(build):
+    ic = build(inputs[-1].read_text(), True)
+    numbers = {arg.number for instr in ic for arg in (instr.arg1, instr.arg2, instr.result) if arg.is_temp}
+    assert numbers <= set(range(ic.temp_count))
@@ -0,0 +1,61 @@
+from dlc.inter.ic import IC
+from dlc.inter.closure_interpreter import ClosureInterpreter
+from dlc.codegen.python_codegen import PythonCodeGenerator
+import pytest
+
+SUMS = '''programa somas inicio
+    inteiro n, i, x, s; real r, t; booleano b;
+    leia(n); i = 0; s = 0; t = 0.5;
+    enquanto (i < n) inicio
+        leia(x); leia(r); leia(b);
+        s = s * 3 + x; t = t + r;
+        escreva(s); escreva(t); escreva(b);
+        i = i + 1;
+    fim;
+fim.'''
+
+
+def values(count: int):
+    data = [count]
+    for k in range(count):
+        data += [k * 7919 % 2001 - 1000, k * 0.25, k % 3 == 0]
+    return data
+
+
+def engines(ic: IC):
+    return [ic.interpret, ClosureInterpreter(ic).run, PythonCodeGenerator(ic).compile()]
+
+
+@pytest.mark.parametrize('engine', range(3), ids=['interpret', 'closures', 'python'])
+def test_source_and_sink(engine, capsys, build):
+    ic = build(SUMS, True)
+    run = engines(ic)[engine]
+    sink = []
+    run(source=values(50), sink=sink.append)
+    assert capsys.readouterr().out == ''
+    assert len(sink) == 150
+    s = 0
+    for k in range(50):
+        s = (s * 3 + k * 7919 % 2001 - 1000 + 2 ** 31) % 2 ** 32 - 2 ** 31 # s com estouro de 32 bits
+    assert sink[-3:] == [s, 0.5 + sum(k * 0.25 for k in range(50)), False]
+
+    # Strings, como as linhas de um arquivo, passam pelas mesmas conversões do console
+    run(source=[str(v) if not isinstance(v, bool) else str(int(v)) for v in values(50)])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:3] == [f'output: {sink[0]}', f'output: {sink[1]:.4f}', 'output: 1']
+
+
+@pytest.mark.parametrize('engine', range(3), ids=['interpret', 'closures', 'python'])
+def test_exhausted_source_raises_eof(engine, build):
+    run = engines(build(SUMS, True))[engine]
+    with pytest.raises(EOFError):
+        run(source=values(3)[:-2], sink=[].append)
+
+
+def test_binary_io_native_run(build, run, native_run):
+    ic = build(SUMS, True)
+    data = values(20000)
+    expected = run(ic, data)
+    output = native_run(ic, data)
+    # Booleanos saem como inteiros, como no print_int do console
+    assert output == [int(v) if isinstance(v, bool) else v for v in expected]
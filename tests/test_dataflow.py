@@ -0,0 +1,106 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, BitVectorProblem, Liveness, ReachingCopies, bits
+from dlc.opt.global_opt import optimize, global_copy_propagation, merge_blocks
+import pytest
+
+# x copia a antes de a receber b: trocar x por a no escreva estaria errado
+SWAP = '''programa troca inicio
+    inteiro a, b, x;
+    leia(a); leia(b);
+    x = a; a = b;
+    escreva(x); escreva(a);
+fim.'''
+
+# A mesma cópia nos dois lados do desvio continua disponível depois dele
+JOIN = '''programa juncao inicio
+    inteiro a, x, y;
+    leia(a);
+    se (a > 0) x = a senao x = a;
+    y = x;
+    escreva(y);
+fim.'''
+
+LOOP = '''programa laco inicio
+    inteiro n, i, s;
+    leia(n); i = 0; s = 0;
+    enquanto (i < n) inicio
+        s = s + i;
+        i = i + 1;
+    fim;
+    escreva(s);
+fim.'''
+
+
+def variable(ic: IC, name: str):
+    return next(temp for temp, var in ic.var_temps.items() if var == name)
+
+
+def test_bits():
+    assert list(bits(0)) == []
+    assert list(bits(0b101001)) == [0, 3, 5]
+    assert list(bits(1 << 200 | 2)) == [1, 200]
+
+
+def test_problems_must_define_local(build):
+    cfg = CFG.of(build(SWAP))
+
+    class Incomplete(BitVectorProblem):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(cfg, 4)
+
+
+def test_cfg_reverse_postorder(build):
+    ic = build(LOOP)
+    cfg = CFG.of(ic)
+    assert cfg.rpo[0] is ic.bb_sequence[0]
+    assert set(cfg.rpo) == set(ic.bb_sequence)
+    position = {bb: i for i, bb in enumerate(cfg.rpo)}
+    for bb in ic.bb_sequence:
+        for succ in cfg.successors[bb]:
+            assert bb in cfg.predecessors[succ]
+    # Só as arestas de volta do laço vão contra a RPO
+    back = [(bb, succ) for bb in ic.bb_sequence for succ in cfg.successors[bb] if position[succ] <= position[bb]]
+    assert len(back) == 1
+
+
+def test_liveness_around_loop(build):
+    ic = build(LOOP)
+    cfg = CFG.of(ic)
+    liveness = Liveness(cfg, ic.temp_count)
+    s, i, n = (variable(ic, name) for name in ('s', 'i', 'n'))
+    entry = ic.bb_sequence[0]
+    assert liveness.ins[entry] == 0
+    # n, i e s ficam vivos durante todo o laço
+    header = next(bb for bb in ic.bb_sequence if len(cfg.predecessors[bb]) == 2)
+    for temp in (s, i, n):
+        assert liveness.ins[header] >> temp.number & 1
+    exits = [bb for bb in ic.bb_sequence if not cfg.successors[bb]]
+    assert all(liveness.outs[bb] == 0 for bb in exits)
+
+
+@pytest.mark.parametrize('data', [[1, 2], [-3, 9]])
+def test_copy_is_killed_when_source_is_redefined_by_a_copy(data, build, run):
+    ic = build(SWAP, True)
+    assert run(ic, data) == data
+
+
+def test_copies_meet_at_joins(build, run):
+    ic = build(JOIN)
+    a = variable(ic, 'a')
+    copies = ReachingCopies(CFG.of(ic))
+    last = ic.bb_sequence[-1]
+    assert copies.source(variable(ic, 'x'), copies.ins[last]) is a
+    optimize(ic)
+    assert run(ic, [5]) == [5]
+    prints = [instr for instr in ic if instr.op == Operator.PRINT]
+    assert len(prints) == 1 and prints[0].arg1 is a
+
+
+def test_copy_propagation_reaches_fixed_point(build, run):
+    ic = build(LOOP, True)
+    assert not global_copy_propagation(ic)
+    assert not merge_blocks(ic)
+    assert run(ic, [4]) == [6]
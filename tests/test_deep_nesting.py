@@ -0,0 +1,41 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from io import StringIO
+import pytest
+
+DEPTH = 20000  # Bem acima do limite de recursão padrão do Python
+
+# Corpo e valor que ele deixa em x (DEPTH é par: os menos se cancelam)
+programs = {
+    'parenteses': ('x = ' + '(' * DEPTH + '1' + ')' * DEPTH + ';', 1),
+    'unarios': ('x = ' + '-' * DEPTH + '1;', 1),
+    'potencias': ('x = 1' + '^1' * DEPTH + ';', 1),
+    'somas': ('x = 0' + '+1' * DEPTH + ';', DEPTH),
+    'se': ('x = 0; ' + 'se (x < 1) ' * DEPTH + 'x = 1;', 1),
+    'blocos': ('x = 0; ' + 'inicio ' * DEPTH + 'x = 1;' + ' fim;' * DEPTH, 1),
+}
+
+
+@pytest.mark.parametrize('body, value', programs.values(), ids=programs.keys())
+def test_deep_programs_compile_and_run(body, value, capsys):
+    source = f'programa p inicio inteiro x; {body} escreva(x); fim.'
+    parser = Parser(RegexLexer(StringIO(source)))
+    assert not parser.had_errors
+    assert not Checker(parser.ast).had_errors
+    capsys.readouterr()
+    IC(parser.ast).interpret()
+    assert capsys.readouterr().out.strip() == f'output: {value}'
+
+
+def test_deep_ast_str():
+    source = 'programa p inicio inteiro x; x = ' + '-' * 2000 + '1; fim.'
+    lines = str(Parser(RegexLexer(StringIO(source))).ast).splitlines()
+    # Um nó u- por linha, cada um um nível abaixo do anterior, e o 1 no fundo
+    minus = [line for line in lines if line.endswith('u-')]
+    assert len(minus) == 2000
+    columns = [line.index('u-') for line in minus]
+    assert all(b - a == 4 for a, b in zip(columns, columns[1:]))
+    (literal,) = [line for line in lines if line.endswith('─1')]
+    assert literal.index('1') == columns[-1] + 4
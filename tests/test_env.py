@@ -0,0 +1,37 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.semantic.env import SymbolTable, SymbolInfo
+from dlc.semantic.type import Type
+from io import StringIO
+
+
+def test_shadowing_and_undo():
+    table = SymbolTable()
+    outer = SymbolInfo(Type.INT, table.number, 1)
+    table.put('x', outer)
+    table.open_scope()
+    assert table.get_local('x') is None and table.get('x') is outer
+    inner = SymbolInfo(Type.REAL, table.number, 2)
+    table.put('x', inner)
+    table.put('y', SymbolInfo(Type.BOOL, table.number, 3))
+    assert table.get('x') is inner and table.get_local('x') is inner
+    assert [name for name, _ in table.close_scope()] == ['x', 'y']
+    assert table.get('x') is outer and table.get('y') is None
+
+
+def test_deeply_nested_blocks(capsys):
+    depth = 500
+    source = ('programa p inicio inteiro x; x = 1; ' + 'inicio inteiro y; y = x; ' * depth
+              + 'escreva(x);' + ' escreva(y); fim;' * depth + ' fim.')
+    ast = Parser(RegexLexer(StringIO(source))).ast
+    checker = Checker(ast)
+    assert not checker.had_errors
+    assert 'Aviso' not in capsys.readouterr().out
+
+    block = ast.root.stmt
+    scopes = []
+    for _ in range(depth):
+        block = block.stmts[2]
+        scopes.append(block.stmts[1].var.scope)
+    assert len(set(scopes)) == depth
@@ -0,0 +1,67 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.global_opt import optimize, global_value_numbering
+import pytest
+
+REPEATED = '''programa repetidas inicio
+    inteiro raio, a, b; real area, volume, r;
+    leia(raio); leia(a); leia(b);
+    area = 3.1415 * raio * raio;
+    volume = 3.1415 * raio * raio * 4;
+    r = a + 0.5;
+    r = r + a * 1.5;
+    escreva(area); escreva(volume); escreva(r);
+    escreva(a * b + b * a);
+    escreva(a == b); escreva(b == a);
+fim.'''
+
+# a * b é calculado antes do se e nos dois ramos, mas o b * 2 de um ramo
+# não domina o do outro, e a atribuição a b dentro do laço muda o valor
+BRANCHES = '''programa ramos inicio
+    inteiro a, b, c, i;
+    leia(a); leia(b); i = 0;
+    c = a * b;
+    se (a > b) c = c + a * b + b * 2 senao c = c - b * a - b * 2;
+    enquanto (i < 3) inicio
+        c = c + a * b;
+        b = b + 1;
+        i = i + 1;
+    fim;
+    escreva(c); escreva(a * b);
+fim.'''
+
+
+def count(ic: IC, *ops):
+    return sum(instr.op in ops for instr in ic)
+
+
+@pytest.mark.parametrize('data', [[3, 4, 5], [-2, 7, 7]])
+def test_redundant_expressions_are_removed(data, build, run):
+    ic = build(REPEATED)
+    expected = run(ic, data)
+    optimize(ic)
+    assert run(ic, data) == expected
+    # raio convertido uma vez e 3.1415 * raio * raio calculado uma vez; a
+    # convertido uma vez; a * b e b * a são a mesma conta, e == também comuta
+    assert count(ic, Operator.CONVERT) == 2
+    assert count(ic, Operator.MUL) == 5
+    assert count(ic, Operator.EQ) == 1
+
+
+@pytest.mark.parametrize('data', [[5, 2], [2, 5], [-1, -1]])
+def test_only_dominating_expressions_are_reused(data, build, run):
+    ic = build(BRANCHES)
+    expected = run(ic, data)
+    optimize(ic)
+    assert run(ic, data) == expected
+    # Sobram a * b antes do se (reusado nos dois ramos), b * 2 em cada ramo
+    # e o a * b depois do laço; o do laço muda a cada volta (b = b + 1) e
+    # vira uma soma de a ao valor de antes do laço
+    assert count(ic, Operator.MUL) == 4
+
+
+def test_no_change_leaves_code_untouched(build):
+    ic = build(BRANCHES, True)
+    before = str(ic)
+    assert not global_value_numbering(ic)
+    assert str(ic) == before
@@ -0,0 +1,86 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.lex.token import Token
+from dlc.syntax.incremental import IncrementalParser
+from dlc.syntax.parser import Parser
+from io import StringIO
+from pathlib import Path
+import random
+
+source_code = (Path(__file__).parent / 'inputs' / 'prog.dl').read_text()
+
+
+def check_against_full_parse(inc: IncrementalParser):
+    lexer = RegexLexer(StringIO(inc.text))
+    expected = []
+    for token in inc.tokens:
+        fresh = lexer.next_token()
+        expected.append((fresh.tag, fresh.lexeme, fresh.line, lexer.start))
+    assert [(t.tag, t.lexeme, t.line, inc.offset(t)) for t in inc.tokens] == expected
+    parser = Parser(RegexLexer(StringIO(inc.text)))
+    if not inc.had_errors:
+        assert str(inc.ast) == str(parser.ast)
+
+
+def test_edit_reuses_nodes_outside_the_damaged_statement():
+    inc = IncrementalParser(source_code)
+    stmts = list(inc.ast.root.stmt.stmts)
+    offset = inc.text.index('num = num - 7')
+    inc.edit(offset + len('num = num - '), 1, '(3 * i)')
+    new_stmts = inc.ast.root.stmt.stmts
+    assert inc.full_parses == 1
+    changed = [i for i, (a, b) in enumerate(zip(stmts, new_stmts)) if a is not b]
+    assert len(changed) == 1 and len(stmts) == len(new_stmts)
+    check_against_full_parse(inc)
+
+
+def test_edit_inside_nested_block():
+    inc = IncrementalParser(source_code)
+    loop = inc.ast.root.stmt.stmts[-1]
+    offset = inc.text.index('escreva(i);')
+    inc.edit(offset, 0, 'i = i + 1;\n        ')
+    assert inc.full_parses == 1
+    assert inc.ast.root.stmt.stmts[-1] is loop
+    assert len(loop.stmt.stmts) == 3
+    check_against_full_parse(inc)
+
+
+def test_whitespace_and_comment_edits_do_not_reparse():
+    inc = IncrementalParser(source_code)
+    root = inc.ast.root
+    inc.edit(inc.text.index('i = 2;'), 0, '/* comentário */\n\n')
+    assert inc.ast.root is root and inc.full_parses == 1
+    check_against_full_parse(inc)
+
+
+def test_new_lines_do_not_touch_the_tokens_after_the_edit():
+    inc = IncrementalParser(source_code)
+    inc.edit(inc.text.index('i = 2;'), 0, '\n\n')
+    tail = inc.tokens[-10:]
+    stored = [Token.line.__get__(t) for t in tail] # Valores guardados, relativos ao fim
+    lines = [t.line for t in tail]
+    inc.edit(inc.text.index('i = 2;'), 0, '\n')
+    assert [Token.line.__get__(t) for t in tail] == stored
+    assert [t.line for t in tail] == [line + 1 for line in lines]
+    check_against_full_parse(inc)
+
+
+def test_random_edits_match_full_parse():
+    rng = random.Random(7)
+    pieces = [' ', '\n', ';', 'x', 'inicio ', ' fim', '/*', '*/', '1.5', '(', ')', 'se (i < 2) ', 'escreva(i);']
+    inc = IncrementalParser(source_code)
+    for _ in range(300):
+        offset = rng.randrange(len(inc.text) + 1)
+        removed = rng.randrange(min(4, len(inc.text) - offset) + 1)
+        inc.edit(offset, removed, rng.choice(pieces) if rng.random() < 0.7 else '')
+        check_against_full_parse(inc)
+
+
+def test_random_valid_edits_stay_incremental():
+    rng = random.Random(11)
+    inc = IncrementalParser(source_code)
+    for _ in range(200):
+        spaces = [i for i, c in enumerate(inc.text) if c in ' \n' and inc.text[i - 1] == ';']
+        offset = rng.choice(spaces)
+        inc.edit(offset, 0, rng.choice([' ', '\n', ' escreva(2 * i);', ' /* c */', '\n i = i + 1;']))
+        check_against_full_parse(inc)
+    assert not inc.had_errors and inc.full_parses == 1
@@ -0,0 +1,117 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, DominatorTree
+from dlc.opt.global_opt import optimize, loop_invariant_code_motion
+from dlc.opt.loops import natural_loops, insert_preheader
+import pytest
+
+# a * b, n * 2 e (a - b) / b não mudam no laço externo, e a * b * n também
+# não muda no interno; x / (x - 1.5) divide por um real que pode ser zero
+INVARIANT = '''programa invariantes inicio
+    inteiro n, i, j, a, b, s; real r, x;
+    leia(n); leia(a); leia(b); leia(x); i = 0; s = 0; r = 0.5;
+    enquanto (i < n * 2) inicio
+        s = s + a * b + (a - b) / b;
+        r = r + x / (x - 1.5);
+        j = 0;
+        enquanto (j < n) inicio
+            s = s + a * b * n;
+            j = j + 1;
+        fim;
+        i = i + 1;
+    fim;
+    escreva(s); escreva(r);
+fim.'''
+
+# n = 0: o laço não dá volta, então b = 0 e x = 1.5 não podem falhar;
+# n > 0 com b = 0 ou x = 1.5 falha na primeira volta, como sem LICM;
+# b = -1 com a = MIN_INT passa pelo caminho lento sem estourar
+DATA = [[0, 5, 0, 1.5], [2, 5, 0, 2.0], [2, 5, 3, 1.5], [3, 7, -2, 2.5], [2, -2147483648, -1, 3.0], [1, 4, 4, 0.5]]
+
+# c e d nunca são lidos: as contas protegidas saem do laço, o DCE apaga o
+# uso, e a conta refeita no caminho lento não pode sair de novo a cada
+# rodada de optimize
+DEAD = '''programa mortas inicio
+    inteiro a, b, c, d, k;
+    leia(a); leia(b); k = 0;
+    enquanto (k < 5) inicio
+        c = a / b;
+        d = a % b;
+        k = k + 1;
+    fim;
+    escreva(k);
+fim.'''
+
+
+def loops_of(ic: IC):
+    cfg = CFG.of(ic)
+    return cfg, natural_loops(cfg, DominatorTree(cfg))
+
+
+def test_natural_loops_inner_first(build):
+    _, loops = loops_of(build(INVARIANT))
+    assert len(loops) == 2
+    inner, outer = loops
+    assert inner.body < outer.body
+    assert inner.header in outer and outer.header not in inner
+    assert all(latch in inner for latch in inner.latches)
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_preheader_is_the_only_entry(data, build, run):
+    ic = build(INVARIANT)
+    expected = run(ic, data, (ZeroDivisionError,))
+    _, loops = loops_of(ic)
+    for loop in loops:
+        preheader = insert_preheader(ic, loop, loops_of(ic)[0])
+        assert preheader is not None
+        cfg = CFG.of(ic)
+        outside = [pred for pred in cfg.predecessors[loop.header] if pred not in loop]
+        assert outside == [preheader]
+        assert cfg.successors[preheader] == [loop.header]
+    assert run(ic, data, (ZeroDivisionError,)) == expected
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_invariants_leave_the_loops(data, build, run):
+    ic = build(INVARIANT)
+    expected = run(ic, data, (ZeroDivisionError,))
+    optimize(ic)
+    assert run(ic, data, (ZeroDivisionError,)) == expected
+    cfg, loops = loops_of(ic)
+    assert [sum(instr.op == Operator.MUL for bb in loop.body for instr in bb) for loop in loops] == [0, 0]
+    # Só sobram as divisões dos caminhos lentos, cada uma sozinha num bloco
+    # aonde se chega quando a guarda falha
+    for bb in loops[1].body:
+        divisions = [instr for instr in bb if instr.op == Operator.DIV]
+        if divisions:
+            assert len(bb.instructions) == 1
+            (pred,) = cfg.predecessors[bb]
+            assert pred.instructions[-1].op == Operator.IF
+
+
+def test_dead_guarded_divisions_are_dropped(build, run):
+    ic = build(DEAD)
+    expected = run(ic, [5, 3])
+    optimize(ic)
+    assert run(ic, [5, 3]) == expected
+    # Sem as contas e sem as guardas: só sobra o desvio do enquanto
+    assert not any(instr.op in (Operator.DIV, Operator.MOD) for instr in ic)
+    assert [instr.op for instr in ic if instr.op in (Operator.IF, Operator.IFFALSE)] == [Operator.IFFALSE]
+    assert len(ic.bb_sequence) == 4
+
+
+def test_no_change_at_fixed_point(build):
+    ic = build(INVARIANT, True)
+    before = str(ic)
+    assert not loop_invariant_code_motion(ic)
+    assert str(ic) == before
+
+
+# Divisores positivos: a divisão inteira do interpretador arredonda para
+# baixo e a do idiv para zero
+@pytest.mark.parametrize('data', [DATA[0], [3, 7, 2, 2.5], DATA[5]])
+def test_native_output_matches_interpreter(data, build, run, native_run):
+    ic = build(INVARIANT, True)
+    expected = run(ic, data, (ZeroDivisionError,))
+    assert native_run(ic, data) == expected
@@ -0,0 +1,44 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.global_opt import optimize
+from io import StringIO
+from pathlib import Path
+import pytest
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+
+def build(path: Path):
+    ast = Parser(RegexLexer(StringIO(path.read_text()))).ast
+    Checker(ast)
+    return IC(ast)
+
+
+@pytest.mark.parametrize('path', inputs, ids=lambda p: p.name)
+def test_targets_are_blocks_of_the_optimized_sequence(path):
+    ic = build(path)
+    optimize(ic)
+    ic.link()
+    blocks = set(ic.bb_sequence)
+    for bb in ic.bb_sequence:
+        last = bb.instructions[-1] if bb.instructions else None
+        if last is not None and last.op in (Operator.GOTO, Operator.IF, Operator.IFFALSE):
+            assert bb.target in blocks
+            assert bb.target.instructions[0].result is last.result
+        assert bb.fallthrough is None or bb.fallthrough in blocks
+
+
+@pytest.mark.parametrize('path', inputs, ids=lambda p: p.name)
+def test_successor_order_does_not_matter(path, monkeypatch, capsys):
+    monkeypatch.setattr('builtins.input', lambda prompt: '7')
+    ic = build(path)
+    optimize(ic)
+    ic.interpret()
+    expected = capsys.readouterr().out
+    for bb in ic.bb_sequence:
+        bb.successors.reverse()
+    ic.interpret()
+    assert capsys.readouterr().out == expected
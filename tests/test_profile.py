@@ -0,0 +1,85 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.inter.profile import Profile
+from dlc.opt.global_opt import optimize
+from io import StringIO
+from pathlib import Path
+import pytest
+
+PRIMO = Path(__file__).parent / 'inputs' / 'primo.dl'
+
+
+def build(path: Path=PRIMO):
+    ast = Parser(RegexLexer(StringIO(path.read_text()))).ast
+    Checker(ast)
+    ic = IC(ast)
+    optimize(ic)
+    return ic
+
+
+def test_counts_follow_the_flow():
+    ic = build()
+    profile = Profile()
+    output = []
+    ic.interpret(source=[97], sink=output.append, profile=profile)
+    assert output == [True]
+    assert profile.count(ic.bb_sequence[0].number) == 1
+    # Cada bloco executa tantas vezes quantas se entra nele
+    for bb in ic.bb_sequence[1:]:
+        entries = sum(count for (_, target), count in profile.edge_counts.items() if target == bb.number)
+        assert profile.count(bb.number) == entries
+    # Um laço de 2 a 96: alguma aresta é percorrida 95 vezes
+    assert max(profile.edge_counts.values()) == 95
+    for bb in ic.bb_sequence:
+        assert profile.instr_counts[bb.number] == [profile.count(bb.number)] * len(bb.instructions)
+    assert set(profile.block_times) == set(profile.block_counts)
+
+
+def test_runs_accumulate_and_reject_other_programs():
+    ic = build()
+    profile = Profile()
+    ic.interpret(source=[7], sink=lambda value: None, profile=profile)
+    first = dict(profile.block_counts)
+    ic.interpret(source=[7], sink=lambda value: None, profile=profile)
+    assert profile.runs == 2
+    assert profile.block_counts == {number: 2 * count for number, count in first.items()}
+
+    other = build(Path(__file__).parent / 'inputs' / 'area_circulo.dl')
+    assert not profile.matches(other)
+    with pytest.raises(ValueError):
+        other.interpret(source=[7], sink=lambda value: None, profile=profile)
+
+
+def test_invalid_input_stops_instruction_counts(capsys):
+    ic = build()
+    profile = Profile()
+    ic.interpret(source=['x'], profile=profile)
+    entry = ic.bb_sequence[0]
+    assert profile.instr_counts[entry.number] == [1] + [0] * (len(entry.instructions) - 1)
+    assert 'inválida' in capsys.readouterr().out
+
+
+def test_save_and_load(tmp_path):
+    ic = build()
+    profile = Profile()
+    ic.interpret(source=[97], sink=lambda value: None, profile=profile)
+    profile.save(tmp_path / 'primo.json')
+    loaded = Profile.load(tmp_path / 'primo.json')
+    assert loaded.matches(build())
+    assert loaded.block_counts == profile.block_counts
+    assert loaded.edge_counts == profile.edge_counts
+    assert loaded.instr_counts == profile.instr_counts
+    assert loaded.report() == profile.report()
+
+
+def test_graph_overlay():
+    pytest.importorskip('graphviz')
+    ic = build()
+    profile = Profile()
+    ic.interpret(source=[97], sink=lambda value: None, profile=profile)
+    source = ic.graph(profile).source
+    assert '(96x)' in source
+    assert 'label=95' in source
+    assert '(96x)' not in ic.graph().source
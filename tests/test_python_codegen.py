@@ -0,0 +1,78 @@
+from dlc.inter.ic import IC
+from dlc.codegen.python_codegen import PythonCodeGenerator
+from dlc import jit
+from pathlib import Path
+import pytest
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+# Inteiros que passam a guardar reais (2 ^ -1), estouro de 32 bits e laços
+MIXED = '''programa misto inicio
+    inteiro a, b, i; real r;
+    a = 2147483647; b = 2 ^ -1; escreva(b); escreva(b * 4); escreva(b / 2);
+    escreva(a + 1); escreva(-(a + 1)); escreva((a + 1) / -1); escreva(-7 / 2); escreva(-7 % 3);
+    r = 1.5; i = 0;
+    enquanto (i < 30) inicio
+        r = r * 1.5 - i;
+        a = a * 7 + i;
+        se (a % 2 == 0) escreva(a) senao escreva(r);
+        i = i + 1;
+    fim;
+fim.'''
+
+
+def outputs(ic: IC, monkeypatch, capsys, data: str):
+    result = []
+    for run in (ic.interpret, PythonCodeGenerator(ic).compile()):
+        monkeypatch.setattr('builtins.input', lambda prompt: data)
+        run()
+        result.append(capsys.readouterr().out)
+    return result
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+@pytest.mark.parametrize('data', ['7', '12', '1', 'x'])
+@pytest.mark.parametrize('path', inputs, ids=lambda p: p.name)
+def test_same_output_as_interpret(path, data, optimized, monkeypatch, capsys, build):
+    expected, output = outputs(build(path.read_text(), optimized), monkeypatch, capsys, data)
+    assert output == expected
+
+
+@pytest.mark.parametrize('optimized', [False, True])
+def test_mixed_int_and_real_values(optimized, monkeypatch, capsys, build):
+    expected, output = outputs(build(MIXED, optimized), monkeypatch, capsys, '')
+    assert output == expected
+    assert output.startswith('output: 0.5000\noutput: 2.0000\noutput: 0.2500\noutput: -2147483648\n')
+
+
+def test_cache_skips_the_compiler(tmp_path, monkeypatch, capsys):
+    source = tmp_path / 'prog.dl'
+    source.write_text(inputs[-1].read_text())
+    jit.compile_file(source, tmp_path / 'cache')()
+    expected = capsys.readouterr().out
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+    def fail(*args):
+        raise AssertionError('compilador chamado com o cache preenchido')
+    monkeypatch.setattr(jit, 'Parser', fail)
+    jit.compile_file(source, tmp_path / 'cache')()
+    assert capsys.readouterr().out == expected
+
+    source.write_text(inputs[-1].read_text() + '\n')
+    with pytest.raises(AssertionError):
+        jit.compile_file(source, tmp_path / 'cache')
+
+
+def test_cache_is_keyed_by_the_compiler_sources(tmp_path, monkeypatch):
+    source = tmp_path / 'prog.dl'
+    source.write_text(inputs[-1].read_text())
+    jit.compile_file(source, tmp_path / 'cache')
+
+    def fail(*args):
+        raise AssertionError('compilador chamado')
+    monkeypatch.setattr(jit, 'Parser', fail)
+    jit.compile_file(source, tmp_path / 'cache') # Mesmo compilador: vem do cache
+    # Outro compilador (ex.: uma correção na otimização) não reaproveita a entrada
+    monkeypatch.setattr(jit, 'compiler_digest', lambda: b'outro compilador')
+    with pytest.raises(AssertionError):
+        jit.compile_file(source, tmp_path / 'cache')
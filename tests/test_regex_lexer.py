@@ -0,0 +1,57 @@
+from dlc.lex.tag import Tag
+from dlc.lex.lexer import Lexer
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.lex.mmap_lexer import MmapLexer
+from io import StringIO
+from pathlib import Path
+
+INPUTS = Path(__file__).parent / 'inputs'
+
+snippets = (
+    'a=b==c!d!=e<f<=g>h>=i+j-k*l/m%n^o|p&q;r,s.(t)',
+    'x = 12; y = 12.; z = 3.1415; w = 7.5.3',
+    '// comentário de linha\nx = 1 // outro\n/* bloco\n com ** e / */ y\n/*/ ainda */ z',
+    'x = 1\n\n\r\n\t/* não fechado\n\n',
+    'a / b\n/',
+    'ação = 1; é = x²; π² = ½; 12² 3é',
+    'programa inicio fim escreva leia se senao enquanto inteiro real booleano verdade falso _x1',
+    '@ # $ ~ ? \x0c\x0b',
+    '',
+)
+
+
+def tokens(lexer):
+    result = []
+    while True:
+        token = lexer.next_token()
+        result.append((token.tag, token.lexeme, token.line))
+        if token.tag == Tag.EOF:
+            return result
+
+
+def test_regex_lexer_matches_lexer():
+    sources = list(snippets) + [p.read_text() for p in INPUTS.glob('*.dl')]
+    for source in sources:
+        expected = tokens(Lexer(StringIO(source)))
+        assert tokens(RegexLexer(StringIO(source))) == expected, source
+
+
+def test_mmap_lexer_matches_lexer(tmp_path):
+    sources = list(snippets) + [p.read_text() for p in INPUTS.glob('*.dl')]
+    for i, source in enumerate(sources):
+        path = tmp_path / f'{i}.dl'
+        path.write_text(source, encoding='utf-8')
+        expected = tokens(Lexer(StringIO(source)))
+        with open(path, 'rb') as file, MmapLexer(file) as lexer:
+            assert tokens(lexer) == expected, source
+
+
+def test_mmap_lexer_line_breaks_as_text_mode(tmp_path):
+    # \r sozinho e \r\n quebram a linha como no modo texto de open()
+    path = tmp_path / 'crlf.dl'
+    path.write_bytes(b'a = 1;\r// fim em \\r\rb = 2;\r\n/* x\ry\r\nz */ c\r\r\n// ok\n@\r/* aberto\r\r')
+    with open(path, encoding='utf-8') as file:
+        expected = tokens(RegexLexer(file))
+    with open(path, 'rb') as file, MmapLexer(file) as lexer:
+        assert tokens(lexer) == expected
+    assert [line for tag, _, line in expected if tag == Tag.ID] == [1, 3, 6]
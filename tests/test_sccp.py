@@ -0,0 +1,68 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.global_opt import optimize, sparse_conditional_constant_propagation
+import pytest
+
+# y só recebe 3 num ramo que nunca executa, então x é sempre 1: a propagação
+# densa, que junta os dois ramos, não descobre isso
+LOOP = '''programa laco inicio
+    inteiro n, i, x, y;
+    leia(n); i = 0; x = 1;
+    enquanto (i < n) inicio
+        se (x == 1) y = 2 senao y = 3;
+        x = y - 1;
+        i = i + 1;
+    fim;
+    escreva(x);
+fim.'''
+
+BRANCHES = '''programa desvios inicio
+    inteiro a; booleano b;
+    leia(a);
+    b = verdade | falso;
+    se (b) escreva(a) senao escreva(a + 1);
+    se (!b & a > 0) escreva(2);
+fim.'''
+
+ZERO = '''programa zero inicio
+    inteiro a;
+    a = 1 / 0;
+    escreva(a);
+fim.'''
+
+
+def instructions(ic: IC):
+    return [str(instr) for instr in ic]
+
+
+@pytest.mark.parametrize('n', [0, 1, 5])
+def test_constants_through_unexecutable_branches(n, build, run):
+    ic = build(LOOP)
+    expected = run(ic, [n])
+    optimize(ic)
+    assert run(ic, [n]) == expected
+    assert 'print 1' in instructions(ic)
+    assert not any(instr.arg1.is_const and instr.arg1.value == 3 for instr in ic)
+
+
+@pytest.mark.parametrize('a', [-4, 7])
+def test_constant_branches_are_pruned(a, build, run):
+    ic = build(BRANCHES)
+    expected = run(ic, [a])
+    blocks = len(ic.bb_sequence)
+    assert sparse_conditional_constant_propagation(ic)
+    assert run(ic, [a]) == expected == [a]
+    assert not any(instr.op in (Operator.IF, Operator.IFFALSE) for instr in ic)
+    assert len(ic.bb_sequence) < blocks
+
+
+def test_division_by_zero_is_left_for_execution(build, run):
+    ic = build(ZERO, True)
+    assert any(instr.op == Operator.DIV for instr in ic)
+    with pytest.raises(ZeroDivisionError):
+        run(ic, [])
+
+
+def test_fixed_point_reports_no_change(build):
+    ic = build(LOOP, True)
+    assert not sparse_conditional_constant_propagation(ic)
@@ -0,0 +1,120 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.inter.closure_interpreter import ClosureInterpreter
+from dlc.codegen.python_codegen import PythonCodeGenerator
+from dlc.codegen.x64_codegen import X64CodeGenerator
+from dlc.opt.global_opt import optimize, sparse_conditional_constant_propagation
+from dlc.opt.simplify import simplify, RELATIONAL
+import pytest
+
+# Nos reais, x + 0 e x * 0 ficam (-0.0, inf e nan); x - 0, x * 1 e x / 1 não
+IDENTITIES = '''programa identidades inicio
+    inteiro a; real x; booleano b;
+    leia(a); leia(x); b = a > 0;
+    escreva(a + 0); escreva(0 + a); escreva(a - 0); escreva(a - a);
+    escreva(a * 1); escreva(1 * a); escreva(a * 0); escreva(a / 1); escreva(a % 1);
+    escreva(x + 0); escreva(x - 0); escreva(x * 1); escreva(x * 0); escreva(x / 1);
+    escreva(!!b); escreva(b == verdade); escreva(falso != b);
+    escreva(b == falso); escreva(verdade != b);
+fim.'''
+
+# b = n > 3 não vira desvio com comparação embutida (é lido em outro
+# bloco), nem o & (vira 1 ou 0 antes do desvio)
+BRANCHES = '''programa desvios inicio
+    inteiro n, i, s; real x, r; booleano b;
+    leia(n); leia(x); i = 0; s = 0; r = 0.5; b = n > 3;
+    enquanto (i < n) inicio
+        se (i % 3 == 0) s = s + i senao s = s - 1;
+        se (!(x < r)) r = r + 0.5;
+        se (b == verdade & i >= 2) s = s * 2;
+        i = i + 1;
+    fim;
+    escreva(s); escreva(r);
+fim.'''
+
+# x só é escrito num se que nunca executa: o 5 < x do desvio depende de x,
+# então a propagação de constantes não pode decidi-lo só pelo 5
+UNDEFINED = '''programa indefinida inicio
+    inteiro n, x;
+    n = 5;
+    se (n > 100) x = 1;
+    se (5 < x) escreva(1) senao escreva(2);
+fim.'''
+
+DATA = [[0, 1.5], [5, 0.5], [9, 2.5], [-3, -1.5], [12, 4.25]]
+
+
+def count(ic: IC, *ops):
+    return sum(instr.op in ops for instr in ic)
+
+
+def jumps(ic: IC):
+    return [instr for instr in ic if instr.op in (Operator.IF, Operator.IFFALSE)]
+
+
+@pytest.mark.parametrize('data', [[3, 1.5], [-7, -0.5], [0, 2.5]])
+def test_identities(data, build, run):
+    ic = build(IDENTITIES)
+    expected = run(ic, data)
+    optimize(ic)
+    assert run(ic, data) == expected
+    assert count(ic, Operator.SUB, Operator.DIV, Operator.MOD) == 0
+    assert count(ic, Operator.SUM) == count(ic, Operator.MUL) == 1
+    assert all(instr.result.type.is_float for instr in ic if instr.op in (Operator.SUM, Operator.MUL))
+    # b == falso e verdade != b viram o mesmo not b; !!b e os outros, b
+    assert count(ic, Operator.NOT) == 1
+    assert count(ic, *RELATIONAL) == 1
+
+
+def test_compare_is_fused_into_the_branch(build):
+    ic = build(BRANCHES)
+    assert simplify(ic)
+    fused = [instr for instr in jumps(ic) if instr.relation is not None]
+    assert [str(instr.relation) for instr in fused] == ['<', '==', '<', '>=']
+    # !(x < r): o not some e o desvio troca de sentido
+    assert fused[2].op == Operator.IF
+    assert str(fused[0]).startswith('iffalse t')
+    assert ' < ' in str(fused[0]) and str(fused[0]).endswith(f'goto {fused[0].result}')
+    assert not simplify(ic)
+
+
+def test_fused_branch_waits_for_both_operands(build, run):
+    ic = build(UNDEFINED)
+    expected = run(ic, [], (TypeError,))
+    assert expected == ['TypeError'] # x sem valor
+    assert simplify(ic)
+    assert sparse_conditional_constant_propagation(ic)
+    assert [instr.relation for instr in jumps(ic)] == [Operator.LT]
+    optimize(ic)
+    assert run(ic, [], (TypeError,)) == expected
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_fused_branches_run_the_same(data, monkeypatch, capsys, build, run):
+    ic = build(BRANCHES)
+    expected = run(ic, data)
+    optimize(ic)
+    assert run(ic, data) == expected
+    assert [instr.relation is None for instr in jumps(ic)] == [False, False, False, True, False, True]
+    assert count(ic, *RELATIONAL) == 1
+
+    printed = []
+    for interpret in (lambda: ic.interpret(registers=False), ic.interpret,
+                      ClosureInterpreter(ic).run, PythonCodeGenerator(ic).compile()):
+        values = iter(data)
+        monkeypatch.setattr('builtins.input', lambda prompt: str(next(values)))
+        interpret()
+        printed.append(capsys.readouterr().out)
+    assert len(set(printed)) == 1
+
+
+@pytest.mark.parametrize('data', DATA)
+def test_native_fused_branches(data, build, run, native_run):
+    ic = build(BRANCHES, True)
+    expected = run(ic, data)
+    code = X64CodeGenerator(ic, binary_io=True).code
+    # Só b = n > 3 ainda passa por setcc e movzx
+    instructions = [line.split()[0] for line in code if line.startswith('\t')]
+    assert sum(op.startswith('set') for op in instructions) == 1
+    assert sum(op == 'movzx' for op in instructions) == 1
+    assert native_run(ic, data) == expected
@@ -0,0 +1,164 @@
+from dlc.inter.ic import IC
+from dlc.inter.operator import Operator
+from dlc.opt.dataflow import CFG, DominatorTree
+from dlc.opt.ssa import to_ssa, from_ssa, phis
+from pathlib import Path
+import pytest
+
+INPUTS = Path(__file__).parent / 'inputs'
+
+# a e b trocam de valor a cada volta: depois da propagação das cópias na
+# forma SSA, os PHIs do cabeçalho leem um ao outro (cópias em ciclo)
+SWAP = '''programa troca inicio
+    inteiro n, i, a, b, t;
+    leia(n); leia(a); leia(b); i = 0;
+    enquanto (i < n) inicio
+        t = a; a = b; b = t;
+        i = i + 1;
+    fim;
+    escreva(a); escreva(b);
+fim.'''
+
+# x é usado depois do laço com o valor da última volta (cópia perdida)
+LOST = '''programa perdida inicio
+    inteiro n, i, x;
+    leia(n); i = 0; x = 0;
+    enquanto (i < n) inicio
+        x = i;
+        i = i + 1;
+    fim;
+    escreva(x); escreva(i);
+fim.'''
+
+BRANCHES = '''programa desvios inicio
+    inteiro a, b; real r;
+    leia(a); b = 0; r = 1.5;
+    se (a > 0) inicio b = a * 2; r = r * a; fim senao b = 0 - a;
+    se (b > 3 | a == 0) escreva(b) senao escreva(r);
+    escreva(b + a);
+fim.'''
+
+CASES = [
+    (SWAP, [[0, 1, 2], [3, 1, 2], [4, 5, -6]]),
+    (LOST, [[0], [1], [5]]),
+    (BRANCHES, [[0], [1], [-7], [9]]),
+    ((INPUTS / 'primo.dl').read_text(), [[1], [2], [9], [97]]),
+    ((INPUTS / 'prog.dl').read_text(), [[]]),
+]
+
+
+def check_ssa(ic: IC):
+    '''Cada temporário tem uma definição, que domina os seus usos.'''
+    cfg = CFG.of(ic)
+    dom = DominatorTree(cfg)
+    where = {}
+    for bb in cfg.blocks:
+        for i, instr in enumerate(bb.instructions):
+            if instr.result.is_temp:
+                assert instr.result not in where, f'{instr.result} definido duas vezes'
+                where[instr.result] = (bb, i)
+
+    def dominated(temp, bb, i):
+        if temp not in where:
+            return True # Indefinido
+        def_bb, def_i = where[temp]
+        return def_bb is bb and def_i < i or def_bb is not bb and dom.dominates(def_bb, bb)
+
+    for bb in cfg.blocks:
+        if bb not in cfg.reachable:
+            continue
+        for i, instr in enumerate(bb.instructions):
+            if instr.op == Operator.PHI:
+                assert set(instr.sources) == set(cfg.predecessors[bb])
+                for pred, arg in instr.sources.items():
+                    if arg.is_temp and pred in cfg.reachable:
+                        assert dominated(arg, pred, len(pred.instructions))
+            else:
+                for arg in (instr.arg1, instr.arg2):
+                    if arg.is_temp:
+                        assert dominated(arg, bb, i), f'{bb}: {instr}'
+
+
+def propagate_copies(ic: IC):
+    # Na forma SSA, v = t pode ser apagada trocando v por t em todo lugar
+    replace = {}
+    for instr in ic:
+        if instr.op == Operator.MOVE and instr.arg1.is_temp:
+            replace[instr.result] = instr.arg1
+
+    def root(arg):
+        while arg in replace:
+            arg = replace[arg]
+        return arg
+
+    for bb in ic.bb_sequence:
+        bb.instructions = [instr for instr in bb.instructions if instr.result not in replace]
+        for instr in bb.instructions:
+            instr.arg1, instr.arg2 = root(instr.arg1), root(instr.arg2)
+            if instr.op == Operator.PHI:
+                instr.sources = {pred: root(arg) for pred, arg in instr.sources.items()}
+
+
+def test_dominators_and_frontiers(build):
+    ic = build(LOST)
+    cfg = CFG.of(ic)
+    dom = DominatorTree(cfg)
+    entry = cfg.blocks[0]
+    assert dom.idom[entry] is None
+    for bb in cfg.blocks:
+        assert dom.dominates(entry, bb)
+        for pred in cfg.predecessors[bb]:
+            # Uma aresta de volta vai para um bloco que domina a origem
+            if dom.dominates(bb, pred):
+                assert bb in dom.frontier[pred] or pred is bb
+    header = next(bb for bb in cfg.blocks if any(dom.dominates(bb, p) for p in cfg.predecessors[bb]))
+    assert header in dom.frontier[header] or any(header in dom.frontier[p] for p in cfg.predecessors[header])
+    assert dom.preorder()[0] is entry
+
+
+@pytest.mark.parametrize('source, inputs', CASES)
+@pytest.mark.parametrize('optimized', [False, True])
+def test_round_trip(source, inputs, optimized, build, run):
+    ic = build(source, optimized)
+    expected = [run(ic, data) for data in inputs]
+    to_ssa(ic)
+    check_ssa(ic)
+    assert from_ssa(ic) == any(instr.op == Operator.PHI for instr in build_ssa(source, optimized, build))
+    assert not any(instr.op == Operator.PHI for instr in ic)
+    assert [run(ic, data) for data in inputs] == expected
+
+
+def build_ssa(source: str, optimized: bool, build):
+    ic = build(source, optimized)
+    to_ssa(ic)
+    return ic
+
+
+@pytest.mark.parametrize('source, inputs', CASES)
+def test_round_trip_after_copy_propagation(source, inputs, build, run):
+    ic = build(source)
+    expected = [run(ic, data) for data in inputs]
+    to_ssa(ic)
+    propagate_copies(ic)
+    check_ssa(ic)
+    from_ssa(ic)
+    assert [run(ic, data) for data in inputs] == expected
+
+
+def test_phis_at_loop_header(build):
+    ic = build(SWAP)
+    to_ssa(ic)
+    cfg = CFG.of(ic)
+    names = sorted(ic.var_temps[phi.result] for bb in cfg.blocks for phi in phis(bb))
+    # t só é usado dentro da volta em que é definido: a SSA podada não põe PHI para ele
+    assert names == ['a', 'b', 'i']
+
+
+def test_coalescing_removes_copies(build):
+    ic = build(LOST, True)
+    moves = sum(instr.op == Operator.MOVE for instr in ic)
+    to_ssa(ic)
+    from_ssa(ic)
+    assert sum(instr.op == Operator.MOVE for instr in ic) <= moves
+    # As versões de i voltam a ser o temporário original da variável
+    assert len({instr.result for instr in ic if instr.result.is_temp and ic.var_temps.get(instr.result) == 'i'}) == 1
@@ -0,0 +1,79 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.stream import compile_stream
+from io import StringIO
+from pathlib import Path
+import pytest
+import shutil
+import subprocess
+import tracemalloc
+
+inputs = sorted((Path(__file__).parent / 'inputs').glob('*.dl'))
+
+
+def straight_line(count: int):
+    body = ''.join(f'    x = x + {i % 10}; y = y * 0.5 + x;\n' for i in range(count // 2))
+    return f'programa p inicio inteiro x; real y; x = 0; y = 1.0;\n{body}    escreva(x); escreva(y);\nfim.'
+
+
+def compile_source(tmp_path: Path, source: str):
+    path = tmp_path / 'prog.dl'
+    path.write_text(source)
+    asm = StringIO()
+    with open(path, 'rb') as source_file:
+        ok = compile_stream(source_file, asm)
+    return ok, asm.getvalue()
+
+
+def test_stream_yields_the_same_statements():
+    source = inputs[-1].read_text()
+    expected = Parser(RegexLexer(StringIO(source))).ast
+    parser = Parser(RegexLexer(StringIO(source)), parse=False)
+    stream = parser.stream()
+    program = next(stream)
+    for stmt in stream:
+        program.stmt.add_stmt(stmt)
+    assert not parser.had_errors
+    assert str(program) == str(expected.root)
+    assert [str(s) for s in program.stmt.stmts] == [str(s) for s in expected.root.stmt.stmts]
+
+
+def test_errors_are_reported(tmp_path, capsys):
+    ok, _ = compile_source(tmp_path, 'programa p inicio inteiro x; y = 1; x = verdade; fim.')
+    out = capsys.readouterr().out
+    assert not ok
+    assert '"y" não declarada!' in out and 'incompatível' in out
+
+
+def test_peak_memory_does_not_grow_with_program_size(tmp_path):
+    peaks = []
+    for count in (1000, 4000):
+        path = tmp_path / f'big{count}.dl'
+        path.write_text(straight_line(count))
+        tracemalloc.start()
+        with open(path, 'rb') as source_file, open(tmp_path / 'out.s', 'w') as asm:
+            assert compile_stream(source_file, asm)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < 1.5 * peaks[0]
+
+
+@pytest.mark.skipif(shutil.which('gcc') is None, reason='gcc não disponível')
+@pytest.mark.parametrize('path', inputs + [None], ids=[p.stem for p in inputs] + ['straight_line'])
+def test_native_output_matches_interpreter(path, tmp_path, capsys, monkeypatch):
+    source = path.read_text() if path else straight_line(200)
+    ok, asm = compile_source(tmp_path, source)
+    assert ok
+    (tmp_path / 'prog.s').write_text(asm)
+    subprocess.run(['gcc', str(tmp_path / 'prog.s'), '-o', str(tmp_path / 'prog'), '-lm'], check=True)
+    native = subprocess.run([str(tmp_path / 'prog')], input='7\n7\n7\n', capture_output=True, text=True).stdout
+
+    ast = Parser(RegexLexer(StringIO(source))).ast
+    Checker(ast)
+    inputs_left = iter(['7', '7', '7'])
+    monkeypatch.setattr('builtins.input', lambda prompt: print(prompt, end='') or next(inputs_left))
+    capsys.readouterr()
+    IC(ast).interpret()
+    assert native.replace('input: ', '') == capsys.readouterr().out.replace('input: ', '')
@@ -0,0 +1,97 @@
+from dlc.inter.operator import Operator
+from dlc.codegen.x64_codegen import X64CodeGenerator
+from dlc.opt.dataflow import CFG, DominatorTree
+from dlc.opt.global_opt import optimize, expand_integer_powers
+from dlc.opt.loops import natural_loops, induction_variables
+import pytest
+
+# i * k, i * 8 e (i * 4 + 3) * k mudam de forma linear com i; i ^ 2 vira i * i
+INDUCTION = '''programa inducao inicio
+    inteiro n, i, k, s; real r;
+    leia(n); leia(k); i = 0; s = 0; r = 0.5;
+    enquanto (i < n) inicio
+        s = s + i * k + i ^ 2 + i * 8 + (i * 4 + 3) * k;
+        r = r ^ 2 + 0.25;
+        i = i + 1;
+    fim;
+    escreva(s); escreva(r);
+fim.'''
+
+POWERS = '''programa potencias inicio
+    inteiro a; real x;
+    leia(a); leia(x);
+    escreva(a ^ 0); escreva(a ^ 1); escreva(a ^ 2); escreva(a ^ 7); escreva(a ^ 20);
+    escreva(x ^ 3);
+fim.'''
+
+SHIFTS = '''programa deslocamentos inicio
+    inteiro a;
+    leia(a);
+    escreva(a * 16); escreva(4 * a); escreva(a / 4); escreva(a % 8); escreva(a / 2); escreva(a % 2);
+fim.'''
+
+
+def test_induction_variables(build):
+    ic = build(INDUCTION)
+    cfg = CFG.of(ic)
+    (loop,) = natural_loops(cfg, DominatorTree(cfg))
+    ivs = induction_variables(loop)
+    i = next(temp for temp, name in ic.var_temps.items() if name == 'i')
+    assert ivs[i].is_basic and ivs[i].step.value == 1
+    forms = sorted((str(iv.factor), str(iv.offset)) for iv in ivs.values()
+                   if not iv.is_basic and iv.update.op == Operator.MUL)
+    k = next(temp for temp, name in ic.var_temps.items() if name == 'k')
+    # i * k, i * 4 e i * 8; (i * 4 + 3) * k não é derivada (fator constante
+    # vezes k temporário), e i * i não é linear
+    assert forms == sorted([(str(k), '0'), ('4', '0'), ('8', '0')])
+
+
+@pytest.mark.parametrize('data', [[0, 3], [5, 3], [9, -4], [40, 123456789]])
+def test_multiplications_leave_the_loop(data, build, run):
+    ic = build(INDUCTION)
+    expected = run(ic, data)
+    optimize(ic)
+    assert run(ic, data) == expected
+    cfg = CFG.of(ic)
+    (loop,) = natural_loops(cfg, DominatorTree(cfg))
+    muls = [instr for bb in loop.body for instr in bb if instr.op == Operator.MUL and instr.result.type.is_integral]
+    # Sobram i * i e a multiplicação por k de i * 4 + 3
+    assert len(muls) == 2
+    assert not any(instr.op == Operator.POW and instr.result.type.is_integral for instr in ic)
+
+
+@pytest.mark.parametrize('data', [[3, 1.5], [-7, 2.0], [0, -0.5], [46341, 3.0]])
+def test_integer_powers_become_multiplications(data, build, run):
+    ic = build(POWERS)
+    expected = run(ic, data)
+    assert expand_integer_powers(ic)
+    assert run(ic, data) == expected
+    assert [instr.result.type.is_float for instr in ic if instr.op == Operator.POW] == [True]
+    # a ^ 20: 4 quadrados e 1 multiplicação pela base; a ^ 7: 2 e 2; a ^ 2: 1
+    assert sum(instr.op == Operator.MUL for instr in ic) == 5 + 4 + 1
+    assert not expand_integer_powers(ic)
+
+
+@pytest.mark.parametrize('a', [0, 7, -1, -9, -8, 2147483647, -2147483648])
+def test_native_shifts_match_idiv(a, build, native_run):
+    ic = build(SHIFTS, True)
+    code = X64CodeGenerator(ic, binary_io=True).code
+    output = native_run(ic, [a])
+    assert not any('idiv' in line or 'imul' in line for line in code if not line.lstrip().startswith('#'))
+
+    def wrap(v):
+        return (v + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+    def div(x, d):
+        return wrap(abs(x) // d * (-1 if x < 0 else 1))
+
+    assert output == [wrap(a * 16), wrap(4 * a), div(a, 4), a - div(a, 8) * 8, div(a, 2), a - div(a, 2) * 2]
+
+
+@pytest.mark.parametrize('data', [[0, 3], [6, 5], [12, -1000]])
+def test_native_induction_matches_interpreter(data, build, run, native_run):
+    ic = build(INDUCTION, True)
+    expected = run(ic, data)
+    output = native_run(ic, data)
+    assert output[0] == expected[0]
+    assert output[1] == pytest.approx(expected[1])
@@ -0,0 +1,37 @@
+from dlc.lex.tag import Tag
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.lex.token_buffer import TokenBuffer
+from dlc.syntax.parser import Parser
+from io import StringIO
+from pathlib import Path
+
+source_code = (Path(__file__).parent / 'inputs' / 'prog.dl').read_text()
+
+
+def test_token_buffer_round_trip():
+    expected = []
+    lexer = RegexLexer(StringIO(source_code))
+    while (token := lexer.next_token()).tag != Tag.EOF:
+        expected.append((token.tag, token.lexeme, token.line))
+
+    buffer = TokenBuffer.from_lexer(RegexLexer(StringIO(source_code)))
+    assert len(buffer) == len(expected) + 1
+    assert [(t.tag, t.lexeme, t.line) for t in (buffer[i] for i in range(len(expected)))] == expected
+    assert buffer.tag(len(buffer) - 1) == Tag.EOF
+
+
+def test_lexemes_are_interned():
+    lexer = RegexLexer(StringIO('x = x1 + x; x1 = 10 + 10'))
+    tokens = [lexer.next_token() for _ in range(11)]
+    names = [t.lexeme for t in tokens if t.tag == Tag.ID]
+    assert names[0] is names[2]
+    assert names[1] is names[3]
+    assert tokens[8].lexeme is tokens[10].lexeme
+
+
+def test_parser_consumes_token_buffer():
+    buffer = TokenBuffer.from_lexer(RegexLexer(StringIO(source_code)))
+    from_buffer = Parser(buffer.reader())
+    from_lexer = Parser(RegexLexer(StringIO(source_code)))
+    assert not from_buffer.had_errors
+    assert str(from_buffer.ast) == str(from_lexer.ast)
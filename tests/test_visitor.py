@@ -0,0 +1,83 @@
+from dlc.lex.regex_lexer import RegexLexer
+from dlc.syntax.parser import Parser
+from dlc.semantic.checker import Checker
+from dlc.inter.ic import IC
+from dlc.tree.nodes import BinaryNode
+from dlc.tree.visitor import Visitor
+from io import StringIO
+
+
+def parse(source: str):
+    parser = Parser(RegexLexer(StringIO(source)))
+    assert not parser.had_errors
+    return parser.ast
+
+
+class Tracer(Visitor):
+    '''Registra a ordem das visitas e soma o número de nós de cada subárvore.'''
+
+    def __init__(self):
+        self.events = []
+
+    def pre_visit(self, node):
+        self.events.append(('pre', type(node).__name__))
+
+    def post_visit(self, node, value):
+        self.events.append(('post', type(node).__name__, value))
+        return value
+
+    def visit_program_node(self, node): return 1 + (yield node.stmt)
+    def visit_block_node(self, node):
+        count = 1
+        for stmt in node.stmts:
+            count += yield stmt
+        return count
+    def visit_decl_node(self, node): return 1
+    def visit_assign_node(self, node): return 1 + (yield node.var) + (yield node.expr)
+    def visit_if_node(self, node): pass
+    def visit_else_node(self, node): pass
+    def visit_while_node(self, node): pass
+    def visit_write_node(self, node): pass
+    def visit_read_node(self, node): pass
+    def visit_var_node(self, node): return 1
+    def visit_literal_node(self, node): return 1
+    def visit_binary_node(self, node): return 1 + (yield node.expr1) + (yield node.expr2)
+    def visit_unary_node(self, node): pass
+    def visit_convert_node(self, node): pass
+
+
+def test_hooks_and_return_values():
+    ast = parse('programa p inicio inteiro x; x = 1 + 2; fim.')
+    tracer = Tracer()
+    assert tracer.visit(ast.root) == 8
+    assert tracer.events == [
+        ('pre', 'ProgramNode'), ('pre', 'BlockNode'),
+        ('pre', 'DeclNode'), ('post', 'DeclNode', 1),
+        ('pre', 'AssignNode'),
+        ('pre', 'VarNode'), ('post', 'VarNode', 1),
+        ('pre', 'BinaryNode'),
+        ('pre', 'LiteralNode'), ('post', 'LiteralNode', 1),
+        ('pre', 'LiteralNode'), ('post', 'LiteralNode', 1),
+        ('post', 'BinaryNode', 3),
+        ('post', 'AssignNode', 5),
+        ('post', 'BlockNode', 7),
+        ('post', 'ProgramNode', 8),
+    ]
+
+
+def test_visit_subtree():
+    ast = parse('programa p inicio inteiro x; x = 1 + x * 2; fim.')
+    expr = ast.root.stmt.stmts[1].expr
+    assert isinstance(expr, BinaryNode)
+    assert Tracer().visit(expr) == 5
+    assert Tracer().visit(expr.expr1) == 1
+
+
+def test_100k_deep_else_chain(capsys):
+    depth = 100000
+    chain = 'se (x == 0) x = 1 senao ' * depth
+    ast = parse(f'programa p inicio inteiro x; x = 3; {chain} x = 2; escreva(x); fim.')
+    assert not Checker(ast).had_errors
+    capsys.readouterr()
+    IC(ast).interpret()
+    assert capsys.readouterr().out.strip() == 'output: 2'